@@ -58,6 +58,8 @@ class VTUSGPACalculator {
         };
 
         this.courses = [];
+        this.courseSuggestions = new Map(); // code -> subject from /subjects/autocomplete
+        this.suggestTimer = null;
         this.maxCreditsPerSemester = 28;
         this.currentTab = 'pdf-upload';
 
@@ -118,6 +120,10 @@ class VTUSGPACalculator {
         this.addEventListenerSafe('addCourseBtn', 'click', () => this.addCourse());
         this.addEventListenerSafe('calculateSGPABtn', 'click', () => this.calculateSGPA());
 
+        // Course code autocomplete from the subjects catalogue
+        this.addEventListenerSafe('courseCode', 'input', (e) => this.suggestCourses(e.target.value));
+        this.addEventListenerSafe('courseCode', 'change', (e) => this.fillCourseFromSuggestion(e.target.value));
+
         // Mark input for automatic grade conversion
         this.addEventListenerSafe('marksInput', 'input', (e) => this.convertMarksToGrade(e.target.value));
 
@@ -176,22 +182,18 @@ class VTUSGPACalculator {
             const formData = new FormData();
             formData.append('pdf_file', file);
 
-            this.updateProgress(60);
-            this.showLoading('AI Processing...', 'Gemini AI is analyzing your VTU transcript...');
-
-            const response = await fetch('/parse-pdf', {
+            // Queue the parse as a background job and follow its progress
+            const response = await fetch('/jobs/parse-pdf', {
                 method: 'POST',
                 body: formData
             });
 
+            const job = await response.json();
             if (!response.ok) {
-                throw new Error(`HTTP error! status: ${response.status}`);
+                throw new Error(job.error || `HTTP error! status: ${response.status}`);
             }
 
-            const result = await response.json();
-            if (result.error) {
-                throw new Error(result.error);
-            }
+            const result = await this.waitForParseJob(job);
 
             this.updateProgress(100);
             this.hideLoading();
@@ -204,6 +206,72 @@ class VTUSGPACalculator {
         }
     }
 
+    waitForParseJob(job) {
+        // Stream stage events over SSE, falling back to polling the job status
+        const stageProgress = { queued: 30, started: 35, cache: 90, gemini: 50, extracting: 60, matching: 75, sgpa: 90 };
+        const stageTitles = {
+            queued: 'Waiting...',
+            started: 'Processing VTU Transcript...',
+            cache: 'Loading Results...',
+            gemini: 'AI Processing...',
+            extracting: 'Reading PDF...',
+            matching: 'Parsing VTU Course Data...',
+            sgpa: 'Calculating SGPA...'
+        };
+        const showStage = (event) => {
+            if (stageProgress[event.stage]) {
+                this.updateProgress(stageProgress[event.stage]);
+                this.showLoading(stageTitles[event.stage], event.message);
+            }
+        };
+        const finish = (state) => {
+            if (state.status === 'done') {
+                return state.result;
+            }
+            throw new Error(state.error || 'Parsing failed');
+        };
+
+        const poll = async () => {
+            let seen = 0;
+            for (;;) {
+                const response = await fetch(job.status_url);
+                const state = await response.json();
+                if (!response.ok) {
+                    throw new Error(state.error || `HTTP error! status: ${response.status}`);
+                }
+                state.events.slice(seen).forEach(showStage);
+                seen = state.events.length;
+                if (state.status === 'done' || state.status === 'failed') {
+                    return finish(state);
+                }
+                await new Promise(resolve => setTimeout(resolve, 1000));
+            }
+        };
+
+        if (!window.EventSource) {
+            return poll();
+        }
+        return new Promise((resolve, reject) => {
+            const source = new EventSource(job.events_url);
+            const settle = (state) => {
+                source.close();
+                try {
+                    resolve(finish(state));
+                } catch (error) {
+                    reject(error);
+                }
+            };
+            source.addEventListener('stage', (e) => showStage(JSON.parse(e.data)));
+            source.addEventListener('done', (e) => settle(JSON.parse(e.data)));
+            source.addEventListener('failed', (e) => settle(JSON.parse(e.data)));
+            source.onerror = () => {
+                // Stream dropped (proxy, network): finish by polling instead
+                source.close();
+                poll().then(resolve, reject);
+            };
+        });
+    }
+
     renderBackendResults(result) {
         // Build breakdown from backend subjects
         const subjects = Object.values(result.subjects || {});
@@ -469,8 +537,8 @@ class VTUSGPACalculator {
             return;
         }
 
-        // Validate VTU course code format
-        if (!this.validateVTUCourseCode(courseCode)) {
+        // Validate VTU course code format (catalogue codes are always accepted)
+        if (!this.validateVTUCourseCode(courseCode) && !this.courseSuggestions.has(courseCode.toUpperCase())) {
             this.showStatus('Please enter a valid VTU course code (format: YYCCNNN, e.g., 22CS101).', 'error');
             return;
         }
@@ -514,6 +582,54 @@ class VTUSGPACalculator {
         return vtuPattern.test(code);
     }
 
+    suggestCourses(query) {
+        // Debounce keystrokes, then ask the backend for matching codes/names
+        clearTimeout(this.suggestTimer);
+        const trimmed = query.trim();
+        if (trimmed.length < 2) {
+            return;
+        }
+
+        this.suggestTimer = setTimeout(async () => {
+            try {
+                const response = await fetch(`/subjects/autocomplete?q=${encodeURIComponent(trimmed)}&limit=8`);
+                if (!response.ok) {
+                    return;
+                }
+                const result = await response.json();
+                const datalist = document.getElementById('courseSuggestions');
+                if (!datalist) {
+                    return;
+                }
+
+                datalist.innerHTML = '';
+                (result.suggestions || []).forEach(subject => {
+                    this.courseSuggestions.set(subject.code, subject);
+                    const option = document.createElement('option');
+                    option.value = subject.code;
+                    option.label = `${subject.name} (${subject.credits} credits)`;
+                    datalist.appendChild(option);
+                });
+            } catch (error) {
+                console.error('Error fetching course suggestions:', error);
+            }
+        }, 150);
+    }
+
+    fillCourseFromSuggestion(code) {
+        const subject = this.courseSuggestions.get(code.trim().toUpperCase());
+        if (!subject) {
+            return;
+        }
+
+        document.getElementById('courseCode').value = subject.code;
+        document.getElementById('courseName').value = subject.name;
+        const creditsSelect = document.getElementById('courseCredits');
+        if ([...creditsSelect.options].some(option => option.value === String(subject.credits))) {
+            creditsSelect.value = String(subject.credits);
+        }
+    }
+
     marksToGrade(marks) {
         if (marks >= 90) return 'O';
         if (marks >= 80) return 'A+';
@@ -0,0 +1,184 @@
+"""
+Batch Parser - Process-pool fan-out for bulk transcript uploads
+Reads PDFs from a multi-file upload or a zip archive one at a time, keeps a
+bounded number of them in worker processes and yields results in completion
+order, so a large batch never sits in the web worker's memory at once
+"""
+
+import io
+import itertools
+import os
+import threading
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+BATCH_MAX_WORKERS = int(os.getenv('BATCH_MAX_WORKERS', str(os.cpu_count() or 2)))
+BATCH_MAX_FILES = int(os.getenv('BATCH_MAX_FILES', '500'))
+BATCH_MAX_FILE_BYTES = int(os.getenv('BATCH_MAX_FILE_BYTES', str(10 * 1024 * 1024)))  # 10MB per PDF
+BATCH_MAX_ARCHIVE_BYTES = int(os.getenv('BATCH_MAX_ARCHIVE_BYTES', str(100 * 1024 * 1024)))  # 100MB per zip
+BATCH_MAX_TOTAL_BYTES = int(os.getenv('BATCH_MAX_TOTAL_BYTES', str(200 * 1024 * 1024)))  # 200MB of PDFs per batch
+BATCH_MAX_IN_FLIGHT = int(os.getenv('BATCH_MAX_IN_FLIGHT', str(2 * BATCH_MAX_WORKERS)))  # PDFs held at once
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+class BatchError(ValueError):
+    """Raised when a batch upload as a whole is unusable"""
+
+
+def get_pool():
+    """Return this process's worker pool, creating it on first use and again after a fork"""
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ProcessPoolExecutor(max_workers=BATCH_MAX_WORKERS)
+            _pool_pid = os.getpid()
+        return _pool
+
+
+def _reset_pool():
+    """Drop a broken pool so the next batch starts a fresh one"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False)  # a broken pool has already failed its pending futures
+        _pool = None
+
+
+def collect_batch_items(uploads):
+    """Turn uploaded files into a lazy iterator of (filename, pdf_bytes, error) items
+
+    uploads is a list of (filename, stream) pairs; a .zip upload is expanded
+    into the PDFs it contains. Problems with a single file become that item's
+    error instead of failing the whole batch. An empty batch raises BatchError
+    here; going over BATCH_MAX_FILES or BATCH_MAX_TOTAL_BYTES raises it from
+    the iterator as soon as the file that crosses the limit is read.
+    """
+    items = _iter_batch_items(uploads)
+    first = next(items, None)
+    if first is None:
+        raise BatchError("No PDF files found in upload")
+    return itertools.chain([first], items)
+
+
+def _iter_batch_items(uploads):
+    count = 0
+    total_bytes = 0
+    for filename, stream in uploads:
+        if filename.lower().endswith('.zip'):
+            entries = _expand_zip(filename, stream)
+        elif filename.lower().endswith('.pdf'):
+            entries = [_read_pdf(filename, stream)]
+        else:
+            entries = [(filename, None, "File must be a PDF or a zip archive")]
+        for item in entries:
+            count += 1
+            if count > BATCH_MAX_FILES:
+                raise BatchError(f"Too many files in batch (max {BATCH_MAX_FILES})")
+            total_bytes += len(item[1] or b"")
+            if total_bytes > BATCH_MAX_TOTAL_BYTES:
+                raise BatchError(f"Batch exceeds the maximum total size of {BATCH_MAX_TOTAL_BYTES // (1024 * 1024)}MB")
+            yield item
+
+
+def _read_pdf(filename, stream):
+    """(filename, pdf_bytes, error) for one PDF stream, reading at most one byte past the size limit"""
+    pdf_bytes = stream.read(BATCH_MAX_FILE_BYTES + 1)
+    if len(pdf_bytes) > BATCH_MAX_FILE_BYTES:
+        return filename, None, "File exceeds the maximum PDF size"
+    return filename, pdf_bytes, None
+
+
+def _expand_zip(archive_name, stream):
+    """Yield (filename, pdf_bytes, error) items for the PDFs inside a zip upload
+
+    Entries are read one at a time and never past BATCH_MAX_FILE_BYTES, whatever
+    size the archive declares for them.
+    """
+    if stream.seekable():
+        # Uploads are already spooled by the request parser: read the archive in place
+        size = stream.seek(0, io.SEEK_END)
+        stream.seek(0)
+    else:
+        stream = io.BytesIO(stream.read(BATCH_MAX_ARCHIVE_BYTES + 1))
+        size = len(stream.getbuffer())
+    if size > BATCH_MAX_ARCHIVE_BYTES:
+        yield archive_name, None, "Archive exceeds the maximum zip size"
+        return
+    try:
+        archive = zipfile.ZipFile(stream)
+    except zipfile.BadZipFile:
+        yield archive_name, None, "Invalid zip archive"
+        return
+
+    with archive:
+        for info in archive.infolist():
+            if info.is_dir() or not info.filename.lower().endswith('.pdf'):
+                continue
+            name = f"{archive_name}/{info.filename}"
+            if info.file_size > BATCH_MAX_FILE_BYTES:
+                yield name, None, "File exceeds the maximum PDF size"
+                continue
+            try:
+                with archive.open(info) as entry:
+                    yield _read_pdf(name, entry)
+            except Exception as e:
+                yield name, None, f"Could not read file from archive: {str(e)}"
+
+
+def iter_batch_results(items, worker, scheme=None, max_in_flight=None):
+    """Run worker(filename, pdf_bytes, scheme) for every item and yield results as they finish
+
+    Each yielded record is the worker's dict plus "file" and "index"; worker
+    crashes and per-file upload errors are reported as error records. At most
+    max_in_flight (BATCH_MAX_IN_FLIGHT) PDFs are submitted at a time, and the
+    next item is only read once one of them finishes. A BatchError from items
+    is raised after the results of the files read before it.
+    """
+    pool = get_pool()
+    max_in_flight = max_in_flight or BATCH_MAX_IN_FLIGHT
+    items = enumerate(items)
+    futures = {}
+    exhausted = False
+    limit_error = None
+    broken = False
+
+    try:
+        while True:
+            while not exhausted and len(futures) < max_in_flight:
+                try:
+                    index, (filename, pdf_bytes, error) = next(items)
+                except StopIteration:
+                    exhausted = True
+                    break
+                except BatchError as e:
+                    exhausted = True  # raised once the files already submitted are reported
+                    limit_error = e
+                    break
+                if error:
+                    yield {"file": filename, "index": index, "success": False, "error": error}
+                    continue
+                futures[pool.submit(worker, filename, pdf_bytes, scheme)] = (index, filename)
+            if not futures:
+                break
+
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                index, filename = futures.pop(future)
+                try:
+                    record = future.result()
+                except Exception as e:
+                    broken = broken or isinstance(e, BrokenProcessPool)
+                    record = {"success": False, "error": f"Error processing PDF: {str(e)}"}
+                yield {"file": filename, "index": index, **record}
+        if limit_error is not None:
+            raise limit_error
+    finally:
+        # A failed read or a client that went away leaves nobody to collect these
+        for future in futures:
+            future.cancel()
+        if broken:
+            _reset_pool()
@@ -0,0 +1,279 @@
+"""
+Benchmark - Speed, memory and accuracy of parse_vtu_pdf on synthetic transcripts
+Parses a generated corpus with Gemini stubbed out, reports per-stage
+throughput and latency percentiles (from the tracing spans), peak traced memory
+and extraction accuracy, and fails on regressions against a stored baseline
+"""
+
+import io
+import json
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import metrics
+import tracing
+import vtu_pdf_parser as parser
+from subject_record import SubjectRecord
+from transcript_generator import generate_corpus
+from upload_buffer import PDFUpload
+
+BENCHMARK_BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baseline.json')
+STAGES = ("upload_read", "pdf_open", "text_extraction", "matching", "gemini", "sgpa")
+ACCURACY_FIELDS = ("internal", "external", "total", "result")
+# Stages faster than this at p50 are too noisy to gate on
+MIN_GATED_STAGE_MS = 1.0
+
+
+def percentile(values, percent):
+    """Nearest-rank percentile of a list of numbers (0.0 for an empty list)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * percent // 100))  # ceil
+    return ordered[int(rank) - 1]
+
+
+def _summary(durations_ms):
+    return {
+        "count": len(durations_ms),
+        "p50_ms": round(percentile(durations_ms, 50), 3),
+        "p99_ms": round(percentile(durations_ms, 99), 3),
+        "mean_ms": round(statistics.fmean(durations_ms), 3) if durations_ms else 0.0,
+        "per_second": round(len(durations_ms) / (sum(durations_ms) / 1000), 1) if sum(durations_ms) else 0.0,
+    }
+
+
+def install_gemini_stub(corpus, mode="off", latency=0.0):
+    """Replace parse_with_gemini_ai for the benchmark; returns a function restoring the original
+
+    "off" answers None at once (the local parser does the work, as without
+    an API key); "stub" returns each transcript's true courses after latency
+    seconds, timed as the gemini stage.
+    """
+    original = parser.parse_with_gemini_ai
+    expected_by_pdf = {bytes(transcript["pdf"]): transcript["expected"] for transcript in corpus}
+
+    def stub(pdf_file):
+        if mode == "off":
+            return None
+        with tracing.stage("gemini"):
+            time.sleep(latency)
+            expected = expected_by_pdf.get(bytes(PDFUpload.wrap(pdf_file).view))
+        if expected is None:
+            return None
+        return {code: SubjectRecord(code=code, name=code, internal=marks["internal"], external=marks["external"],
+                                    total=marks["total"], result=marks["result"])
+                for code, marks in expected.items()}
+
+    parser.parse_with_gemini_ai = stub
+    return lambda: setattr(parser, "parse_with_gemini_ai", original)
+
+
+def parse_one(pdf_bytes, policy=None):
+    """The /parse-pdf work for one transcript, without the result cache: (subjects, scheme, trace)"""
+    with tracing.traced() as trace:
+        with tracing.stage("upload_read"):
+            upload = PDFUpload.from_stream(io.BytesIO(pdf_bytes))
+        with upload:
+            subjects, scheme = parser.parse_vtu_pdf(upload, None, policy)
+            if subjects:
+                with tracing.stage("sgpa"):
+                    parser.build_result_payload(subjects, scheme)
+    return subjects, scheme, trace
+
+
+def score(subjects, scheme, transcript):
+    """Accuracy counts for one parse against the transcript's known courses"""
+    expected = transcript["expected"]
+    found = [code for code in expected if code in subjects]
+    correct = [code for code in found
+               if all(subjects[code][field] == expected[code][field] for field in ACCURACY_FIELDS)]
+    return {
+        "expected": len(expected),
+        "parsed": len(subjects),
+        "found": len(found),
+        "correct": len(correct),
+        "exact": len(correct) == len(expected) == len(subjects),
+        "scheme_correct": scheme == transcript["scheme"],
+    }
+
+
+def _accuracy(scores):
+    expected = sum(item["expected"] for item in scores)
+    parsed = sum(item["parsed"] for item in scores)
+    found = sum(item["found"] for item in scores)
+    return {
+        "transcripts": len(scores),
+        "code_recall": round(found / expected, 4) if expected else 0.0,
+        "code_precision": round(found / parsed, 4) if parsed else 0.0,
+        "course_accuracy": round(sum(item["correct"] for item in scores) / expected, 4) if expected else 0.0,
+        "exact_transcripts": round(sum(item["exact"] for item in scores) / len(scores), 4) if scores else 0.0,
+        "scheme_accuracy": round(sum(item["scheme_correct"] for item in scores) / len(scores), 4) if scores else 0.0,
+    }
+
+
+def run_benchmark(corpus, repeat=3, warmup=6, policy=None, measure_memory=True):
+    """Parse the corpus repeat times (after warmup untimed parses) and report speed, memory and accuracy"""
+    for transcript in corpus[:warmup]:
+        parse_one(transcript["pdf"], policy)
+
+    latencies = []
+    stage_durations = {stage: [] for stage in STAGES}
+    pages = 0
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for transcript in corpus:
+            subjects, scheme, trace = parse_one(transcript["pdf"], policy)
+            latencies.append(trace.duration * 1000)
+            pages += transcript["pages"]
+            for span in trace.spans:
+                if span["name"] in stage_durations:
+                    stage_durations[span["name"]].append(span["duration_ms"])
+    elapsed = time.perf_counter() - started
+
+    # Accuracy and memory from one more (untimed) pass: tracemalloc slows everything down
+    scores = []
+    groups = {}
+    peaks = []
+    if measure_memory:
+        tracemalloc.start()
+    try:
+        for transcript in corpus:
+            if measure_memory:
+                tracemalloc.reset_peak()
+            subjects, scheme, _ = parse_one(transcript["pdf"], policy)
+            if measure_memory:
+                peaks.append(tracemalloc.get_traced_memory()[1] / 1024)
+            item = score(subjects, scheme, transcript)
+            scores.append(item)
+            groups.setdefault(f"scheme {transcript['scheme']}", []).append(item)
+            groups.setdefault(f"layout {transcript['layout']}", []).append(item)
+    finally:
+        if measure_memory:
+            tracemalloc.stop()
+
+    return {
+        "config": {"transcripts": len(corpus), "repeat": repeat, "policy": policy or parser.PARSE_POLICY},
+        "latency": _summary(latencies),
+        "transcripts_per_second": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "pages_per_second": round(pages / elapsed, 2) if elapsed else 0.0,
+        "stages": {stage: _summary(durations) for stage, durations in stage_durations.items() if durations},
+        "memory": {
+            "peak_traced_kib_p50": round(percentile(peaks, 50), 1),
+            "peak_traced_kib_max": round(max(peaks), 1) if peaks else 0.0,
+            "max_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        },
+        "accuracy": _accuracy(scores),
+        "accuracy_by_group": {group: _accuracy(items) for group, items in sorted(groups.items())},
+    }
+
+
+def compare_to_baseline(report, baseline, tolerance=0.25, check_timing=True):
+    """Regressions of report against baseline, as human-readable strings (empty when none)
+
+    Latency and memory may grow by tolerance (0.25 = 25%); accuracy, which
+    is deterministic for a given corpus, may not drop at all.
+    """
+    regressions = []
+    # The repeat count only changes how long the run takes, not what it measures
+    corpus, baseline_corpus = ({key: value for key, value in config.items() if key != "repeat"}
+                               for config in (report["config"], baseline["config"]))
+    if corpus != baseline_corpus:
+        regressions.append(f"corpus differs from the baseline: {corpus} vs {baseline_corpus}")
+        return regressions
+
+    def check(label, current, previous):
+        if previous > 0 and current > previous * (1 + tolerance):
+            regressions.append(f"{label}: {current} vs baseline {previous} (+{(current / previous - 1) * 100:.0f}%)")
+
+    if check_timing:
+        check("latency p50_ms", report["latency"]["p50_ms"], baseline["latency"]["p50_ms"])
+        check("latency p99_ms", report["latency"]["p99_ms"], baseline["latency"]["p99_ms"])
+        for stage, previous in baseline["stages"].items():
+            current = report["stages"].get(stage)
+            if current is not None and previous["p50_ms"] >= MIN_GATED_STAGE_MS:
+                check(f"stage {stage} p50_ms", current["p50_ms"], previous["p50_ms"])
+    check("memory peak_traced_kib_max", report["memory"]["peak_traced_kib_max"],
+          baseline["memory"]["peak_traced_kib_max"])
+
+    for group, previous in [("overall", baseline["accuracy"]), *baseline["accuracy_by_group"].items()]:
+        current = report["accuracy"] if group == "overall" else report["accuracy_by_group"].get(group, {})
+        for metric, value in previous.items():
+            if metric != "transcripts" and current.get(metric, 0.0) < value:
+                regressions.append(f"accuracy {group} {metric}: {current.get(metric, 0.0)} vs baseline {value}")
+    return regressions
+
+
+def _print_report(report):
+    latency = report["latency"]
+    print(f"Transcripts: {report['config']['transcripts']} x {report['config']['repeat']} "
+          f"(policy {report['config']['policy']})")
+    print(f"Latency: p50 {latency['p50_ms']} ms, p99 {latency['p99_ms']} ms, "
+          f"{report['transcripts_per_second']} transcripts/s, {report['pages_per_second']} pages/s")
+    for stage, summary in report["stages"].items():
+        print(f"  {stage:<16} p50 {summary['p50_ms']:>9} ms  p99 {summary['p99_ms']:>9} ms  "
+              f"{summary['per_second']:>9}/s")
+    memory = report["memory"]
+    print(f"Peak traced memory: p50 {memory['peak_traced_kib_p50']} KiB, max {memory['peak_traced_kib_max']} KiB "
+          f"(max RSS {memory['max_rss_kib']} KiB)")
+    print(f"Accuracy: {json.dumps(report['accuracy'])}")
+    for group, accuracy in report["accuracy_by_group"].items():
+        print(f"  {group:<16} recall {accuracy['code_recall']:<7} course accuracy {accuracy['course_accuracy']:<7} "
+              f"exact {accuracy['exact_transcripts']}")
+
+
+# CLI: python benchmark.py [--count 48] [--seed 0] [--repeat 3] [--gemini off|stub] [--check | --save-baseline]
+if __name__ == "__main__":
+    import argparse
+
+    arg_parser = argparse.ArgumentParser(description="Benchmark parse_vtu_pdf on synthetic VTU transcripts")
+    arg_parser.add_argument("--count", type=int, default=48, help="transcripts in the corpus")
+    arg_parser.add_argument("--seed", type=int, default=0, help="corpus seed")
+    arg_parser.add_argument("--repeat", type=int, default=3, help="timed passes over the corpus")
+    arg_parser.add_argument("--policy", default="gemini-first", help="PARSE_POLICY to benchmark")
+    arg_parser.add_argument("--gemini", choices=("off", "stub"), default="off",
+                            help="off: Gemini finds nothing; stub: Gemini returns the true courses")
+    arg_parser.add_argument("--gemini-latency", type=float, default=0.05, help="seconds the stub takes")
+    arg_parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    arg_parser.add_argument("--baseline", default=BENCHMARK_BASELINE_PATH, help="baseline report file")
+    arg_parser.add_argument("--check", action="store_true", help="exit 1 on regressions against the baseline")
+    arg_parser.add_argument("--tolerance", type=float, default=0.25, help="allowed latency/memory growth")
+    arg_parser.add_argument("--accuracy-only", action="store_true",
+                            help="only gate accuracy and memory (timings from another machine)")
+    arg_parser.add_argument("--save-baseline", action="store_true", help="write this run as the new baseline")
+    arg_parser.add_argument("--json", help="also write the full report to this file")
+    args = arg_parser.parse_args()
+
+    tracing.logger.setLevel("WARNING")  # one log line per span would swamp the output
+    metrics.registry = metrics.MetricsRegistry(tempfile.mkdtemp(prefix="vtu-benchmark-metrics-"))
+    corpus = generate_corpus(args.count, args.seed)
+    restore_gemini = install_gemini_stub(corpus, args.gemini, args.gemini_latency)
+    try:
+        report = run_benchmark(corpus, args.repeat, policy=args.policy, measure_memory=not args.no_memory)
+    finally:
+        restore_gemini()
+    report["config"].update(seed=args.seed, gemini=args.gemini)
+    _print_report(report)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as report_file:
+            json.dump(report, report_file, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as baseline_file:
+            json.dump(report, baseline_file, indent=2)
+            baseline_file.write("\n")
+        print(f"Saved baseline to {args.baseline}")
+    elif args.check:
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+        regressions = compare_to_baseline(report, baseline, args.tolerance, check_timing=not args.accuracy_only)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print("No regressions against the baseline")
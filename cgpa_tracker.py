@@ -0,0 +1,198 @@
+"""
+CGPA Tracker - Incremental multi-semester CGPA per student
+Each student's latest result per course and running credit / credit-point
+totals per semester are kept in SQLite, so recording or correcting a semester
+touches only that upload's courses and the CGPA is read from a few totals
+"""
+
+import hmac
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from subject_data import subject_data
+
+CGPA_STORE_PATH = os.getenv('CGPA_STORE_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cgpa.sqlite3'))
+# Clients send "X-CGPA-Token: <CGPA_TOKEN>" to read or change grade history; unset disables /cgpa
+CGPA_TOKEN = os.getenv('CGPA_TOKEN', '')
+
+_STUDENT_RE = re.compile(r'^[A-Z0-9_-]{1,32}$')
+# Semester digit of a course code: BCS401 -> 4, 21CS42 -> 4, BESCK104A -> 1
+_CODE_SEMESTER_RE = re.compile(r'[A-Z](\d)\d*[A-Z]?$')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cgpa_courses (
+    student TEXT NOT NULL,
+    code TEXT NOT NULL,
+    semester TEXT NOT NULL,
+    name TEXT NOT NULL,
+    credits REAL NOT NULL,
+    grade_point REAL NOT NULL,
+    grade TEXT,
+    total REAL,
+    result TEXT,
+    recorded_at REAL NOT NULL,
+    PRIMARY KEY (student, code)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS cgpa_semesters (
+    student TEXT NOT NULL,
+    semester TEXT NOT NULL,
+    credits REAL NOT NULL,
+    credit_points REAL NOT NULL,
+    courses INTEGER NOT NULL,
+    PRIMARY KEY (student, semester)
+) WITHOUT ROWID;
+"""
+
+
+def normalize_student(student):
+    """Upper-cased student key (USN), or None if it is not a valid identifier"""
+    student = (student or "").strip().upper()
+    return student if _STUDENT_RE.match(student) else None
+
+
+def cgpa_access_allowed(header_value):
+    """Whether a request's X-CGPA-Token header carries the configured token"""
+    if not CGPA_TOKEN or not header_value:
+        return False
+    return hmac.compare_digest(header_value.encode("utf-8"), CGPA_TOKEN.encode("utf-8"))
+
+
+def course_semester(code, default=None):
+    """Semester a course belongs to: the subject database's, else default, else the code's digit"""
+    info = subject_data.current().index.get(code)
+    if info and info["semester"].isdigit():
+        return info["semester"]
+    if default:
+        return str(default)
+    match = _CODE_SEMESTER_RE.search(code.upper())
+    return match.group(1) if match and match.group(1) != "0" else "unknown"
+
+
+def _semester_sort_key(semester):
+    return (0, int(semester)) if semester.isdigit() else (1, 0)
+
+
+class CGPATracker:
+    """SQLite-backed per-student course results with running per-semester totals"""
+
+    def __init__(self, path=CGPA_STORE_PATH, semester_of=course_semester, clock=time.time):
+        self.path = path
+        self._semester_of = semester_of  # (code, default semester) -> semester
+        self._clock = clock
+        self._local = threading.local()
+
+    def _connect(self):
+        """Return this thread's connection, reopening it after a fork"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")  # concurrent readers across workers
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def record(self, student, subjects, semester=None):
+        """Record parsed subjects ({code: subject} as from parse_vtu_pdf) and return the updated summary
+
+        The most recently recorded result for a course (supplementary,
+        revaluation) replaces its earlier one. Results carry no exam session,
+        so recording an older result again overwrites a newer one. Only the
+        touched semesters' totals change, so the cost is O(subjects uploaded)
+        whatever the student's history.
+        """
+        recorded_at = self._clock()
+        conn = self._connect()
+        updated = []
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for code, subject in subjects.items():
+                code = code.upper()
+                previous = conn.execute(
+                    "SELECT semester, credits, grade_point FROM cgpa_courses WHERE student = ? AND code = ?",
+                    (student, code)
+                ).fetchone()
+                if previous is not None:
+                    self._add_to_semester(conn, student, previous[0], -previous[1], -previous[1] * previous[2], -1)
+
+                course_semester_key = self._semester_of(code, semester)
+                credits = float(subject["credits"])
+                grade_point = float(subject["grade_point"])
+                conn.execute(
+                    "INSERT OR REPLACE INTO cgpa_courses "
+                    "(student, code, semester, name, credits, grade_point, grade, total, result, recorded_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (student, code, course_semester_key, subject.get("name", code), credits, grade_point,
+                     subject.get("grade"), subject.get("total"), subject.get("result"), recorded_at)
+                )
+                self._add_to_semester(conn, student, course_semester_key, credits, credits * grade_point, 1)
+                updated.append(code)
+            conn.execute("DELETE FROM cgpa_semesters WHERE student = ? AND courses <= 0", (student,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        summary = self.summary(student)
+        summary["updated_courses"] = updated
+        return summary
+
+    @staticmethod
+    def _add_to_semester(conn, student, semester, credits, credit_points, courses):
+        conn.execute(
+            "INSERT INTO cgpa_semesters (student, semester, credits, credit_points, courses) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (student, semester) DO UPDATE SET credits = credits + excluded.credits, "
+            "credit_points = credit_points + excluded.credit_points, courses = courses + excluded.courses",
+            (student, semester, credits, credit_points, courses)
+        )
+
+    def summary(self, student, include_courses=False):
+        """CGPA and per-semester SGPA from the running totals"""
+        conn = self._connect()
+        rows = conn.execute(
+            "SELECT semester, credits, credit_points, courses FROM cgpa_semesters WHERE student = ?", (student,)
+        ).fetchall()
+        total_credits = sum(row[1] for row in rows)
+        total_points = sum(row[2] for row in rows)
+        summary = {
+            "student": student,
+            "cgpa": round(total_points / total_credits, 2) if total_credits > 0 else 0.0,
+            "total_credits": total_credits,
+            "total_credit_points": total_points,
+            "courses": sum(row[3] for row in rows),
+            "semesters": {
+                semester: {
+                    "sgpa": round(points / credits, 2) if credits > 0 else 0.0,
+                    "credits": credits,
+                    "credit_points": points,
+                    "courses": courses
+                }
+                for semester, credits, points, courses in sorted(rows, key=lambda row: _semester_sort_key(row[0]))
+            }
+        }
+        if include_courses:
+            summary["course_results"] = [
+                {"code": code, "semester": semester, "name": name, "credits": credits, "grade_point": grade_point,
+                 "grade": grade, "total": total, "result": result, "recorded_at": recorded_at}
+                for code, semester, name, credits, grade_point, grade, total, result, recorded_at in conn.execute(
+                    "SELECT code, semester, name, credits, grade_point, grade, total, result, recorded_at "
+                    "FROM cgpa_courses WHERE student = ? ORDER BY semester, code", (student,)
+                )
+            ]
+        return summary
+
+    def forget(self, student):
+        """Delete everything recorded for a student; returns the number of courses removed"""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            removed = conn.execute("DELETE FROM cgpa_courses WHERE student = ?", (student,)).rowcount
+            conn.execute("DELETE FROM cgpa_semesters WHERE student = ?", (student,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return removed
@@ -0,0 +1,180 @@
+"""
+Code Classifier - Prefix-trie scheme and branch classification for VTU course codes
+The trie is built once from the scheme patterns and the branch list, so each
+code token is classified by a single walk over its leading characters
+"""
+
+import re
+from collections import Counter
+
+# Course-code-like tokens (letters and digits mixed) in upper-cased transcript text
+_CODE_TOKEN_RE = re.compile(r'(?<![A-Z0-9])(?=[A-Z]*[0-9])(?=[0-9]*[A-Z])[A-Z0-9]+')
+_REGEX_META = set('[](){}.*+?|^$\\')
+
+
+def literal_prefix(pattern):
+    """Return the literal characters a scheme pattern starts with (e.g. "21" for 21[A-Z]{2,4}\\d{2,3})"""
+    prefix = ""
+    for index, char in enumerate(pattern):
+        if char in _REGEX_META:
+            break
+        if index + 1 < len(pattern) and pattern[index + 1] in '{*+?':
+            break  # the character is quantified, so it isn't a fixed prefix
+        prefix += char
+    return prefix.upper()
+
+
+class _TrieNode:
+    __slots__ = ("children", "schemes", "branch", "branch_schemes", "strong_schemes")
+
+    def __init__(self):
+        self.children = {}
+        self.schemes = []  # (scheme, compiled full-code pattern) candidates ending here
+        self.branch = None  # branch whose code prefix ends here
+        self.branch_schemes = []  # schemes that use this branch prefix
+        self.strong_schemes = []  # schemes for which this prefix is a high-confidence signal
+
+
+class CodeClassifier:
+    """Assigns (scheme, branch) to course codes and scores whole transcripts"""
+
+    def __init__(self, schemes, branches):
+        self.scheme_order = list(schemes)
+        self.branch_order = list(branches)
+        self._root = _TrieNode()
+
+        for scheme, data in schemes.items():
+            node = self._insert(literal_prefix(data["pattern"]))
+            node.schemes.append((scheme, re.compile(data["pattern"], re.IGNORECASE)))
+
+        # Branch prefixes are the scheme's branch prefix followed by the branch
+        # code (BCS..., 21CS..., 18CS...)
+        for scheme, data in schemes.items():
+            scheme_prefix = data.get("branch_prefix")
+            if scheme_prefix is None:
+                continue
+            for branch in branches:
+                node = self._insert(scheme_prefix.upper() + branch.upper())
+                node.branch_schemes.append(scheme)
+                if node.branch is None:
+                    node.branch = branch
+
+        # Prefixes that identify a scheme with high confidence (e.g. BCS401 for 2022)
+        for scheme, data in schemes.items():
+            for prefix in data.get("strong_prefixes", ()):
+                self._insert(prefix.upper()).strong_schemes.append(scheme)
+
+    def _insert(self, key):
+        node = self._root
+        for char in key:
+            node = node.children.setdefault(char, _TrieNode())
+        return node
+
+    def classify_code(self, code):
+        """Classify one code token
+
+        Returns (scheme, branch, branch_schemes, strong) where scheme is the
+        scheme whose full pattern the code matches, branch is the branch whose
+        prefix it starts with, branch_schemes lists the schemes using that
+        prefix and strong is True if the code carries one of the scheme's
+        high-confidence prefixes.
+        """
+        code = code.upper()
+        node = self._root
+        scheme = None
+        branch = None
+        branch_schemes = ()
+        strong_schemes = []
+
+        for char in code:
+            node = node.children.get(char)
+            if node is None:
+                break
+            for candidate, pattern in node.schemes:
+                if scheme is None and pattern.fullmatch(code):
+                    scheme = candidate
+            if node.branch is not None:
+                branch = node.branch
+                branch_schemes = node.branch_schemes
+            strong_schemes.extend(node.strong_schemes)
+
+        return scheme, branch, branch_schemes, scheme is not None and scheme in strong_schemes
+
+    def classify_codes(self, codes):
+        """Score schemes and branches over an iterable of code tokens in one pass"""
+        pattern_matches = dict.fromkeys(self.scheme_order, 0)
+        branch_prefixed = dict.fromkeys(self.scheme_order, False)
+        strong_matches = dict.fromkeys(self.scheme_order, False)
+        branch_counts = dict.fromkeys(self.branch_order, 0)
+
+        # Transcripts repeat the same few codes, so classify each one once
+        for code, count in Counter(code.upper() for code in codes).items():
+            scheme, branch, branch_schemes, strong = self.classify_code(code)
+            if scheme is not None:
+                pattern_matches[scheme] += count
+                if strong:
+                    strong_matches[scheme] = True
+            if branch is not None:
+                branch_counts[branch] += count
+                for candidate in branch_schemes:
+                    branch_prefixed[candidate] = True
+
+        scheme_scores = {}
+        for scheme in self.scheme_order:
+            matches = pattern_matches[scheme]
+            score = matches * 10  # Each match adds 10 points
+            if matches > 1:
+                score += 20  # Bonus for multiple matches
+            if branch_prefixed[scheme]:
+                score += 50  # Branch-specific prefix (BCS, 21CS, ...) seen
+            if strong_matches[scheme]:
+                score += 100  # High confidence prefix (e.g. BCS401 for 2022)
+            scheme_scores[scheme] = score
+
+        return ClassificationResult(scheme_scores, branch_counts)
+
+    def classify_text(self, text):
+        """Score schemes and branches over every code-like token in text"""
+        return self.classify_codes(_CODE_TOKEN_RE.findall(text.upper()))
+
+
+class ClassificationResult:
+    """Scheme/branch scores with the winning labels and their confidence"""
+
+    def __init__(self, scheme_scores, branch_counts):
+        self.scheme_scores = scheme_scores
+        self.branch_counts = branch_counts
+
+        self.scheme = _best(scheme_scores)
+        self.branch = _best(branch_counts)
+        self.scheme_confidence = self.confidence_for_scheme(self.scheme)
+        self.branch_confidence = _share(branch_counts, self.branch)
+
+    def confidence_for_scheme(self, scheme):
+        """Share of the total scheme score held by scheme (0.0 - 1.0)"""
+        return _share(self.scheme_scores, scheme)
+
+    def to_dict(self):
+        return {
+            "scheme": self.scheme,
+            "scheme_confidence": self.scheme_confidence,
+            "branch": self.branch,
+            "branch_confidence": self.branch_confidence,
+            "scheme_scores": dict(self.scheme_scores),
+            "branch_counts": dict(self.branch_counts)
+        }
+
+
+def _best(scores):
+    """Highest-scoring key (first one wins ties), or None if nothing scored"""
+    if not scores:
+        return None
+    best = max(scores, key=scores.get)
+    return best if scores[best] > 0 else None
+
+
+def _share(scores, key):
+    total = sum(scores.values())
+    if key is None or total <= 0:
+        return 0.0
+    return round(scores.get(key, 0) / total, 4)
@@ -0,0 +1,224 @@
+"""
+Code Resolver - Nearest valid course code for codes garbled by extraction
+Known codes are folded so OCR look-alikes (O/0, I/1, S/5, B/8, ...) coincide,
+held in a BK-tree under bit-parallel Levenshtein distance, and a missed lookup
+is mapped to the closest real code in well under a millisecond; only matches
+that cannot name a different course are used as corrections
+"""
+
+import os
+import threading
+
+CODE_RESOLVER_MAX_DISTANCE = int(os.getenv('CODE_RESOLVER_MAX_DISTANCE', '1'))  # in edits
+CODE_RESOLVER_MIN_CONFIDENCE = float(os.getenv('CODE_RESOLVER_MIN_CONFIDENCE', '0.8'))
+CODE_RESOLVER_MEMO_SIZE = 4096  # corrections remembered per resolver (one per subject data version)
+
+# Characters extraction confuses; each folds to one representative
+_LOOKALIKE_FOLD = str.maketrans("ODILSBZG", "00115826")
+_LOOKALIKE_COST = 0.5  # a look-alike substitution counts as half an edit
+
+
+def fold_code(code):
+    """Map look-alike characters to one representative (BCS4O1 and BCS401 fold alike)"""
+    return code.upper().translate(_LOOKALIKE_FOLD)
+
+
+def is_safe_correction(code, candidate):
+    """True if code can only be a misreading of candidate, not another real course
+
+    Look-alike characters may differ, and a trailing suffix letter may be
+    dropped or added (BCS515 -> BCS515X). A changed digit or branch letter
+    names a different course however close it is (BCS451 is not BCS401).
+    """
+    code, candidate = code.upper(), candidate.upper()
+    if fold_code(code) == fold_code(candidate):
+        return True
+    shorter, longer = sorted((code, candidate), key=len)
+    return (len(longer) == len(shorter) + 1 and len(shorter) > 0 and longer[-1].isalpha()
+            and longer[-2].isdigit() and fold_code(longer[:-1]) == fold_code(shorter))
+
+
+def levenshtein(a, b):
+    """Unit-cost edit distance, bit-parallel over a (Myers/Hyyro)"""
+    return _levenshtein_measure(a)(b)
+
+
+def _levenshtein_measure(a):
+    """Return a function giving the edit distance from a to its argument"""
+    if not a:
+        return len
+    peq = {}
+    for i, char in enumerate(a):
+        peq[char] = peq.get(char, 0) | (1 << i)
+    full = (1 << len(a)) - 1
+    high = 1 << (len(a) - 1)
+
+    def measure(b):
+        pv = full
+        mv = 0
+        score = len(a)
+        for char in b:
+            eq = peq.get(char, 0)
+            xv = eq | mv
+            xh = (((eq & pv) + pv) ^ pv) | eq
+            ph = mv | (~(xh | pv) & full)
+            mh = pv & xh
+            if ph & high:
+                score += 1
+            elif mh & high:
+                score -= 1
+            ph = ((ph << 1) | 1) & full
+            mh = (mh << 1) & full
+            pv = mh | (~(xv | ph) & full)
+            mv = ph & xv
+        return score
+
+    return measure
+
+
+def code_distance(a, b):
+    """Edits between two codes, with look-alike substitutions counted as half an edit"""
+    edits = levenshtein(fold_code(a), fold_code(b))
+    if len(a) == len(b):
+        lookalikes = sum(1 for x, y in zip(a.upper(), b.upper()) if x != y and fold_code(x) == fold_code(y))
+    else:
+        lookalikes = 0  # alignment unknown; count the edits only
+    return edits + lookalikes * _LOOKALIKE_COST
+
+
+class CodeMatch:
+    """Nearest known code for a lookup, with its distance (in edits) and a 0-1 confidence"""
+
+    def __init__(self, code, distance, confidence, candidates, safe=False):
+        self.code = code
+        self.distance = distance
+        self.confidence = confidence
+        self.candidates = candidates  # every code tied at this distance
+        self.safe = safe  # see is_safe_correction
+
+    def to_dict(self):
+        return {
+            "code": self.code,
+            "distance": self.distance,
+            "confidence": self.confidence,
+            "candidates": self.candidates,
+            "safe": self.safe
+        }
+
+
+class BKTree:
+    """Burkhard-Keller tree over strings under an integer metric"""
+
+    def __init__(self, distance=levenshtein):
+        self._distance = distance
+        self._root = None
+        self.size = 0
+
+    def add(self, item):
+        if self._root is None:
+            self._root = (item, {})
+            self.size = 1
+            return
+        node = self._root
+        while True:
+            distance = self._distance(item, node[0])
+            if distance == 0:
+                return  # already present
+            child = node[1].get(distance)
+            if child is None:
+                node[1][distance] = (item, {})
+                self.size += 1
+                return
+            node = child
+
+    def search(self, measure, radius):
+        """Return [(distance, item)] for every item within radius of the query, nearest first
+
+        measure(item) gives the query's distance to an item.
+        """
+        found = []
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node_item, children = stack.pop()
+            distance = measure(node_item)
+            if distance <= radius:
+                found.append((distance, node_item))
+            # Triangle inequality: only children in [d - r, d + r] can be within radius
+            for child_distance, child in children.items():
+                if distance - radius <= child_distance <= distance + radius:
+                    stack.append(child)
+        found.sort()
+        return found
+
+
+class CodeResolver:
+    """Resolves unknown codes to the nearest known one; the index is built on first use"""
+
+    def __init__(self, codes_source, max_distance=CODE_RESOLVER_MAX_DISTANCE):
+        self._codes_source = codes_source  # callable returning every known code
+        self.max_distance = max_distance
+        self._folded = None  # folded code -> [known codes]
+        self._tree = None
+        self._corrections = {}  # (code, min_confidence) -> correct() result
+        self._lock = threading.Lock()
+
+    def _get_index(self):
+        with self._lock:
+            if self._tree is None:
+                folded = {}
+                tree = BKTree()
+                for code in self._codes_source():
+                    code = code.upper()
+                    key = fold_code(code)
+                    if code not in folded.setdefault(key, []):
+                        folded[key].append(code)
+                    tree.add(key)
+                self._folded = folded
+                self._tree = tree
+            return self._folded, self._tree
+
+    def resolve(self, code):
+        """Return a CodeMatch for the nearest known code, or None if nothing is close enough"""
+        code = code.strip().upper()
+        if not code:
+            return None
+        folded, tree = self._get_index()
+        key = fold_code(code)
+
+        if key in folded:
+            keys = [key]  # only look-alike characters differ
+        else:
+            # Widen one edit at a time: small radii prune most of the tree
+            measure = _levenshtein_measure(key)
+            keys = []
+            for radius in range(1, self.max_distance + 1):
+                found = tree.search(measure, radius)
+                if found:
+                    keys = [item for distance, item in found if distance == found[0][0]]
+                    break
+            if not keys:
+                return None
+
+        scored = sorted((code_distance(code, candidate), candidate) for key in keys for candidate in folded[key])
+        best_distance = scored[0][0]
+        candidates = [candidate for distance, candidate in scored if distance == best_distance]
+        # Share of the code that survived, split between equally close candidates
+        confidence = max(0.0, 1.0 - best_distance / len(code)) / len(candidates)
+        safe = len(candidates) == 1 and is_safe_correction(code, candidates[0])
+        return CodeMatch(candidates[0], best_distance, round(confidence, 3), candidates, safe)
+
+    def correct(self, code, min_confidence=CODE_RESOLVER_MIN_CONFIDENCE):
+        """Return the known code an unknown code is a misreading of, or None if that is not certain
+
+        Answers are remembered, so a code looked up for several fields of a
+        result (or in many uploads) is only resolved once.
+        """
+        key = (code.strip().upper(), min_confidence)
+        if key in self._corrections:
+            return self._corrections[key]
+        match = self.resolve(code)
+        corrected = match.code if match and match.safe and match.confidence >= min_confidence else None
+        if len(self._corrections) >= CODE_RESOLVER_MEMO_SIZE:
+            self._corrections.clear()  # garbled codes are rare; start over rather than track recency
+        self._corrections[key] = corrected
+        return corrected
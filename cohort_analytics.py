@@ -0,0 +1,200 @@
+"""
+Cohort Analytics - Class-level statistics over many parsed transcripts
+Parse results are flattened once into columnar arrays (one row per student
+per subject); SGPA distribution, percentiles, per-subject pass rates and grade
+histograms are then a handful of vectorized NumPy reductions
+"""
+
+import json
+import os
+
+try:
+    import numpy as np
+except ImportError:  # optional: analytics unavailable
+    np = None
+
+COHORT_MAX_STUDENTS = int(os.getenv('COHORT_MAX_STUDENTS', '50000'))
+PASS_MARKS = 40  # VTU passing threshold
+SGPA_BINS = list(range(0, 11))  # 0-1, 1-2, ..., 9-10 (10 included in the last bin)
+REPORTED_PERCENTILES = (10, 25, 50, 75, 90)
+
+
+def _student_id(record, position):
+    for field in ("student", "usn", "file"):
+        if record.get(field):
+            return str(record[field])
+    return str(position)
+
+
+class CohortColumns:
+    """Parse results flattened into per-enrolment columns"""
+
+    def __init__(self, results):
+        if np is None:
+            raise RuntimeError("Cohort analytics needs numpy (pip install numpy)")
+        self.students = []
+        self.codes = []
+        self.names = []
+        self.letters = []
+        self.skipped = 0
+        code_positions = {}
+        letter_positions = {}
+        student_column = []
+        subject_column = []
+        letter_column = []
+        totals = []
+        grade_points = []
+        credits = []
+        passed = []
+
+        for position, record in enumerate(results):
+            # A build_result_payload / batch record, or a bare parse_vtu_pdf subjects dict
+            subjects = record.get("subjects") if "subjects" in record or "success" in record else record
+            if not subjects or record.get("success") is False:
+                self.skipped += 1
+                continue
+            student = len(self.students)
+            self.students.append(_student_id(record, position))
+            for code, subject in subjects.items():
+                subject_position = code_positions.get(code)
+                if subject_position is None:
+                    subject_position = code_positions[code] = len(self.codes)
+                    self.codes.append(code)
+                    self.names.append(subject.get("name", code))
+                letter = subject.get("grade", "F")
+                letter_position = letter_positions.get(letter)
+                if letter_position is None:
+                    letter_position = letter_positions[letter] = len(self.letters)
+                    self.letters.append(letter)
+                total = float(subject.get("total", 0))
+                student_column.append(student)
+                subject_column.append(subject_position)
+                letter_column.append(letter_position)
+                totals.append(total)
+                grade_points.append(float(subject.get("grade_point", 0)))
+                credits.append(float(subject.get("credits", 0)))
+                # Same rule as calculate_sgpa's failed list
+                passed.append(not (subject.get("result") == "F" or total < PASS_MARKS))
+
+        self.student = np.array(student_column, dtype=np.int32)
+        self.subject = np.array(subject_column, dtype=np.int32)
+        self.letter = np.array(letter_column, dtype=np.int32)
+        self.total = np.array(totals, dtype=float)
+        self.grade_point = np.array(grade_points, dtype=float)
+        self.credits = np.array(credits, dtype=float)
+        self.passed = np.array(passed, dtype=bool)
+
+    def __len__(self):
+        return len(self.students)
+
+    def sgpa(self):
+        """Every student's SGPA (calculate_sgpa's formula, unrounded)"""
+        count = len(self.students)
+        weighted = np.bincount(self.student, weights=self.credits * self.grade_point, minlength=count)
+        total_credits = np.bincount(self.student, weights=self.credits, minlength=count)
+        return np.divide(weighted, total_credits, out=np.zeros(count), where=total_credits > 0)
+
+
+def _rounded(values):
+    return [round(value, 2) for value in values.tolist()]
+
+
+def _summarize_sgpa(sgpa, students, tail_percent, tail_limit):
+    """Distribution, histogram and top/bottom tails of the SGPA column"""
+    if not len(sgpa):
+        return {"mean": 0.0, "median": 0.0, "std": 0.0, "min": 0.0, "max": 0.0, "percentiles": {},
+                "histogram": {"bins": SGPA_BINS, "counts": [0] * (len(SGPA_BINS) - 1)},
+                "tail_percent": tail_percent, "top_cutoff": None, "bottom_cutoff": None, "top": [], "bottom": []}
+
+    cutoffs = np.percentile(sgpa, [tail_percent, 100 - tail_percent, *REPORTED_PERCENTILES])
+    bottom_cutoff, top_cutoff, reported = cutoffs[0], cutoffs[1], cutoffs[2:]
+    counts, _ = np.histogram(np.clip(sgpa, SGPA_BINS[0], SGPA_BINS[-1]), bins=SGPA_BINS)
+
+    order = np.argsort(-sgpa, kind="stable")
+    top = order[sgpa[order] >= top_cutoff][:tail_limit]
+    bottom = order[::-1][sgpa[order[::-1]] <= bottom_cutoff][:tail_limit]
+    return {
+        "mean": round(float(sgpa.mean()), 2),
+        "median": round(float(np.median(sgpa)), 2),
+        "std": round(float(sgpa.std()), 2),
+        "min": round(float(sgpa.min()), 2),
+        "max": round(float(sgpa.max()), 2),
+        "percentiles": {f"p{percent}": value for percent, value in zip(REPORTED_PERCENTILES, _rounded(reported))},
+        "histogram": {"bins": SGPA_BINS, "counts": counts.tolist()},
+        "tail_percent": tail_percent,
+        "top_cutoff": round(float(top_cutoff), 2),
+        "bottom_cutoff": round(float(bottom_cutoff), 2),
+        "top": [{"student": students[i], "sgpa": round(float(sgpa[i]), 2)} for i in top.tolist()],
+        "bottom": [{"student": students[i], "sgpa": round(float(sgpa[i]), 2)} for i in bottom.tolist()]
+    }
+
+
+def analyze_cohort(results, tail_percent=10, tail_limit=50):
+    """Class-level statistics for an iterable of parse results
+
+    tail_percent picks the top/bottom percentile reported (10 = top and
+    bottom deciles); at most tail_limit students are listed in each.
+    """
+    columns = results if isinstance(results, CohortColumns) else CohortColumns(results)
+    sgpa = columns.sgpa()
+    subject_count = len(columns.codes)
+    letter_count = len(columns.letters)
+
+    enrolled = np.bincount(columns.subject, minlength=subject_count)
+    passed = np.bincount(columns.subject, weights=columns.passed, minlength=subject_count)
+    mark_sums = np.bincount(columns.subject, weights=columns.total, minlength=subject_count)
+    # One bincount over (subject, letter) pairs gives every subject's grade histogram
+    grade_counts = np.bincount(columns.subject * letter_count + columns.letter,
+                               minlength=subject_count * letter_count).reshape(subject_count, letter_count)
+
+    subjects = {}
+    for position in np.argsort(-enrolled, kind="stable").tolist():
+        students = int(enrolled[position])
+        subjects[columns.codes[position]] = {
+            "name": columns.names[position],
+            "students": students,
+            "passed": int(passed[position]),
+            "pass_rate": round(float(passed[position]) / students, 4),
+            "average_total": round(float(mark_sums[position]) / students, 2),
+            "grades": {letter: int(count) for letter, count in zip(columns.letters, grade_counts[position]) if count}
+        }
+
+    overall = grade_counts.sum(axis=0)
+    return {
+        "students": len(columns),
+        "skipped": columns.skipped,
+        "enrolments": int(len(columns.subject)),
+        "sgpa": _summarize_sgpa(sgpa, columns.students, tail_percent, tail_limit),
+        "pass_rate": round(float(columns.passed.mean()), 4) if len(columns.passed) else 0.0,
+        "grades": {letter: int(count) for letter, count in zip(columns.letters, overall) if count},
+        "subjects": subjects
+    }
+
+
+def read_results(path):
+    """Load parse results from a JSON list/object or NDJSON (/parse-batch output) file"""
+    with open(path, encoding="utf-8") as results_file:
+        text = results_file.read()
+    try:
+        document = json.loads(text)
+    except ValueError:
+        return [json.loads(line) for line in text.splitlines() if line.strip()]  # one record per line
+    if isinstance(document, list):
+        return document
+    return document.get("results", [document])
+
+
+# CLI: python cohort_analytics.py results.ndjson [more files...] [--tail 10] [--limit 50]
+if __name__ == "__main__":
+    import argparse
+
+    arg_parser = argparse.ArgumentParser(description="Cohort statistics over /parse-pdf or /parse-batch results")
+    arg_parser.add_argument("files", nargs="+", help="JSON or NDJSON files of parse results")
+    arg_parser.add_argument("--tail", type=int, default=10, help="top/bottom percentile to report")
+    arg_parser.add_argument("--limit", type=int, default=50, help="students listed per tail")
+    args = arg_parser.parse_args()
+
+    cohort = []
+    for file_path in args.files:
+        cohort.extend(read_results(file_path))
+    print(json.dumps(analyze_cohort(cohort, args.tail, args.limit), indent=2))
@@ -0,0 +1,167 @@
+"""
+Course Scanner - Precompiled course-line extraction for VTU transcript text
+All patterns are compiled once at import; the normalized text is scanned by the
+ordered pattern cascade and then by the line/word fallbacks, exactly as before
+"""
+
+import re
+
+# Text normalization (applied to each extracted page)
+_WHITESPACE_RE = re.compile(r'\s+')
+_SPECIAL_CHARS_RE = re.compile(r'[^\w\s&()\-\.]')
+
+# Subject name: letters, spaces and '&'. The old "(?: [A-Z]+)*" tail matched
+# nothing the character class didn't already cover, but made failed matches
+# backtrack exponentially in the number of words.
+_NAME = r"([A-Z &]+)"
+_MARKS = r"\s+(\d+)\s+(\d+)\s+(\d+)"
+
+# Ordered course-line patterns; the first one with any match wins.
+# Names keep the numbering of the original nine-pattern list.
+COURSE_LINE_PATTERNS = [
+    # Standard VTU format with result (BCS401 format)
+    ("pattern_1", re.compile(r"([A-Z]{3,4}\d{3}[A-Z]?)\s+" + _NAME + _MARKS + r"\s+([PFAXWNE])", re.IGNORECASE)),
+    # Alternative format with result
+    ("pattern_2", re.compile(r"([A-Z]{3,4}\d{3}[A-Z]?)\s+" + _NAME + _MARKS + r"\s+([A-Z]+)", re.IGNORECASE)),
+    # Compact format without result (pattern 5 was an exact duplicate of 4)
+    ("pattern_3", re.compile(r"([A-Z]{3,4}\d{3}[A-Z]?)\s+" + _NAME + _MARKS, re.IGNORECASE)),
+    # Legacy VTU format (22CS101 format)
+    ("pattern_6", re.compile(r"([A-Z]{2}\d{2}[A-Z]{2,4}\d{3})\s+" + _NAME + _MARKS + r"\s+([PFAXWNE])", re.IGNORECASE)),
+    ("pattern_7", re.compile(r"([A-Z]{2}\d{2}[A-Z]{2,4}\d{3})\s+" + _NAME + _MARKS, re.IGNORECASE)),
+    # Ultra-flexible - any course code followed by numbers
+    ("pattern_8", re.compile(r"([A-Z]{2,5}\d{2,4}[A-Z]?)\s+" + _NAME + _MARKS, re.IGNORECASE)),
+    # Even more flexible - course code anywhere in line with marks
+    ("pattern_9", re.compile(r"([A-Z]{2,5}\d{2,4}[A-Z]?)[^0-9]*(\d+)[^0-9]*(\d+)[^0-9]*(\d+)", re.IGNORECASE)),
+]
+
+# Every pattern except the last needs three whitespace-separated numbers;
+# one cheap search lets the cascade skip them all on text without such a run.
+_MARKS_RUN_RE = re.compile(r"\d\s+\d+\s+\d")
+_PATTERNS_NEEDING_MARKS_RUN = len(COURSE_LINE_PATTERNS) - 1
+
+# Fallback stages
+_CODE_SEARCH_RE = re.compile(r'([A-Z]{2,5}\d{2,4}[A-Z]?)', re.IGNORECASE)
+_CODE_WORD_RE = re.compile(r'[A-Z]{2,5}\d{2,4}[A-Z]?', re.IGNORECASE)
+_NUMBER_RE = re.compile(r'\b(\d+)\b')
+_DIGITS_RE = re.compile(r'\d+')
+_NAME_JUNK_RE = re.compile(r'[^\w\s&]')
+
+
+def normalize_text(text):
+    """Collapse whitespace and strip special characters from extracted PDF text"""
+    text = _WHITESPACE_RE.sub(' ', text)  # Normalize whitespace
+    return _SPECIAL_CHARS_RE.sub(' ', text)  # Remove special chars but keep important ones
+
+
+def has_course_lines(text):
+    """Cheap check for at least one code + name + marks line (any marks-based pattern)"""
+    # The most general marks-based pattern also matches everything the
+    # stricter ones do, so one search answers for all of them
+    return _MARKS_RUN_RE.search(text) is not None and COURSE_LINE_PATTERNS[-2][1].search(text) is not None
+
+
+def scan_course_lines(text):
+    """Extract course-line records from normalized text
+
+    Returns (matches, strategy) where matches is a list of tuples
+    (code, name, internal, external, total[, result]) and strategy names the
+    pattern or fallback that produced them (None if nothing matched).
+    """
+    has_marks_run = _MARKS_RUN_RE.search(text) is not None
+
+    for index, (name, pattern) in enumerate(COURSE_LINE_PATTERNS):
+        if index < _PATTERNS_NEEDING_MARKS_RUN and not has_marks_run:
+            continue
+        matches = pattern.findall(text)
+        if matches:
+            return matches, name
+
+    # If no matches found, try ultra-aggressive parsing
+    matches = _ultra_aggressive_parsing(text)
+    if matches:
+        return matches, "ultra_aggressive"
+
+    # If still no matches, try fallback parsing
+    matches = _fallback_parsing(text)
+    if matches:
+        return matches, "fallback"
+
+    return [], None
+
+
+def _ultra_aggressive_parsing(text):
+    """Ultra-aggressive parsing that can handle any VTU format"""
+    matches = []
+    lines = text.split('\n')
+
+    for line in lines:
+        line = line.strip()
+        if len(line) < 10:  # Skip very short lines
+            continue
+
+        # Look for ANY course code pattern (the legacy and BCS formats are
+        # both special cases of this one)
+        code_match = _CODE_SEARCH_RE.search(line)
+        if not code_match:
+            continue
+        code = code_match.group(1).upper()
+
+        # Extract ALL numbers from the line
+        numbers = _NUMBER_RE.findall(line)
+
+        # Try to identify which numbers are marks
+        if len(numbers) >= 3:
+            # Assume first 3 numbers are internal, external, total
+            internal = int(numbers[0])
+            external = int(numbers[1])
+            total = int(numbers[2])
+
+            # Validate: total should be sum of internal + external (approximately)
+            if abs(total - (internal + external)) <= 5:  # Allow small difference
+                # Extract subject name
+                name_part = line[line.find(code) + len(code):].strip()
+                # Remove numbers and special chars from name
+                name = _DIGITS_RE.sub('', name_part)
+                name = _NAME_JUNK_RE.sub(' ', name).strip()
+                name = name[:50] if len(name) > 50 else name  # Limit length
+
+                if name:
+                    matches.append((code, name, internal, external, total, "P"))
+
+    return matches
+
+
+def _fallback_parsing(text):
+    """Last resort parsing - extract any course-like data"""
+    matches = []
+
+    # Split into words and look for patterns
+    words = text.split()
+
+    for i, word in enumerate(words):
+        # Look for course code patterns
+        if _CODE_WORD_RE.fullmatch(word):
+            code = word.upper()
+
+            # Look for numbers after this code
+            numbers = []
+            for j in range(i+1, min(i+10, len(words))):
+                if words[j].isdigit() and len(words[j]) <= 3:  # Valid mark
+                    numbers.append(int(words[j]))
+                    if len(numbers) >= 3:
+                        break
+
+            if len(numbers) >= 3:
+                internal, external, total = numbers[0], numbers[1], numbers[2]
+
+                # Try to get subject name from surrounding words
+                name_words = []
+                for j in range(max(0, i-5), i):
+                    if words[j].isalpha() and len(words[j]) > 2:
+                        name_words.append(words[j])
+
+                name = " ".join(name_words[-3:]) if name_words else "UNKNOWN SUBJECT"
+
+                matches.append((code, name.upper(), internal, external, total, "P"))
+
+    return matches
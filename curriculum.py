@@ -0,0 +1,142 @@
+"""
+Curriculum - Per-(scheme, branch, semester) aggregates computed once at load
+Total and expected credits, course counts by type and elective groups are
+built in one pass over the compiled subject index; each distinct /curriculum
+response is serialized once and carries a content ETag
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+
+from subject_data import SnapshotCache
+
+CURRICULUM_MAX_AGE = int(os.getenv('CURRICULUM_MAX_AGE', '3600'))  # seconds clients/CDNs may cache
+
+# Elective options share a code stem and differ by a trailing letter (BCS613A/B/C)
+_ELECTIVE_CODE_RE = re.compile(r'^(.*\d)([A-Z])$')
+
+
+def _semester_sort_key(semester):
+    # Numbered semesters first, in order, then elective pools (PEC, OEC, ...)
+    return (0, int(semester), "") if semester.isdigit() else (1, 0, semester)
+
+
+def _summarize(entries):
+    """Aggregate one semester's (code, credits, type) entries"""
+    total_credits = 0
+    counts_by_type = {}
+    stems = {}
+    for code, credits, subject_type in entries:
+        total_credits += credits
+        counts_by_type[subject_type] = counts_by_type.get(subject_type, 0) + 1
+        match = _ELECTIVE_CODE_RE.match(code)
+        if match:
+            stems.setdefault(match.group(1), []).append((code, credits, subject_type))
+
+    elective_groups = []
+    expected_credits = total_credits
+    for stem, options in stems.items():
+        if len(options) < 2:
+            continue
+        # A student takes one option per group
+        group_credits = max(credits for _, credits, _ in options)
+        expected_credits -= sum(credits for _, credits, _ in options) - group_credits
+        elective_groups.append({
+            "group": stem,
+            "type": options[0][2],
+            "credits": group_credits,
+            "options": [code for code, _, _ in options]
+        })
+
+    return {
+        "total_credits": total_credits,
+        "expected_credits": expected_credits,
+        "course_count": len(entries),
+        "counts_by_type": counts_by_type,
+        "elective_groups": elective_groups
+    }
+
+
+class CurriculumCatalog:
+    """Precomputed curriculum aggregates with cached, ETagged JSON responses"""
+
+    def __init__(self, rows):
+        grouped = {}
+        for scheme, branch, semester, code, credits, subject_type in rows:
+            grouped.setdefault(scheme, {}).setdefault(branch, {}).setdefault(semester, []).append(
+                (code, credits, subject_type)
+            )
+
+        self.schemes = {}
+        for scheme, branches in grouped.items():
+            self.schemes[scheme] = {}
+            for branch, semesters in branches.items():
+                summaries = {
+                    semester: _summarize(semesters[semester])
+                    for semester in sorted(semesters, key=_semester_sort_key)
+                }
+                self.schemes[scheme][branch] = {
+                    "total_credits": sum(summary["total_credits"] for summary in summaries.values()),
+                    "expected_credits": sum(summary["expected_credits"] for semester, summary in summaries.items()
+                                            if semester.isdigit()),
+                    "semesters": summaries
+                }
+
+        self._responses = {}
+        self._lock = threading.Lock()
+
+    def select(self, scheme=None, branch=None, semester=None):
+        """Return the aggregates narrowed by the given filters, or None if a filter matches nothing"""
+        if scheme is None:
+            return {"schemes": self.schemes}
+        branches = self.schemes.get(scheme)
+        if branches is None:
+            return None
+        if branch is None:
+            return {"scheme": scheme, "branches": branches}
+        aggregates = branches.get(branch)
+        if aggregates is None:
+            return None
+        if semester is None:
+            return {"scheme": scheme, "branch": branch, **aggregates}
+        summary = aggregates["semesters"].get(str(semester))
+        if summary is None:
+            return None
+        return {"scheme": scheme, "branch": branch, "semester": str(semester), **summary}
+
+    def response(self, scheme=None, branch=None, semester=None):
+        """Return (json_bytes, etag) for a filter combination, serialized once; None if unknown"""
+        key = (scheme, branch, None if semester is None else str(semester))
+        with self._lock:
+            cached = self._responses.get(key)
+        if cached is not None:
+            return cached
+
+        payload = self.select(*key)
+        if payload is None:
+            return None
+        body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        cached = (body, hashlib.sha256(body).hexdigest()[:32])
+        with self._lock:
+            self._responses[key] = cached
+        return cached
+
+    def total_credits(self, scheme, branch):
+        aggregates = self.schemes.get(scheme, {}).get(branch)
+        return aggregates["total_credits"] if aggregates else 0
+
+
+_catalog = SnapshotCache(lambda snapshot: CurriculumCatalog(snapshot.index.iter_curriculum()))
+
+
+def get_curriculum():
+    """Return the curriculum aggregates for the live subject data, rebuilt after a reload"""
+    return _catalog.get()
+
+
+def get_total_credits(scheme, branch):
+    """Calculate total credits for a scheme and branch"""
+    return get_curriculum().total_credits(scheme, branch)
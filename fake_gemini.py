@@ -0,0 +1,132 @@
+"""
+Fake Gemini - Local stand-in for the generateContent endpoint parse_with_gemini_ai calls
+Answers each registered transcript with its courses after a configurable
+latency and injects HTTP errors and malformed JSON at configurable rates, so
+the parser can be load-tested without the real API (point GEMINI_API_BASE at it)
+"""
+
+import base64
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_ERROR_STATUSES = (429, 500, 503)
+
+
+class FakeGeminiServer:
+    """Threaded HTTP server speaking just enough of generateContent for the parser"""
+
+    def __init__(self, latency=1.0, jitter=0.0, error_rate=0.0, malformed_rate=0.0, seed=0,
+                 host="127.0.0.1", port=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.malformed_rate = malformed_rate
+        self._random = random.Random(seed)
+        self._transcripts = {}
+        self._lock = threading.Lock()
+        self.counters = {"requests": 0, "answered": 0, "errors": 0, "malformed": 0, "unknown_pdf": 0}
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def register(self, pdf_bytes, expected):
+        """Make the fake answer this PDF with these courses ({code: {internal, external, total, result}})"""
+        with self._lock:
+            self._transcripts[hashlib.sha256(pdf_bytes).hexdigest()] = [
+                {"code": code, "name": course.get("name", "SUBJECT"), "internal": course["internal"],
+                 "external": course["external"], "total": course["total"], "result": course["result"]}
+                for code, course in expected.items()
+            ]
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-gemini", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counters)
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def _decide(self):
+        """Latency and outcome ("ok", "error" or "malformed") for one call"""
+        with self._lock:
+            delay = max(0.0, self._random.gauss(self.latency, self.jitter)) if self.jitter else self.latency
+            roll = self._random.random()
+            status = self._random.choice(_ERROR_STATUSES)
+        if roll < self.error_rate:
+            return delay, "error", status
+        if roll < self.error_rate + self.malformed_rate:
+            return delay, "malformed", 200
+        return delay, "ok", 200
+
+    def _answer(self, body):
+        """(status, response document) for one generateContent request body"""
+        self._count("requests")
+        delay, outcome, status = self._decide()
+        time.sleep(delay)
+        if outcome == "error":
+            self._count("errors")
+            return status, {"error": {"code": status, "message": "Injected failure", "status": "UNAVAILABLE"}}
+
+        pdf_bytes = b""
+        for part in json.loads(body)["contents"][0]["parts"]:
+            if "inline_data" in part:
+                pdf_bytes = base64.b64decode(part["inline_data"]["data"])
+        with self._lock:
+            courses = self._transcripts.get(hashlib.sha256(pdf_bytes).hexdigest())
+        if courses is None:
+            self._count("unknown_pdf")
+            courses = []
+
+        text = json.dumps(courses)
+        if outcome == "malformed":
+            self._count("malformed")
+            # Either an unterminated array or one that is not valid JSON
+            text = text[:len(text) // 2] if self._random.random() < 0.5 else text.replace('"', "'")
+        else:
+            self._count("answered")
+        return 200, {"candidates": [{"content": {"parts": [{"text": f"```json\n{text}\n```"}], "role": "model"}}]}
+
+    def _handler_class(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like the real endpoint
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if not self.path.split("?")[0].endswith(":generateContent"):
+                    status, document = 404, {"error": {"code": 404, "message": "Unknown method"}}
+                else:
+                    try:
+                        status, document = fake._answer(body)
+                    except (ValueError, KeyError, IndexError) as e:
+                        status, document = 400, {"error": {"code": 400, "message": str(e)}}
+                payload = json.dumps(document).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass  # one line per call would drown the load test output
+
+        return Handler
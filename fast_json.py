@@ -0,0 +1,44 @@
+"""
+Fast JSON - orjson-backed encoding for API responses, when orjson is installed
+Produces the same documents as Flask's default provider (sorted keys,
+dataclasses such as SubjectRecord as objects) several times faster; without
+orjson everything goes through the standard json module
+"""
+
+import dataclasses
+import json
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional: standard json only
+    orjson = None
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+
+
+def _default(value):
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    return DefaultJSONProvider.default(value)
+
+
+def dumps(obj):
+    """Compact JSON text for obj (sorted keys, dataclasses as objects)"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS).decode("utf-8")
+        except TypeError:
+            pass  # something orjson rejects (e.g. huge ints): use the standard encoder
+    return json.dumps(obj, default=_default, sort_keys=True, separators=(",", ":"))
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that encodes compact responses with orjson"""
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs.get("indent"):
+            return super().dumps(obj, **kwargs)  # pretty-printed debug output
+        return dumps(obj)
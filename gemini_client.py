@@ -0,0 +1,225 @@
+"""
+Gemini Client - Pooled, bounded-concurrency client for the Gemini generateContent API
+Keeps connections alive across uploads, caps concurrent calls, splits connect
+and read timeouts and stops calling Gemini while it is failing (circuit breaker)
+"""
+
+import base64
+import json
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import tracing
+
+GEMINI_API_BASE = os.getenv('GEMINI_API_BASE', 'https://generativelanguage.googleapis.com')
+GEMINI_MODEL = os.getenv('GEMINI_MODEL', 'gemini-2.0-flash')
+GEMINI_MAX_CONCURRENCY = int(os.getenv('GEMINI_MAX_CONCURRENCY', '8'))
+GEMINI_QUEUE_TIMEOUT = float(os.getenv('GEMINI_QUEUE_TIMEOUT', '2'))  # wait for a free slot
+GEMINI_CONNECT_TIMEOUT = float(os.getenv('GEMINI_CONNECT_TIMEOUT', '3.05'))
+GEMINI_READ_TIMEOUT = float(os.getenv('GEMINI_READ_TIMEOUT', '30'))
+GEMINI_FAILURE_THRESHOLD = int(os.getenv('GEMINI_FAILURE_THRESHOLD', '5'))
+GEMINI_RESET_TIMEOUT = float(os.getenv('GEMINI_RESET_TIMEOUT', '30'))  # seconds before probing again
+
+
+class InlinePDFRequestBody:
+    """generateContent JSON body (prompt + inline PDF) streamed from a shared buffer
+
+    The PDF is base64-encoded chunk by chunk as the request is sent, so neither
+    a copy of the PDF nor its full base64 text is ever held in memory.
+    """
+
+    _RAW_CHUNK = 48 * 1024  # multiple of 3, so chunks encode without padding
+
+    def __init__(self, prompt, pdf_view):
+        self._prefix = (
+            '{"contents": [{"parts": [{"text": ' + json.dumps(prompt) +
+            '}, {"inline_data": {"mime_type": "application/pdf", "data": "'
+        ).encode('utf-8')
+        self._suffix = b'"}}]}]}'
+        self._view = pdf_view
+        self._length = len(self._prefix) + 4 * ((len(pdf_view) + 2) // 3) + len(self._suffix)
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        yield self._prefix
+        for start in range(0, len(self._view), self._RAW_CHUNK):
+            yield base64.b64encode(self._view[start:start + self._RAW_CHUNK])
+        yield self._suffix
+
+
+class CircuitBreaker:
+    """Closed -> open after repeated failures -> half-open probe after a cool-down"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=GEMINI_FAILURE_THRESHOLD, reset_timeout=GEMINI_RESET_TIMEOUT, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._probe_in_flight = False
+
+    def allow_request(self):
+        """Return True if a call may go out now"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and self._clock() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True  # let exactly one probe through
+                return True
+            return False
+
+    def release_probe(self):
+        """Hand back a permission from allow_request() for a call that was never made"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            self._probe_in_flight = False
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = self._clock()
+
+
+class GeminiClient:
+    """Reusable Gemini generateContent client with pooling, limits and counters"""
+
+    def __init__(self, base_url=GEMINI_API_BASE, model=GEMINI_MODEL,
+                 max_concurrency=GEMINI_MAX_CONCURRENCY, queue_timeout=GEMINI_QUEUE_TIMEOUT,
+                 connect_timeout=GEMINI_CONNECT_TIMEOUT, read_timeout=GEMINI_READ_TIMEOUT,
+                 breaker=None):
+        self.base_url = base_url.rstrip('/')
+        self.model = model
+        self.timeout = (connect_timeout, read_timeout)
+        self.queue_timeout = queue_timeout
+        self.breaker = breaker or CircuitBreaker()
+        self.max_concurrency = max_concurrency
+        self._lock = threading.Lock()
+        self._session = None
+        self._session_pid = None
+        self._slots = None
+        self.counters = {
+            "requests": 0,
+            "successes": 0,
+            "failures": 0,
+            "timeouts": 0,
+            "skipped_circuit_open": 0,
+            "skipped_busy": 0,
+            "in_flight": 0,
+            "latency_total_seconds": 0.0,
+            "latency_max_seconds": 0.0
+        }
+
+    @property
+    def session(self):
+        """This process's keep-alive session and slots, rebuilt in a forked child
+
+        A child must not reuse the parent's pooled sockets (both ends would
+        write into the same TLS stream) or slots held by the parent's threads.
+        """
+        if self._session_pid != os.getpid():
+            with self._lock:
+                if self._session_pid != os.getpid():
+                    # Keep-alive connection pool sized to the concurrency cap
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_concurrency)
+                    session.mount('https://', adapter)
+                    session.mount('http://', adapter)
+                    self._session = session
+                    self._slots = threading.BoundedSemaphore(self.max_concurrency)
+                    self._session_pid = os.getpid()
+        return self._session
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self.counters[name] += amount
+
+    def generate_content(self, api_key, payload=None, body=None):
+        """POST payload (or a pre-encoded JSON body) to generateContent and return the decoded response
+
+        Returns None without calling the API when every slot stays busy for
+        queue_timeout or the circuit is open; returns None on any failed call.
+        """
+        # Checked first, so calls fail fast instead of queueing for slots while Gemini is down
+        if not self.breaker.allow_request():
+            self._count("skipped_circuit_open")
+            return None
+
+        session = self.session
+        slots = self._slots
+        if not slots.acquire(timeout=self.queue_timeout):
+            self.breaker.release_probe()
+            self._count("skipped_busy")
+            return None
+
+        url = f"{self.base_url}/v1beta/models/{self.model}:generateContent"
+        self._count("requests")
+        self._count("in_flight")
+        started = time.perf_counter()
+        try:
+            if body is not None:
+                response = session.post(url, params={"key": api_key}, data=body, timeout=self.timeout,
+                                             headers={"Content-Type": "application/json"})
+            else:
+                response = session.post(url, params={"key": api_key}, json=payload, timeout=self.timeout)
+            if response.status_code != 200:
+                tracing.log("Gemini API request failed", level="warning", status=response.status_code)
+                self._record_failure()
+                return None
+            body = response.json()
+            self.breaker.record_success()
+            self._count("successes")
+            return body
+        except requests.Timeout:
+            tracing.log("Gemini API request timed out", level="warning")
+            self._count("timeouts")
+            self._record_failure()
+            return None
+        except (requests.RequestException, ValueError) as e:
+            tracing.log("Gemini API request error", level="warning", error=str(e))
+            self._record_failure()
+            return None
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.counters["in_flight"] -= 1
+                self.counters["latency_total_seconds"] += elapsed
+                self.counters["latency_max_seconds"] = max(self.counters["latency_max_seconds"], elapsed)
+            slots.release()
+
+    def _record_failure(self):
+        self.breaker.record_failure()
+        self._count("failures")
+
+    def stats(self):
+        """Return counters plus breaker state as a plain dict"""
+        with self._lock:
+            stats = dict(self.counters)
+        completed = stats["successes"] + stats["failures"]
+        stats["latency_avg_seconds"] = round(stats["latency_total_seconds"] / completed, 4) if completed else 0.0
+        stats["circuit_state"] = self.breaker.state
+        stats["consecutive_failures"] = self.breaker.consecutive_failures
+        stats["max_concurrency"] = self.max_concurrency
+        return stats
@@ -0,0 +1,122 @@
+"""
+Gemini Response Store - Persistent SQLite cache of Gemini extraction results
+Raw subject arrays are keyed on the PDF content hash and the prompt version,
+survive restarts and are shared by every worker process on the host
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+GEMINI_STORE_PATH = os.getenv('GEMINI_STORE_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gemini_cache.sqlite3'))
+GEMINI_STORE_MAX_BYTES = int(os.getenv('GEMINI_STORE_MAX_BYTES', str(64 * 1024 * 1024)))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS gemini_responses (
+    content_hash TEXT NOT NULL,
+    prompt_version TEXT NOT NULL,
+    subjects_json TEXT NOT NULL,
+    size_bytes INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_used_at REAL NOT NULL,
+    PRIMARY KEY (content_hash, prompt_version)
+);
+CREATE INDEX IF NOT EXISTS idx_gemini_responses_last_used ON gemini_responses (last_used_at);
+"""
+
+
+class GeminiResponseStore:
+    """SQLite-backed store of raw Gemini subject arrays with size-based LRU eviction"""
+
+    def __init__(self, path=GEMINI_STORE_PATH, max_bytes=GEMINI_STORE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _connect(self):
+        """Return this thread's connection, reopening it after a fork"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")  # concurrent readers across workers
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, content_hash, prompt_version):
+        """Return the stored subject array, or None if this PDF/prompt was never seen"""
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT subjects_json FROM gemini_responses WHERE content_hash = ? AND prompt_version = ?",
+            (content_hash, prompt_version)
+        ).fetchone()
+
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+
+        conn.execute(
+            "UPDATE gemini_responses SET last_used_at = ? WHERE content_hash = ? AND prompt_version = ?",
+            (time.time(), content_hash, prompt_version)
+        )
+        return json.loads(row[0])
+
+    def put(self, content_hash, prompt_version, subjects_data):
+        """Store a raw subject array and evict least recently used rows past max_bytes"""
+        subjects_json = json.dumps(subjects_data)
+        now = time.time()
+        conn = self._connect()
+        conn.execute(
+            "INSERT OR REPLACE INTO gemini_responses "
+            "(content_hash, prompt_version, subjects_json, size_bytes, created_at, last_used_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (content_hash, prompt_version, subjects_json, len(subjects_json), now, now)
+        )
+        self._evict(conn)
+
+    def _evict(self, conn):
+        total = conn.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM gemini_responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = conn.execute(
+                "SELECT content_hash, prompt_version, size_bytes FROM gemini_responses ORDER BY last_used_at"
+            ).fetchall()
+            for content_hash, prompt_version, size_bytes in rows:
+                if total <= self.max_bytes:
+                    break
+                conn.execute(
+                    "DELETE FROM gemini_responses WHERE content_hash = ? AND prompt_version = ?",
+                    (content_hash, prompt_version)
+                )
+                total -= size_bytes
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def stats(self):
+        """Return row count, stored bytes and this process's hit/miss counters"""
+        count, total = self._connect().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM gemini_responses"
+        ).fetchone()
+        with self._lock:
+            return {
+                "path": self.path,
+                "entries": count,
+                "size_bytes": total,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses
+            }
@@ -0,0 +1,111 @@
+"""
+Grading - Table-driven grade letters and grade points per VTU scheme
+Every whole mark from 0 to 100 is mapped to its grade once per scheme, so a
+lookup is a list index instead of a sort over the thresholds; NumPy (when
+installed) grades whole cohorts of marks and their SGPAs in one call
+"""
+
+import math
+
+try:
+    import numpy as np
+except ImportError:  # optional: bulk grading unavailable
+    np = None
+
+MAX_MARKS = 100
+PASS_MARKS = 40  # VTU passing threshold
+
+
+class GradeTable:
+    """Grade letter and grade point for every whole mark of one scheme"""
+
+    def __init__(self, marks_to_grade, grading):
+        thresholds = sorted(marks_to_grade.items())
+        self.letters = []
+        for mark in range(MAX_MARKS + 1):
+            letter = "F"  # Default to F
+            for threshold, grade_letter in thresholds:
+                if mark >= threshold:
+                    letter = grade_letter
+            self.letters.append(letter)
+        self.points = [grading.get(letter, 0) for letter in self.letters]
+
+        # Same tables as arrays for bulk grading
+        if np is not None:
+            self.letter_names = sorted(set(self.letters))
+            self._letter_index = np.array([self.letter_names.index(letter) for letter in self.letters], dtype=np.intp)
+            self._point_array = np.array(self.points, dtype=float)
+
+    @staticmethod
+    def _slot(marks):
+        # Thresholds are whole marks, so a fractional mark grades like its floor
+        if not marks > 0:
+            return 0  # also NaN, which never passes a threshold
+        if marks >= MAX_MARKS:
+            return MAX_MARKS
+        return math.floor(marks)
+
+    def grade(self, marks):
+        """Return (grade letter, grade point) for marks"""
+        slot = self._slot(marks)
+        return self.letters[slot], self.points[slot]
+
+    def letter(self, marks):
+        return self.letters[self._slot(marks)]
+
+    def point(self, marks):
+        return self.points[self._slot(marks)]
+
+    def grade_array(self, marks):
+        """Vectorized grade(): (letter index array, grade point array, missing mask) for any shape of marks
+
+        NaN marks are missing: grade point 0 and masked out. Letter indexes
+        point into self.letter_names.
+        """
+        if np is None:
+            raise RuntimeError("Bulk grading needs numpy (pip install numpy)")
+        marks = np.asarray(marks, dtype=float)
+        missing = np.isnan(marks)
+        slots = np.clip(np.where(missing, 0.0, marks), 0, MAX_MARKS).astype(np.intp)  # truncates = floor
+        points = np.where(missing, 0.0, self._point_array[slots])
+        return self._letter_index[slots], points, missing
+
+
+def build_grade_tables(schemes):
+    """Return {scheme: GradeTable} for a VTU_SCHEMES-style mapping"""
+    return {
+        scheme: GradeTable(config["marks_to_grade"], config["grading"])
+        for scheme, config in schemes.items()
+    }
+
+
+def grade_cohort(table, marks, credits):
+    """Grade a (students x subjects) array of marks and compute every student's SGPA at once
+
+    credits is one value per subject, or a full (students x subjects)
+    array. NaN marks are subjects a student did not take and count for
+    nothing; failed subjects count towards credits, as in calculate_sgpa.
+    """
+    letters, points, missing = table.grade_array(marks)
+    if letters.ndim != 2:
+        raise ValueError("marks must be a two-dimensional (students x subjects) array")
+    marks = np.asarray(marks, dtype=float)
+    credits = np.asarray(credits, dtype=float)
+    if credits.shape not in (marks.shape[1:], marks.shape):
+        raise ValueError(f"credits shape {credits.shape} does not match marks shape {marks.shape}")
+    credits = np.broadcast_to(credits, marks.shape)
+    credits = np.where(missing, 0.0, credits)
+
+    total_credits = credits.sum(axis=1)
+    total_weighted_points = (credits * points).sum(axis=1)
+    sgpa = np.divide(total_weighted_points, total_credits,
+                     out=np.zeros_like(total_weighted_points), where=total_credits > 0)
+    return {
+        "letters": letters,
+        "grade_points": points,
+        "missing": missing,
+        "sgpa": sgpa,
+        "total_credits": total_credits,
+        "total_weighted_points": total_weighted_points,
+        "failed_count": ((marks < PASS_MARKS) & ~missing).sum(axis=1)
+    }
@@ -0,0 +1,254 @@
+"""
+Load Test - Drive /parse-pdf under gunicorn against a local fake Gemini
+For each server configuration (workers x threads, parse policy) the app is
+started with GEMINI_API_BASE pointing at fake_gemini, synthetic transcripts are
+posted at a fixed arrival rate, and throughput, latency percentiles, error
+rates and how often parsing fell back from Gemini are reported side by side
+"""
+
+import os
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from benchmark import percentile
+from fake_gemini import FakeGeminiServer
+from transcript_generator import generate_corpus
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+_CONFIG_RE = re.compile(r'^(\d+)x(\d+)(?::([\w-]+))?$')
+_SERIES_RE = re.compile(r'^(\w+)\{(\w+)="([^"]*)"\}\s+(\S+)$', re.MULTILINE)
+
+
+def parse_config(text, default_policy="gemini-first"):
+    """"4x8" or "4x8:race" -> {"workers": 4, "threads": 8, "policy": ...}"""
+    match = _CONFIG_RE.match(text.strip())
+    if not match:
+        raise ValueError(f"Server configuration must look like 4x8 or 4x8:race, got {text!r}")
+    return {"workers": int(match.group(1)), "threads": int(match.group(2)),
+            "policy": match.group(3) or default_policy}
+
+
+def parse_metrics_text(text):
+    """{(metric, label value): number} for the single-label series of a /metrics scrape"""
+    return {(name, label): float(value) for name, _, label, value in _SERIES_RE.findall(text)}
+
+
+def _free_port():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+class AppServer:
+    """The Flask app under gunicorn (gthread workers) in a child process"""
+
+    def __init__(self, workers, threads, policy, gemini_url, work_dir, extra_env=None):
+        self.port = _free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        self.log_path = os.path.join(work_dir, f"gunicorn-{workers}x{threads}-{policy}.log")
+        env = dict(os.environ)
+        env.update({
+            "GEMINI_API_BASE": gemini_url,
+            "GEMINI_API_KEY": "load-test",
+            "PARSE_POLICY": policy,
+            # Fresh stores, so no transcript is answered from an earlier run
+            "GEMINI_STORE_PATH": os.path.join(work_dir, "gemini_cache.sqlite3"),
+            "METRICS_DIR": os.path.join(work_dir, "metrics"),
+            "TRACE_LOG_LEVEL": "WARNING",
+        })
+        env.update(extra_env or {})
+        self.command = [sys.executable, "-m", "gunicorn", "--workers", str(workers), "--threads", str(threads),
+                        "--worker-class", "gthread", "--timeout", "120", "--bind", f"127.0.0.1:{self.port}",
+                        "vtu_pdf_parser:app"]
+        self.env = env
+        self.process = None
+
+    def start(self, ready_timeout=60):
+        self._log = open(self.log_path, "wb")
+        self.process = subprocess.Popen(self.command, cwd=APP_DIR, env=self.env, stdout=self._log,
+                                        stderr=subprocess.STDOUT)
+        deadline = time.monotonic() + ready_timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"gunicorn exited with {self.process.returncode}, see {self.log_path}")
+            try:
+                if requests.get(f"{self.url}/schemes", timeout=1).status_code == 200:
+                    return self
+            except requests.RequestException:
+                pass
+            time.sleep(0.2)
+        self.stop()
+        raise RuntimeError(f"gunicorn did not answer within {ready_timeout}s, see {self.log_path}")
+
+    def stop(self):
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+        self._log.close()
+
+    def scrape(self):
+        return parse_metrics_text(requests.get(f"{self.url}/metrics", timeout=10).text)
+
+
+def drive(url, transcripts, rate, timeout=120, max_in_flight=256):
+    """Post transcripts to /parse-pdf at a fixed arrival rate (open loop); returns one record per request
+
+    Latency is measured from each request's scheduled start, so time spent
+    waiting for a free client slot counts against the server instead of
+    hiding behind it.
+    """
+    records = []
+    records_lock = threading.Lock()
+    session_local = threading.local()
+
+    def send(scheduled, pdf_bytes):
+        session = getattr(session_local, "session", None)
+        if session is None:
+            session = session_local.session = requests.Session()
+        record = {"scheduled": scheduled}
+        try:
+            response = session.post(f"{url}/parse-pdf", files={"pdf_file": ("result.pdf", pdf_bytes, "application/pdf")},
+                                    timeout=timeout)
+            record["status"] = response.status_code
+            record["cache"] = response.headers.get("X-Cache")
+        except requests.RequestException as e:
+            record["status"] = type(e).__name__
+        record["latency_ms"] = (time.perf_counter() - scheduled) * 1000
+        with records_lock:
+            records.append(record)
+
+    with ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="load") as executor:
+        started = time.perf_counter()
+        for position, transcript in enumerate(transcripts):
+            scheduled = started + position / rate
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            executor.submit(send, scheduled, transcript["pdf"])
+    return records, time.perf_counter() - started
+
+
+def _counter_deltas(before, after, metric):
+    return {label: after[(name, label)] - before.get((name, label), 0.0)
+            for name, label in after if name == metric and after[(name, label)] - before.get((name, label), 0.0)}
+
+
+def summarize(records, elapsed, metrics_before, metrics_after, gemini_before, gemini_after):
+    """Throughput, latency percentiles, errors and Gemini fallback rate for one configuration"""
+    latencies = [record["latency_ms"] for record in records if record["status"] == 200]
+    errors = {}
+    for record in records:
+        if record["status"] != 200:
+            errors[str(record["status"])] = errors.get(str(record["status"]), 0) + 1
+    strategies = {name: int(count) for name, count in
+                  _counter_deltas(metrics_before, metrics_after, "vtu_parse_strategy_total").items()}
+    parses = sum(strategies.values())
+    stage_sums = _counter_deltas(metrics_before, metrics_after, "vtu_parse_stage_seconds_sum")
+    stage_counts = _counter_deltas(metrics_before, metrics_after, "vtu_parse_stage_seconds_count")
+    return {
+        "requests": len(records),
+        "ok": len(latencies),
+        "throughput_per_second": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50), 1),
+            "p90": round(percentile(latencies, 90), 1),
+            "p99": round(percentile(latencies, 99), 1),
+            "max": round(max(latencies), 1) if latencies else 0.0,
+        },
+        "error_rate": round(1 - len(latencies) / len(records), 4) if records else 0.0,
+        "errors": errors,
+        "strategies": strategies,
+        "fallback_rate": round(1 - strategies.get("gemini", 0) / parses, 4) if parses else 0.0,
+        "stage_mean_ms": {stage: round(stage_sums.get(stage, 0.0) / count * 1000, 1)
+                          for stage, count in stage_counts.items()},
+        "gemini_calls": {name: gemini_after[name] - gemini_before[name] for name in gemini_after},
+    }
+
+
+def run_configuration(config, fake, rate, duration, seed, work_dir, warmup=4):
+    """Start the app with one configuration, load it, stop it and return its summary"""
+    corpus = generate_corpus(warmup + int(rate * duration), seed)
+    for transcript in corpus:
+        fake.register(transcript["pdf"], transcript["expected"])
+
+    server = AppServer(config["workers"], config["threads"], config["policy"], fake.url,
+                       tempfile.mkdtemp(prefix="config-", dir=work_dir)).start()
+    try:
+        for transcript in corpus[:warmup]:
+            requests.post(f"{server.url}/parse-pdf", files={"pdf_file": ("warmup.pdf", transcript["pdf"])},
+                          timeout=120)
+        time.sleep(1.5)  # let every worker flush its metrics file
+        metrics_before, gemini_before = server.scrape(), fake.stats()
+        records, elapsed = drive(server.url, corpus[warmup:], rate)
+        time.sleep(1.5)
+        metrics_after, gemini_after = server.scrape(), fake.stats()
+    finally:
+        server.stop()
+    summary = summarize(records, elapsed, metrics_before, metrics_after, gemini_before, gemini_after)
+    return {"config": f"{config['workers']}x{config['threads']}:{config['policy']}", **summary}
+
+
+def _print_table(results):
+    print(f"{'config':<22}{'ok/req':>10}{'rps':>8}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}"
+          f"{'errors':>9}{'fallback':>10}")
+    for result in results:
+        latency = result["latency_ms"]
+        print(f"{result['config']:<22}{result['ok']:>5}/{result['requests']:<4}{result['throughput_per_second']:>8}"
+              f"{latency['p50']:>10}{latency['p90']:>10}{latency['p99']:>10}"
+              f"{result['error_rate'] * 100:>8.1f}%{result['fallback_rate'] * 100:>9.1f}%")
+    for result in results:
+        print(f"{result['config']}: strategies {result['strategies']}, errors {result['errors']}, "
+              f"gemini {result['gemini_calls']}, stage means {result['stage_mean_ms']}")
+
+
+# CLI: python load_test.py --rate 5 --duration 30 --config 2x4 --config 4x8:race [--gemini-latency 2 ...]
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    arg_parser = argparse.ArgumentParser(description="Load-test /parse-pdf under gunicorn with a fake Gemini API")
+    arg_parser.add_argument("--config", action="append", default=[],
+                            help="workers x threads[:policy], e.g. 4x8 or 4x8:race (repeatable; default 2x4)")
+    arg_parser.add_argument("--policy", default="gemini-first", help="policy for configs that do not name one")
+    arg_parser.add_argument("--rate", type=float, default=4, help="requests per second")
+    arg_parser.add_argument("--duration", type=float, default=30, help="seconds of load per configuration")
+    arg_parser.add_argument("--seed", type=int, default=0, help="transcript corpus seed")
+    arg_parser.add_argument("--gemini-latency", type=float, default=1.5, help="mean fake Gemini latency (s)")
+    arg_parser.add_argument("--gemini-jitter", type=float, default=0.5, help="latency standard deviation (s)")
+    arg_parser.add_argument("--gemini-error-rate", type=float, default=0.02, help="share of calls failing with 429/5xx")
+    arg_parser.add_argument("--gemini-malformed-rate", type=float, default=0.02,
+                            help="share of calls answering unparseable JSON")
+    arg_parser.add_argument("--json", help="also write the results to this file")
+    args = arg_parser.parse_args()
+
+    configs = [parse_config(text, args.policy) for text in args.config or ["2x4"]]
+    fake = FakeGeminiServer(args.gemini_latency, args.gemini_jitter, args.gemini_error_rate,
+                            args.gemini_malformed_rate, seed=args.seed).start()
+    work_dir = tempfile.mkdtemp(prefix="vtu-load-test-")
+    print(f"Fake Gemini at {fake.url}; server logs in {work_dir}")
+    results = []
+    try:
+        for number, config in enumerate(configs):
+            print(f"Loading {config['workers']}x{config['threads']}:{config['policy']} "
+                  f"at {args.rate}/s for {args.duration}s...")
+            # A new corpus per configuration, so no result is served from a cache
+            results.append(run_configuration(config, fake, args.rate, args.duration,
+                                             args.seed * 1000 + number + 1, work_dir))
+    finally:
+        fake.stop()
+    _print_table(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as results_file:
+            json.dump(results, results_file, indent=2)
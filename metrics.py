@@ -0,0 +1,232 @@
+"""
+Metrics - Prometheus-format parse stage timings, strategy counts and in-flight gauges
+Each process keeps its series in memory and writes them to <pid>.json in a
+directory shared by the gunicorn workers; /metrics merges every process's file,
+so a scrape answered by any worker reports the whole server
+"""
+
+import atexit
+import bisect
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+# Shared by every worker on the host; clear it when the server is redeployed
+METRICS_DIR = os.getenv('METRICS_DIR', os.path.join(tempfile.gettempdir(), 'vtu-parser-metrics'))
+METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', '1'))  # max seconds a worker's file lags
+
+# The structured logger tracing sets up; looked up by name because tracing imports this module
+_logger = logging.getLogger("vtu_parser")
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+STAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# name -> (type, help, label name)
+METRICS = {
+    "vtu_parse_stage_seconds": ("histogram", "Time spent in each parse stage", "stage"),
+    "vtu_parse_strategy_total": ("counter", "Parsed transcripts by the strategy that produced the result", "strategy"),
+    "vtu_requests_in_flight": ("gauge", "Requests being handled, by endpoint", "endpoint"),
+    "vtu_parse_jobs_in_flight": ("gauge", "Background parse jobs running", None),
+}
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class MetricsRegistry:
+    """Per-process metric values, flushed to a shared directory and merged on scrape"""
+
+    def __init__(self, directory=METRICS_DIR, flush_interval=METRICS_FLUSH_INTERVAL, clock=time.monotonic):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        # name -> {label value: number}; histograms hold [bucket counts..., +Inf count, sum]
+        self._values = {name: {} for name in METRICS}
+        self._pid = os.getpid()
+        self._dirty = False
+        self._last_flush = float("-inf")
+        self._timer = None
+
+    def _after_fork(self):
+        """A forked child starts empty (its parent's series stay in the parent's file)"""
+        self._lock = threading.Lock()
+        self._reset()
+
+    def inc(self, name, label="", amount=1):
+        with self._lock:
+            series = self._values[name]
+            series[label] = series.get(label, 0) + amount
+            self._changed()
+
+    def observe(self, name, label, seconds):
+        with self._lock:
+            series = self._values[name].get(label)
+            if series is None:
+                series = self._values[name][label] = [0] * (len(STAGE_BUCKETS) + 1) + [0.0]
+            series[bisect.bisect_left(STAGE_BUCKETS, seconds)] += 1
+            series[-1] += seconds
+            self._changed()
+
+    @contextmanager
+    def time_stage(self, stage):
+        """Observe the duration of the with-block as a parse stage"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe("vtu_parse_stage_seconds", stage, time.perf_counter() - started)
+
+    @contextmanager
+    def in_flight(self, name, label=""):
+        """Count the with-block in a gauge while it runs"""
+        self.inc(name, label)
+        try:
+            yield
+        finally:
+            self.inc(name, label, -1)
+
+    def _changed(self):
+        """Schedule a flush so other workers see this change within flush_interval (caller holds the lock)"""
+        if self._dirty:
+            return
+        self._dirty = True
+        delay = max(0.0, self._last_flush + self.flush_interval - self._clock())
+        self._timer = threading.Timer(delay, self.flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _copy_values(self):
+        """A copy of every series that later updates cannot change (caller holds the lock)"""
+        return {name: {label: list(value) if isinstance(value, list) else value for label, value in series.items()}
+                for name, series in self._values.items()}
+
+    def flush(self):
+        """Write this process's values to <directory>/<pid>.json"""
+        pid = os.getpid()
+        if pid != self._pid:
+            return  # a timer inherited across a fork
+        with self._lock:
+            self._dirty = False
+            self._last_flush = self._clock()
+            values = self._copy_values()
+        document = json.dumps({"pid": pid, "values": values})
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, f"{pid}.json")
+            temp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as metrics_file:
+                metrics_file.write(document)
+            os.replace(temp_path, path)
+        except OSError as e:
+            _logger.warning("could not write metrics", extra={"fields": {"directory": self.directory, "error": str(e)}})
+
+    def _process_values(self):
+        """Yield (pid, values) for this process and every other process that wrote a file"""
+        pid = os.getpid()
+        with self._lock:
+            own_values = self._copy_values()
+        yield pid, own_values
+        try:
+            file_names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return
+        for file_name in file_names:
+            if not file_name.endswith(".json") or file_name == f"{pid}.json":
+                continue
+            try:
+                with open(os.path.join(self.directory, file_name), encoding="utf-8") as metrics_file:
+                    document = json.load(metrics_file)
+            except (OSError, ValueError):
+                continue  # removed or replaced while listing
+            yield document["pid"], document["values"]
+
+    def collect(self):
+        """Values summed over all processes; gauges only count processes still running"""
+        merged = {name: {} for name in METRICS}
+        for pid, values in self._process_values():
+            alive = None
+            for name, series in values.items():
+                if name not in METRICS:
+                    continue
+                if METRICS[name][0] == "gauge":
+                    alive = _pid_alive(pid) if alive is None else alive
+                    if not alive:
+                        continue  # a dead worker's requests are no longer in flight
+                target = merged[name]
+                for label, value in series.items():
+                    if isinstance(value, list):
+                        current = target.setdefault(label, [0] * len(value))
+                        target[label] = [a + b for a, b in zip(current, value)]
+                    else:
+                        target[label] = target.get(label, 0) + value
+        return merged
+
+    def render(self):
+        """The merged values in the Prometheus text exposition format"""
+        lines = []
+        for name, values in self.collect().items():
+            kind, help_text, label_name = METRICS[name]
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for label, value in sorted(values.items()):
+                selector = f'{label_name}="{_escape(label)}"' if label_name else ""
+                if kind != "histogram":
+                    lines.append(f"{name}{{{selector}}} {value}" if selector else f"{name} {value}")
+                    continue
+                cumulative = 0
+                prefix = f"{selector}," if selector else ""
+                for bound, count in zip(STAGE_BUCKETS + ("+Inf",), value[:-1]):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+                lines.append(f"{name}_sum{{{selector}}} {value[-1]}")
+                lines.append(f"{name}_count{{{selector}}} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+os.register_at_fork(after_in_child=registry._after_fork)
+atexit.register(registry.flush)
+
+
+def observe_stage(stage, seconds):
+    """Record one parse stage duration measured by the caller"""
+    registry.observe("vtu_parse_stage_seconds", stage, seconds)
+
+
+def time_stage(stage):
+    """Time a with-block as a parse stage of the process-wide registry"""
+    return registry.time_stage(stage)
+
+
+def in_flight(name, label=""):
+    """Count a with-block in one of the in-flight gauges while it runs"""
+    return registry.in_flight(name, label)
+
+
+def count_strategy(strategy):
+    """Count a parse result produced by strategy (gemini, pattern_N, ultra_aggressive, fallback, none)"""
+    registry.inc("vtu_parse_strategy_total", strategy or "none")
+
+
+def render():
+    """Prometheus text for every process sharing METRICS_DIR"""
+    return registry.render()
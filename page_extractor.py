@@ -0,0 +1,185 @@
+"""
+Page Extractor - PDF text extraction with optional per-page parallelism
+Long documents are split into contiguous page ranges that worker processes
+extract independently from one shared-memory copy of the PDF; page text is
+merged back in page order
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import pdfplumber
+
+from course_scanner import has_course_lines, normalize_text
+import tracing
+from upload_buffer import PDFUpload, open_view
+
+# 0 or 1 keeps extraction serial; N > 1 spreads pages over up to N processes
+PDF_EXTRACT_WORKERS = int(os.getenv('PDF_EXTRACT_WORKERS', '0'))
+# Documents shorter than this are extracted serially (pool overhead dominates)
+PDF_PARALLEL_MIN_PAGES = int(os.getenv('PDF_PARALLEL_MIN_PAGES', '8'))
+# Stop reading once a run of this many pages with text but no course lines
+# follows the marks table; blank separator pages do not count (0 reads every page)
+PDF_EARLY_STOP_EMPTY_PAGES = int(os.getenv('PDF_EARLY_STOP_EMPTY_PAGES', '2'))
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool(max_workers):
+    """Return this process's extraction pool, sized by its first caller
+
+    A process forked after the pool was created (a gunicorn worker, a batch
+    child) cannot use the parent's workers, so it starts its own.
+    """
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ProcessPoolExecutor(max_workers=max_workers)
+            _pool_pid = os.getpid()
+        return _pool
+
+
+def extract_page_text(page):
+    """Extract text from one pdfplumber page, falling back to its tables"""
+    # Try multiple text extraction methods
+    page_text = page.extract_text() or ""
+    if len(page_text.strip()) < 10:
+        # Fallback: try to extract text from tables
+        rows = []
+        for table in page.extract_tables():
+            for row in table:
+                if row:
+                    rows.append(" ".join([str(cell) for cell in row if cell]) + "\n")
+        page_text += "".join(rows)
+    return page_text
+
+
+def _release_page(page):
+    """Drop a page's cached layout objects once its text has been taken"""
+    try:
+        page.close()
+    except Exception:
+        pass
+
+
+def iter_normalized_pages(pdf):
+    """Yield the normalized text of each page of an open PDF, one page at a time"""
+    for page in pdf.pages:
+        try:
+            page_text = extract_page_text(page)
+        finally:
+            _release_page(page)
+        yield normalize_text(page_text) if page_text else ""
+
+
+def take_marks_table_pages(page_texts, empty_pages_to_stop=PDF_EARLY_STOP_EMPTY_PAGES):
+    """Consume page texts until the marks table has ended; returns the pages read
+
+    The table has ended once empty_pages_to_stop consecutive pages with text
+    but without course lines follow a page that had them. Blank pages (e.g.
+    between the semester tables of a consolidated transcript) neither end nor
+    extend the run.
+    """
+    pages = []
+    seen_table = False
+    empty_run = 0
+    for page_text in page_texts:
+        pages.append(page_text)
+        if has_course_lines(page_text):
+            seen_table = True
+            empty_run = 0
+        elif seen_table and empty_pages_to_stop > 0 and page_text.strip():
+            empty_run += 1
+            if empty_run >= empty_pages_to_stop:
+                break
+    return pages
+
+
+def _as_upload(pdf_file):
+    """(upload, owned): pdf_file itself if it is a PDFUpload, else a new one to close afterwards"""
+    if isinstance(pdf_file, PDFUpload):
+        return pdf_file, False
+    return PDFUpload.wrap(pdf_file), True
+
+
+def extract_course_text(pdf_file, max_workers=None):
+    """Extract normalized course text, stopping after the marks table where possible
+
+    Pages are extracted, normalized and checked one at a time, so time and
+    memory follow the position of the marks table rather than the document
+    length. Long documents configured for parallel extraction are read whole.
+    """
+    if max_workers is None:
+        max_workers = PDF_EXTRACT_WORKERS
+    if multiprocessing.parent_process() is not None:
+        max_workers = 1
+
+    upload, owned = _as_upload(pdf_file)
+    try:
+        with upload.open() as reader:
+            with tracing.stage("pdf_open"):
+                pdf = pdfplumber.open(reader)
+                page_count = len(pdf.pages)
+            with pdf:
+                if max_workers <= 1 or page_count < PDF_PARALLEL_MIN_PAGES:
+                    with tracing.stage("text_extraction"):
+                        pages = take_marks_table_pages(iter_normalized_pages(pdf))
+                    if len(pages) < page_count:
+                        tracing.log("marks table ended early", last_page=len(pages) - 1,
+                                    skipped_pages=page_count - len(pages))
+                    return " ".join(pages)
+
+        with tracing.stage("text_extraction"):
+            return normalize_text(_extract_in_parallel(upload.view, page_count, max_workers))
+    finally:
+        if owned:
+            upload.close()
+
+
+def _extract_page_range(shared_name, size, start, stop):
+    """Worker: extract the text of pages[start:stop] from the shared copy of the PDF"""
+    shared = shared_memory.SharedMemory(name=shared_name)
+    try:
+        view = shared.buf[:size]
+        try:
+            with open_view(view) as reader, pdfplumber.open(reader) as pdf:
+                return [extract_page_text(page) for page in pdf.pages[start:stop]]
+        finally:
+            view.release()
+    finally:
+        shared.close()
+
+
+def _join_pages(page_texts):
+    return "".join([page_text + "\n" for page_text in page_texts if page_text])
+
+
+def _extract_in_parallel(view, page_count, max_workers):
+    """Spread contiguous page ranges over the extraction pool
+
+    The PDF is copied once into shared memory, which every worker maps, instead
+    of being pickled to each of them.
+    """
+    workers = min(max_workers, page_count)
+    chunk = -(-page_count // workers)  # ceiling division
+    shared = shared_memory.SharedMemory(create=True, size=len(view))
+    try:
+        shared.buf[:len(view)] = view
+        pool = _get_pool(max_workers)
+        futures = [
+            pool.submit(_extract_page_range, shared.name, len(view), start, min(start + chunk, page_count))
+            for start in range(0, page_count, chunk)
+        ]
+        page_texts = []
+        for future in futures:
+            page_texts.extend(future.result())
+    finally:
+        shared.close()
+        shared.unlink()
+    return _join_pages(page_texts)
+
@@ -0,0 +1,397 @@
+"""
+Parse Jobs - Background parse jobs with stage-by-stage progress events
+Uploads are queued on a bounded in-process thread pool and answered with a job
+id at once; parse code reports its stages (Gemini, page extraction, pattern
+matching, SGPA) to the running job, which clients poll or stream as SSE. Job
+state is mirrored to SQLite so any worker process can answer for any job
+"""
+
+import contextvars
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import fast_json
+
+PARSE_JOB_WORKERS = int(os.getenv('PARSE_JOB_WORKERS', '4'))
+PARSE_JOB_MAX_PENDING = int(os.getenv('PARSE_JOB_MAX_PENDING', '32'))  # queued + running
+PARSE_JOB_TTL = float(os.getenv('PARSE_JOB_TTL', '600'))  # seconds a finished job stays readable
+PARSE_JOB_KEEPALIVE = float(os.getenv('PARSE_JOB_KEEPALIVE', '15'))  # seconds between SSE keep-alives
+PARSE_JOB_STORE_PATH = os.getenv('PARSE_JOB_STORE_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'parse_jobs.sqlite3'))
+PARSE_JOB_POLL_INTERVAL = float(os.getenv('PARSE_JOB_POLL_INTERVAL', '0.25'))  # store reads for other workers' jobs
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS parse_jobs (
+    job_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    error TEXT,
+    result_json TEXT,
+    created_at REAL NOT NULL,
+    finished_at REAL
+);
+CREATE TABLE IF NOT EXISTS parse_job_events (
+    job_id TEXT NOT NULL,
+    event_id INTEGER NOT NULL,
+    event_json TEXT NOT NULL,
+    PRIMARY KEY (job_id, event_id)
+);
+CREATE INDEX IF NOT EXISTS idx_parse_jobs_finished ON parse_jobs (finished_at);
+"""
+
+# The job the current thread (or a context copied from it) is working for
+_current_job = contextvars.ContextVar("parse_job", default=None)
+
+
+class JobQueueFull(Exception):
+    """Every worker is busy and the queue is at PARSE_JOB_MAX_PENDING"""
+
+
+class JobFailed(Exception):
+    """A job's work finished without a result; the message is reported to the client"""
+
+    def __init__(self, message, **details):
+        super().__init__(message)
+        self.details = details
+
+
+def report_stage(stage, message, **details):
+    """Record a progress event on the current job (does nothing outside a job)"""
+    job = _current_job.get()
+    if job is not None:
+        job.add_event(stage, message, **details)
+
+
+def current_job_id():
+    """Id of the job the caller is running for, or None outside a job"""
+    job = _current_job.get()
+    return job.id if job is not None else None
+
+
+class ParseJobStore:
+    """SQLite copy of every job's status, events and result, shared by the worker processes on the host"""
+
+    def __init__(self, path=PARSE_JOB_STORE_PATH):
+        self.path = path
+        self._local = threading.local()
+
+    def _connect(self):
+        """Return this thread's connection, reopening it after a fork"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")  # readers in other workers never block the job
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def create(self, job):
+        self._connect().execute(
+            "INSERT OR REPLACE INTO parse_jobs (job_id, status, created_at) VALUES (?, ?, ?)",
+            (job.id, job.status, job.created_at)
+        )
+
+    def add_event(self, job_id, event):
+        self._connect().execute(
+            "INSERT OR REPLACE INTO parse_job_events (job_id, event_id, event_json) VALUES (?, ?, ?)",
+            (job_id, event["id"], json.dumps(event))
+        )
+
+    def update(self, job):
+        result_json = fast_json.dumps(job.result) if job.result is not None else None
+        self._connect().execute(
+            "UPDATE parse_jobs SET status = ?, error = ?, result_json = ?, finished_at = ? WHERE job_id = ?",
+            (job.status, job.error, result_json, job.finished_at, job.id)
+        )
+
+    def load(self, job_id, after=0):
+        """Return the job's state with its events from id after on, or None if it is unknown"""
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT status, error, result_json, created_at, finished_at FROM parse_jobs WHERE job_id = ?", (job_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        events = [json.loads(event_json) for (event_json,) in conn.execute(
+            "SELECT event_json FROM parse_job_events WHERE job_id = ? AND event_id >= ? ORDER BY event_id",
+            (job_id, after)
+        )]
+        status, error, result_json, created_at, finished_at = row
+        return {"status": status, "error": error, "result_json": result_json, "created_at": created_at,
+                "finished_at": finished_at, "events": events}
+
+    def expire(self, cutoff):
+        """Delete jobs that finished before cutoff"""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM parse_job_events WHERE job_id IN "
+                         "(SELECT job_id FROM parse_jobs WHERE finished_at < ?)", (cutoff,))
+            conn.execute("DELETE FROM parse_jobs WHERE finished_at < ?", (cutoff,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+
+class ParseJob:
+    """One queued parse: its status, progress events and eventual result"""
+
+    def __init__(self, job_id, clock=time.time, store=None):
+        self.id = job_id
+        self.status = "queued"
+        self.result = None
+        self.error = None
+        self.events = []
+        self.created_at = clock()
+        self.finished_at = None
+        self._clock = clock
+        self._store = store
+        self._changed = threading.Condition()
+
+    def _persist(self, method, *args):
+        """Mirror a change to the store; a store failure only hides the job from other workers"""
+        if self._store is None:
+            return
+        try:
+            getattr(self._store, method)(*args)
+        except sqlite3.Error:
+            pass
+
+    def add_event(self, stage, message, **details):
+        with self._changed:
+            event = {"id": len(self.events), "stage": stage, "message": message,
+                     "at": round(self._clock(), 3), **details}
+            self.events.append(event)
+            self._persist("add_event", self.id, event)
+            self._changed.notify_all()
+
+    def _start(self):
+        with self._changed:
+            self.status = "running"
+            self._persist("update", self)
+
+    def _finish(self, status, result=None, error=None):
+        with self._changed:
+            self.status = status
+            self.result = result
+            self.error = error
+            self.finished_at = self._clock()
+            # Stored before waiters wake, so other workers never lag what this one reports
+            self._persist("update", self)
+            self._changed.notify_all()
+
+    @property
+    def finished(self):
+        return self.status in ("done", "failed")
+
+    def wait_for_events(self, after, timeout):
+        """Return (events with id >= after, finished), waiting up to timeout for something new"""
+        with self._changed:
+            if len(self.events) <= after and not self.finished:
+                self._changed.wait(timeout)
+            return self.events[after:], self.finished
+
+    def to_dict(self, include_result=True):
+        with self._changed:
+            state = {
+                "job_id": self.id,
+                "status": self.status,
+                "stage": self.events[-1]["stage"] if self.events else None,
+                "events": list(self.events),
+                "created_at": self.created_at,
+                "finished_at": self.finished_at
+            }
+            if self.error is not None:
+                state["error"] = self.error
+            if include_result and self.result is not None:
+                state["result"] = self.result
+            return state
+
+
+class StoredJob:
+    """Read-only view of a job running in another worker process, refreshed from the job store"""
+
+    def __init__(self, store, job_id, state, poll_interval=PARSE_JOB_POLL_INTERVAL):
+        self.id = job_id
+        self._store = store
+        self._poll_interval = poll_interval
+        self.events = []
+        self._apply(state)
+
+    def _apply(self, state):
+        self.status = state["status"]
+        self.error = state["error"]
+        self.created_at = state["created_at"]
+        self.finished_at = state["finished_at"]
+        self._result_json = state["result_json"]
+        self.events.extend(state["events"])
+
+    @property
+    def finished(self):
+        return self.status in ("done", "failed")
+
+    @property
+    def result(self):
+        return json.loads(self._result_json) if self._result_json is not None else None
+
+    def _refresh(self):
+        state = self._store.load(self.id, after=len(self.events))
+        if state is None:
+            self.status = "failed"  # expired or deleted while being watched
+            self.error = self.error or "Unknown or expired job"
+        else:
+            self._apply(state)
+
+    def wait_for_events(self, after, timeout):
+        """Return (events with id >= after, finished), polling the store for up to timeout"""
+        deadline = time.monotonic() + timeout
+        while len(self.events) <= after and not self.finished:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            time.sleep(min(self._poll_interval, remaining))
+            self._refresh()
+        return self.events[after:], self.finished
+
+    def to_dict(self, include_result=True):
+        state = {
+            "job_id": self.id,
+            "status": self.status,
+            "stage": self.events[-1]["stage"] if self.events else None,
+            "events": list(self.events),
+            "created_at": self.created_at,
+            "finished_at": self.finished_at
+        }
+        if self.error is not None:
+            state["error"] = self.error
+        if include_result and self._result_json is not None:
+            state["result"] = self.result
+        return state
+
+
+class ParseJobManager:
+    """Bounded pool running jobs in the background and keeping them for PARSE_JOB_TTL"""
+
+    def __init__(self, max_workers=PARSE_JOB_WORKERS, max_pending=PARSE_JOB_MAX_PENDING, ttl=PARSE_JOB_TTL,
+                 clock=time.time, store=None):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.ttl = ttl
+        self.store = store if store is not None else ParseJobStore()
+        self._clock = clock
+        self._jobs = {}
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._executor = None
+        self._executor_pid = None
+
+    def _get_executor(self):
+        # Recreated in forked worker processes (threads do not survive a fork)
+        if self._executor is None or self._executor_pid != os.getpid():
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="parse-job")
+            self._executor_pid = os.getpid()
+            self._jobs = {}
+            self._pending = 0
+        return self._executor
+
+    def submit(self, work, *args, on_finish=None):
+        """Queue work(*args) (which returns the result or raises JobFailed) and return its ParseJob
+
+        on_finish() runs after the job, e.g. to release its upload. Raises
+        JobQueueFull, without queueing anything, when max_pending jobs are
+        already queued or running.
+        """
+        with self._lock:
+            executor = self._get_executor()
+            self._expire()
+            if self._pending >= self.max_pending:
+                raise JobQueueFull(f"{self._pending} parse jobs already pending")
+            self._pending += 1
+            job = ParseJob(uuid.uuid4().hex, self._clock, self.store)
+            self._jobs[job.id] = job
+        job._persist("create", job)
+        job.add_event("queued", "Waiting for a parse worker")
+        executor.submit(self._run, job, work, args, on_finish)
+        return job
+
+    def _run(self, job, work, args, on_finish):
+        token = _current_job.set(job)
+        try:
+            job._start()
+            job.add_event("started", "Parsing started")
+            result = work(*args)
+            job.add_event("done", "Parsing finished")
+            job._finish("done", result=result)
+        except JobFailed as e:
+            job.add_event("failed", str(e), **e.details)
+            job._finish("failed", error=str(e))
+        except Exception as e:
+            job.add_event("failed", f"Error processing PDF: {str(e)}")
+            job._finish("failed", error=f"Error processing PDF: {str(e)}")
+        finally:
+            _current_job.reset(token)
+            with self._lock:
+                self._pending -= 1
+            if on_finish is not None:
+                on_finish()
+
+    def _expire(self):
+        """Forget finished jobs older than ttl, here and in the store (caller holds the lock)"""
+        cutoff = self._clock() - self.ttl
+        for job_id in [job_id for job_id, job in self._jobs.items()
+                       if job.finished_at is not None and job.finished_at < cutoff]:
+            del self._jobs[job_id]
+        try:
+            self.store.expire(cutoff)
+        except sqlite3.Error:
+            pass  # retried at the next submission
+
+    def get(self, job_id):
+        """The job with this id: live if this process runs it, else a view of the stored copy (or None)"""
+        with self._lock:
+            job = self._jobs.get(job_id) if self._executor_pid == os.getpid() else None
+        if job is not None:
+            return job
+        try:
+            state = self.store.load(job_id)
+        except sqlite3.Error:
+            return None
+        return StoredJob(self.store, job_id, state) if state is not None else None
+
+    def stats(self):
+        with self._lock:
+            statuses = {}
+            for job in self._jobs.values():
+                statuses[job.status] = statuses.get(job.status, 0) + 1
+            return {"pending": self._pending, "max_pending": self.max_pending,
+                    "workers": self.max_workers, "jobs": statuses}
+
+
+def sse_events(job, last_event_id=None, keepalive=PARSE_JOB_KEEPALIVE):
+    """Yield a job's progress as Server-Sent Events, ending with a "done" or "failed" event
+
+    Resumes after last_event_id (the Last-Event-ID header of a reconnecting
+    EventSource); a comment line is sent while nothing happens.
+    """
+    after = int(last_event_id) + 1 if last_event_id is not None and str(last_event_id).isdigit() else 0
+    while True:
+        events, finished = job.wait_for_events(after, keepalive)
+        for event in events:
+            after = event["id"] + 1
+            if event["stage"] in ("done", "failed"):
+                continue  # sent below, with the result
+            yield f"id: {event['id']}\nevent: stage\ndata: {json.dumps(event)}\n\n"
+        if finished:
+            final = job.to_dict()
+            final.pop("events")
+            yield f"event: {job.status}\ndata: {fast_json.dumps(final)}\n\n"
+            return
+        if not events:
+            yield ": keep-alive\n\n"
+
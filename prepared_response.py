@@ -0,0 +1,146 @@
+"""
+Prepared Response - JSON responses serialized and compressed once, served many times
+Identity, gzip and (when the brotli package is installed) brotli bodies are
+kept in memory with per-encoding ETags; conditional requests get a 304
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from flask import Response
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+CATALOGUE_MAX_AGE = int(os.getenv('CATALOGUE_MAX_AGE', '300'))  # seconds clients/CDNs may cache
+_MIN_COMPRESS_BYTES = 512  # smaller bodies are sent as is
+# Static bodies are compressed once, so they can afford the best ratio; per-query
+# pages are compressed on the request thread and must stay cheap
+_STATIC_LEVELS = {"br": 11, "gzip": 9}
+_DYNAMIC_LEVELS = {"br": 5, "gzip": 6}
+
+
+def _compress(encoding, body, level):
+    if encoding == "br":
+        return brotli.compress(body, quality=level)
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+
+def parse_accept_encoding(header):
+    """{coding: q} from an Accept-Encoding header; q=0 entries stay in, marking codings the client refuses"""
+    weights = {}
+    for part in (header or "").split(","):
+        coding, *params = [item.strip() for item in part.split(";")]
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value.strip())
+                except ValueError:
+                    q = 0.0  # unreadable weight: do not risk an encoding the client may refuse
+        weights[coding.lower()] = q
+    return weights
+
+
+class PreparedResponse:
+    """One JSON body with compressed variants and ETags
+
+    Static responses are compressed up front at the highest levels. Dynamic
+    ones (precompress=False, e.g. one search page) compress an encoding the
+    first time a client asks for it, at fast levels.
+    """
+
+    def __init__(self, payload=None, body=None, precompress=True):
+        if body is None:
+            body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        self.variants = {None: (body, f'"{digest}"')}
+        self.encodings = ()
+        if len(body) >= _MIN_COMPRESS_BYTES:
+            self.encodings = ("br", "gzip") if brotli is not None else ("gzip",)
+        self._digest = digest
+        self._levels = _STATIC_LEVELS if precompress else _DYNAMIC_LEVELS
+        self.etags = {f'"{digest}"'} | {f'"{digest}-{encoding}"' for encoding in self.encodings}
+        if precompress:
+            for encoding in self.encodings:
+                self.variant(encoding)
+
+    def variant(self, encoding):
+        """(body, etag) for an encoding, compressing it on first use"""
+        variant = self.variants.get(encoding)
+        if variant is None:
+            # Threads racing on a new variant compress it twice; both results are identical
+            variant = (_compress(encoding, self.variants[None][0], self._levels[encoding]),
+                       f'"{self._digest}-{encoding}"')
+            self.variants[encoding] = variant
+        return variant
+
+    def choose_encoding(self, accept_encoding):
+        """Best stored encoding the client accepts (highest q, then brotli before gzip), else identity"""
+        weights = parse_accept_encoding(accept_encoding)
+        best, best_q = None, 0.0
+        for encoding in self.encodings:
+            q = weights.get(encoding, weights.get("*", 0.0))
+            if q > best_q:
+                best, best_q = encoding, q
+        return best
+
+    def serve(self, request, max_age=CATALOGUE_MAX_AGE):
+        """Build the Flask response for request, or a 304 if its ETag is still current"""
+        encoding = self.choose_encoding(request.headers.get("Accept-Encoding"))
+        body, etag = self.variant(encoding)
+
+        if_none_match = request.headers.get("If-None-Match", "")
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        not_modified = if_none_match.strip() == "*" or any(
+            (tag[2:] if tag.startswith("W/") else tag) in self.etags for tag in tags
+        )
+        response = Response(b"" if not_modified else body, status=304 if not_modified else 200,
+                            mimetype="application/json")
+        if encoding and not not_modified:
+            response.headers["Content-Encoding"] = encoding
+        response.headers["ETag"] = etag
+        response.headers["Vary"] = "Accept-Encoding"
+        response.cache_control.public = True
+        response.cache_control.max_age = max_age
+        return response
+
+
+class PreparedResponseCache:
+    """Small LRU of PreparedResponse objects keyed on normalized request parameters"""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_build(self, key, build):
+        """Return the cached response for key, calling build() (-> PreparedResponse or None) on a miss"""
+        with self._lock:
+            prepared = self._entries.get(key)
+            if prepared is not None:
+                self._entries.move_to_end(key)
+                return prepared
+
+        prepared = build()
+        if prepared is None:
+            return None
+        with self._lock:
+            self._entries[key] = prepared
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return prepared
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,78 @@
+"""
+Subject Catalogue - Paginated, filterable access to the full subject database
+Every subject is JSON-encoded once; a page is the join of its pre-encoded
+records, and each distinct page is kept as a prepared (lazily compressed,
+ETagged) response
+"""
+
+import json
+
+from prepared_response import PreparedResponse, PreparedResponseCache
+from subject_data import SnapshotCache
+from subject_search import search_subjects_ranked
+
+CATALOGUE_DEFAULT_PER_PAGE = 100
+CATALOGUE_MAX_PER_PAGE = 500
+FILTER_FIELDS = ("scheme", "branch", "semester", "type")
+
+
+class SubjectCatalogue:
+    """Flat subject records with pre-encoded JSON fragments"""
+
+    def __init__(self, subjects):
+        self.codes = []
+        self.infos = []
+        self._fragments = []
+        self._positions = {}
+        for code, info in subjects:
+            self._positions[code] = len(self.codes)
+            self.codes.append(code)
+            self.infos.append(info)
+            self._fragments.append(json.dumps({"code": code, **info}, separators=(",", ":")).encode("utf-8"))
+        self._pages = PreparedResponseCache()
+
+    def __len__(self):
+        return len(self.codes)
+
+    def _matching(self, filters, query):
+        """Record positions passing the filters, ranked by query when one is given"""
+        if query:
+            positions = [self._positions[subject["code"]] for subject in search_subjects_ranked(query)
+                         if subject["code"] in self._positions]
+        else:
+            positions = range(len(self.codes))
+        return [
+            position for position in positions
+            if all(str(self.infos[position].get(field)) == value for field, value in filters)
+        ]
+
+    def page(self, page=1, per_page=CATALOGUE_DEFAULT_PER_PAGE, query=None, **filters):
+        """Return a PreparedResponse for one page of matching subjects"""
+        page = max(int(page), 1)
+        per_page = min(max(int(per_page), 1), CATALOGUE_MAX_PER_PAGE)
+        filters = tuple((field, str(filters[field])) for field in FILTER_FIELDS if filters.get(field))
+        query = " ".join((query or "").upper().split())
+        key = (filters, query, page, per_page)
+
+        def build():
+            positions = self._matching(filters, query)
+            start = (page - 1) * per_page
+            header = json.dumps({
+                "page": page,
+                "per_page": per_page,
+                "total": len(positions),
+                "pages": -(-len(positions) // per_page),
+                "filters": dict(filters, q=query) if query else dict(filters)
+            }, separators=(",", ":")).encode("utf-8")
+            records = b",".join(self._fragments[position] for position in positions[start:start + per_page])
+            return PreparedResponse(body=header[:-1] + b',"subjects":[' + records + b"]}", precompress=False)
+
+        return self._pages.get_or_build(key, build)
+
+
+_catalogue = SnapshotCache(lambda snapshot: SubjectCatalogue(snapshot.index.iter_subjects()))
+
+
+def get_subject_catalogue():
+    """Return the catalogue for the live subject data, rebuilt (with its page cache) after a reload"""
+    return _catalogue.get()
@@ -0,0 +1,278 @@
+"""
+Subject Data - Hot-reloadable subject catalogue loaded from data files
+data/subjects.json and data/fallback_credits.json are validated and compiled
+into an immutable, versioned snapshot; when the files change a new snapshot is
+built beside the live one and swapped in atomically, without a restart
+"""
+
+import glob
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from types import MappingProxyType
+
+import tracing
+from subject_index import SUBJECT_INDEX_PATH, SubjectIndex, compile_subject_index, stored_fingerprint
+
+SUBJECT_DATA_DIR = os.getenv('SUBJECT_DATA_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data'))
+SUBJECT_DATA_CHECK_INTERVAL = float(os.getenv('SUBJECT_DATA_CHECK_INTERVAL', '2'))  # seconds between file checks
+SUBJECT_INDEX_KEEP = int(os.getenv('SUBJECT_INDEX_KEEP', '3'))  # compiled versions kept on disk
+
+SUBJECTS_FILE = 'subjects.json'
+FALLBACK_CREDITS_FILE = 'fallback_credits.json'
+MAX_SUBJECT_CREDITS = 20
+
+_CODE_RE = re.compile(r'^[A-Za-z0-9]+$')
+
+
+class SubjectDataError(ValueError):
+    """The subject data files are missing, malformed or fail validation"""
+
+
+def _check(condition, location, message):
+    if not condition:
+        raise SubjectDataError(f"{location}: {message}")
+
+
+def _check_credits(credits, location):
+    _check(isinstance(credits, (int, float)) and not isinstance(credits, bool)
+           and 0 <= credits <= MAX_SUBJECT_CREDITS,
+           location, f"credits must be a number between 0 and {MAX_SUBJECT_CREDITS}")
+
+
+def validate_catalogue(database, location=SUBJECTS_FILE):
+    """Raise SubjectDataError unless database is {scheme: {branch: {semester: [subject, ...]}}}"""
+    _check(isinstance(database, dict) and database, location, "expected a non-empty object of schemes")
+    for scheme, branches in database.items():
+        _check(isinstance(branches, dict), f"{location} {scheme}", "expected an object of branches")
+        for branch, semesters in branches.items():
+            _check(isinstance(semesters, dict), f"{location} {scheme}/{branch}", "expected an object of semesters")
+            for semester, subjects in semesters.items():
+                where = f"{location} {scheme}/{branch}/{semester}"
+                _check(isinstance(subjects, list), where, "expected a list of subjects")
+                codes = set()
+                for position, subject in enumerate(subjects):
+                    entry = f"{where}[{position}]"
+                    _check(isinstance(subject, dict), entry, "expected a subject object")
+                    code = subject.get("code")
+                    _check(isinstance(code, str) and _CODE_RE.match(code), entry, f"invalid code {code!r}")
+                    _check(code not in codes, entry, f"duplicate code {code}")
+                    codes.add(code)
+                    for field in ("name", "type"):
+                        _check(isinstance(subject.get(field), str) and subject[field].strip(),
+                               entry, f"{field} must be a non-empty string")
+                    _check_credits(subject.get("credits"), entry)
+
+
+def validate_fallback_credits(fallback_credits, location=FALLBACK_CREDITS_FILE):
+    """Raise SubjectDataError unless fallback_credits is {code: {"name": ..., "credits": ...}}"""
+    _check(isinstance(fallback_credits, dict), location, "expected an object of subject codes")
+    for code, subject in fallback_credits.items():
+        entry = f"{location} {code}"
+        _check(_CODE_RE.match(code), entry, "invalid code")
+        _check(isinstance(subject, dict), entry, "expected a subject object")
+        _check(isinstance(subject.get("name"), str) and subject["name"].strip(), entry, "name must be a non-empty string")
+        _check_credits(subject.get("credits"), entry)
+
+
+def _data_paths(data_dir):
+    return os.path.join(data_dir, SUBJECTS_FILE), os.path.join(data_dir, FALLBACK_CREDITS_FILE)
+
+
+def load_subject_data(data_dir=SUBJECT_DATA_DIR):
+    """Read and validate the data files; return (catalogue, fallback_credits, fingerprint)"""
+    digest = hashlib.sha256()
+    documents = []
+    for path in _data_paths(data_dir):
+        try:
+            with open(path, 'rb') as data_file:
+                raw = data_file.read()
+            documents.append(json.loads(raw))
+        except OSError as e:
+            raise SubjectDataError(f"{os.path.basename(path)}: {e.strerror}") from e
+        except ValueError as e:
+            raise SubjectDataError(f"{os.path.basename(path)}: invalid JSON ({e})") from e
+        digest.update(hashlib.sha256(raw).digest())
+
+    catalogue, fallback_credits = documents
+    validate_catalogue(catalogue)
+    validate_fallback_credits(fallback_credits)
+    return catalogue, fallback_credits, digest.hexdigest()
+
+
+class SubjectSnapshot:
+    """One immutable version of the subject data: its compiled index and fallback credits"""
+
+    def __init__(self, version, fingerprint, index, fallback_credits):
+        self.version = version  # increases by one with every swap in this process
+        self.fingerprint = fingerprint  # content hash, identical across workers
+        self.index = index
+        self.fallback_credits = MappingProxyType(fallback_credits)
+        self.loaded_at = time.time()
+
+    def lookup(self, subject_code):
+        """Subject info from the catalogue, else from the fallback credits; None if unknown"""
+        return self.index.get(subject_code) or self.fallback_credits.get(subject_code)
+
+    def info(self):
+        return {
+            "version": self.version,
+            "fingerprint": self.fingerprint,
+            "loaded_at": self.loaded_at,
+            "subjects": self.index.count(),
+            "fallback_subjects": len(self.fallback_credits)
+        }
+
+
+class SubjectDataStore:
+    """Holds the live snapshot and swaps in a new one when the data files change
+
+    Readers take whatever snapshot is current; at most one caller per
+    check_interval stats the files, and a changed, valid data set is compiled
+    beside the live index before a single reference swap publishes it. Invalid
+    edits are reported and the live snapshot keeps serving.
+    """
+
+    def __init__(self, data_dir=SUBJECT_DATA_DIR, index_path=SUBJECT_INDEX_PATH,
+                 check_interval=SUBJECT_DATA_CHECK_INTERVAL, clock=time.monotonic):
+        self.data_dir = data_dir
+        self.index_path = index_path
+        self.check_interval = check_interval
+        self._clock = clock
+        self._snapshot = None
+        self._signature = None  # stat signature of the files last loaded (or rejected)
+        self._next_check = 0.0
+        self._reload_lock = threading.Lock()
+
+    def _file_signature(self):
+        signature = []
+        for path in _data_paths(self.data_dir):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                signature.append(None)
+                continue
+            signature.append((stat.st_ino, stat.st_size, stat.st_mtime_ns))
+        return tuple(signature)
+
+    def current(self):
+        """Return the live snapshot, loading it on first use and picking up changed files"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._reload_lock:
+                if self._snapshot is None:
+                    self._load()
+            return self._snapshot
+
+        # Non-blocking: while one caller reloads, everyone else keeps the live snapshot
+        if self._clock() >= self._next_check and self._reload_lock.acquire(blocking=False):
+            try:
+                self._next_check = self._clock() + self.check_interval
+                if self._file_signature() != self._signature:
+                    try:
+                        self._load()
+                    except SubjectDataError as e:
+                        tracing.log("subject data not reloaded, keeping the live version", level="warning",
+                                    version=snapshot.version, error=str(e))
+            finally:
+                self._reload_lock.release()
+        return self._snapshot
+
+    def reload(self):
+        """Load the data files now; return the new snapshot or raise SubjectDataError"""
+        with self._reload_lock:
+            self._load()
+            return self._snapshot
+
+    def _load(self):
+        """Validate, compile and publish the data files (caller holds the reload lock)"""
+        self._signature = self._file_signature()  # a rejected edit is not retried until it changes
+        self._next_check = self._clock() + self.check_interval
+        catalogue, fallback_credits, fingerprint = load_subject_data(self.data_dir)
+        live = self._snapshot
+        if live is not None and live.fingerprint == fingerprint:
+            return  # touched but unchanged
+
+        path = f"{self.index_path}.{fingerprint[:16]}"
+        if stored_fingerprint(path) != fingerprint:
+            count = compile_subject_index(catalogue, path, fingerprint)
+            tracing.log("compiled subject index", subjects=count, path=path)
+            self._prune_index_files(path)
+
+        self._snapshot = SubjectSnapshot((live.version if live else 0) + 1, fingerprint,
+                                         SubjectIndex(path), fallback_credits)
+        if live is not None:
+            tracing.log("subject data reloaded", previous_version=live.version, version=self._snapshot.version)
+
+    def _prune_index_files(self, current_path):
+        """Delete all but the newest SUBJECT_INDEX_KEEP compiled versions
+
+        Older ones stay readable through connections that still have them open.
+        """
+        paths = [path for path in glob.glob(f"{glob.escape(self.index_path)}.*")
+                 if not path.endswith(".tmp") and path != current_path]
+        paths.sort(key=os.path.getmtime, reverse=True)
+        for path in paths[max(SUBJECT_INDEX_KEEP - 1, 0):]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+class SnapshotCache:
+    """A value derived from the live snapshot, rebuilt when its version changes"""
+
+    def __init__(self, build, store=None):
+        self._build = build  # snapshot -> derived value
+        self._store = store
+        self._entry = None  # (version, value)
+        self._lock = threading.Lock()
+
+    def get(self):
+        snapshot = (self._store or subject_data).current()
+        entry = self._entry
+        if entry is None or entry[0] != snapshot.version:
+            with self._lock:
+                entry = self._entry
+                if entry is None or entry[0] != snapshot.version:
+                    entry = (snapshot.version, self._build(snapshot))
+                    self._entry = entry  # drops the value built from the old version
+        return entry[1]
+
+
+# Shared process-wide store (nothing is read until the first lookup)
+subject_data = SubjectDataStore()
+
+
+def get_subject_info(subject_code):
+    """Get subject information by code"""
+    return subject_data.current().index.get(subject_code)
+
+
+def get_subjects_by_scheme(scheme):
+    """Get all subjects for a specific scheme"""
+    return subject_data.current().index.curriculum(scheme)
+
+
+def get_subjects_by_branch(scheme, branch):
+    """Get all subjects for a specific scheme and branch"""
+    return subject_data.current().index.curriculum(scheme, branch).get(branch, {})
+
+
+def get_subjects_by_semester(scheme, branch, semester):
+    """Get subjects for a specific scheme, branch, and semester"""
+    return subject_data.current().index.curriculum(scheme, branch, semester).get(branch, {}).get(str(semester), [])
+
+
+# Check step: python subject_data.py [data dir] validates and compiles the data files
+if __name__ == "__main__":
+    import sys
+    store = SubjectDataStore(data_dir=sys.argv[1] if len(sys.argv) > 1 else SUBJECT_DATA_DIR)
+    try:
+        print(json.dumps(store.reload().info(), indent=2))
+    except SubjectDataError as e:
+        print(f"Invalid subject data: {e}")
+        sys.exit(1)
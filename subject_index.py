@@ -0,0 +1,166 @@
+"""
+Subject Index - Compiled on-disk index of the VTU subjects database
+Each version of the subject catalogue is compiled once into a read-only SQLite
+file; lookups open it lazily and hit the primary key, so workers never load or
+flatten the nested catalogue and share its pages through the OS page cache
+"""
+
+import os
+import sqlite3
+import threading
+
+# Each catalogue version is compiled to <SUBJECT_INDEX_PATH>.<fingerprint>
+SUBJECT_INDEX_PATH = os.getenv('SUBJECT_INDEX_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'subjects_index.sqlite3'))
+
+_SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+-- One row per code, as get_subject_info has always answered (last entry wins)
+CREATE TABLE subjects (
+    code TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    credits NUMERIC NOT NULL,
+    type TEXT NOT NULL,
+    scheme TEXT NOT NULL,
+    branch TEXT NOT NULL,
+    semester TEXT NOT NULL
+) WITHOUT ROWID;
+-- Every catalogue entry in source order, for scheme/branch/semester listings
+CREATE TABLE curriculum (
+    position INTEGER PRIMARY KEY,
+    scheme TEXT NOT NULL,
+    branch TEXT NOT NULL,
+    semester TEXT NOT NULL,
+    code TEXT NOT NULL,
+    name TEXT NOT NULL,
+    credits NUMERIC NOT NULL,
+    type TEXT NOT NULL
+);
+CREATE INDEX idx_curriculum_group ON curriculum (scheme, branch, semester, position);
+"""
+
+_INFO_COLUMNS = "name, credits, type, scheme, branch, semester"
+
+
+def stored_fingerprint(path):
+    """Fingerprint of the catalogue compiled into the index at path, or None"""
+    if not os.path.exists(path):
+        return None
+    try:
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'fingerprint'").fetchone()
+        finally:
+            conn.close()
+    except sqlite3.DatabaseError:
+        return None  # unreadable or foreign file: rebuild
+    return row[0] if row else None
+
+
+def compile_subject_index(database, path, fingerprint):
+    """Compile the nested subjects database into a SQLite index at path
+
+    The file is written next to its destination and renamed into place, so
+    concurrent workers never see a half-built index.
+    """
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    conn = sqlite3.connect(temp_path)
+    try:
+        conn.executescript(_SCHEMA)
+        flat = {}
+        rows = []
+        for scheme, branches in database.items():
+            for branch, semesters in branches.items():
+                for semester, subjects in semesters.items():
+                    for subject in subjects:
+                        code = subject["code"]
+                        info = (subject["name"], subject["credits"], subject["type"], scheme, branch, semester)
+                        rows.append((len(rows), scheme, branch, semester, code, *info[:3]))
+                        # Keep the first position but the last entry, like the old flat dict
+                        flat[code] = (flat[code][0] if code in flat else len(flat), *info)
+
+        conn.executemany("INSERT INTO curriculum VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        conn.executemany(
+            f"INSERT INTO subjects (code, position, {_INFO_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [(code, *values) for code, values in flat.items()]
+        )
+        conn.execute("INSERT INTO meta VALUES ('fingerprint', ?)", (fingerprint,))
+        conn.commit()
+    except Exception:
+        conn.close()
+        os.remove(temp_path)
+        raise
+    conn.close()
+    os.replace(temp_path, path)
+    return len(flat)
+
+
+class SubjectIndex:
+    """Lazily opened, read-only view of one compiled subject index"""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+
+    def _connect(self):
+        """Return this thread's read-only connection, reopening it after a fork"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+            conn.execute("PRAGMA mmap_size=16777216")  # pages shared across worker processes
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, subject_code):
+        """Return the subject info dict for a code, or None"""
+        row = self._connect().execute(
+            f"SELECT {_INFO_COLUMNS} FROM subjects WHERE code = ?", (subject_code.upper(),)
+        ).fetchone()
+        return _info_dict(row) if row else None
+
+    def iter_subjects(self):
+        """Yield (code, info) for every distinct code in catalogue order"""
+        rows = self._connect().execute(f"SELECT code, {_INFO_COLUMNS} FROM subjects ORDER BY position")
+        for row in rows:
+            yield row[0], _info_dict(row[1:])
+
+    def curriculum(self, scheme, branch=None, semester=None):
+        """Nested {branch: {semester: [subject, ...]}} listing, narrowed by the arguments"""
+        sql = "SELECT branch, semester, code, name, credits, type FROM curriculum WHERE scheme = ?"
+        params = [scheme]
+        if branch is not None:
+            sql += " AND branch = ?"
+            params.append(branch)
+        if semester is not None:
+            sql += " AND semester = ?"
+            params.append(str(semester))
+
+        branches = {}
+        for row_branch, row_semester, code, name, credits, subject_type in self._connect().execute(sql + " ORDER BY position", params):
+            branches.setdefault(row_branch, {}).setdefault(row_semester, []).append(
+                {"code": code, "name": name, "credits": credits, "type": subject_type}
+            )
+        return branches
+
+    def iter_curriculum(self):
+        """Yield (scheme, branch, semester, code, credits, type) for every entry in source order"""
+        yield from self._connect().execute(
+            "SELECT scheme, branch, semester, code, credits, type FROM curriculum ORDER BY position"
+        )
+
+    def count(self):
+        return self._connect().execute("SELECT COUNT(*) FROM subjects").fetchone()[0]
+
+
+def _info_dict(row):
+    name, credits, subject_type, scheme, branch, semester = row
+    return {
+        "name": name,
+        "credits": credits,
+        "type": subject_type,
+        "scheme": scheme,
+        "branch": branch,
+        "semester": semester
+    }
+
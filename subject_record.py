@@ -0,0 +1,112 @@
+"""
+Subject Record - Compact parsed-course records and one-pass result summaries
+Parsed courses are __slots__ dataclasses instead of 10-key dicts, and the SGPA
+totals and detailed breakdown of a result are accumulated in a single walk
+over them; the JSON shape is unchanged
+"""
+
+from dataclasses import asdict, dataclass, fields
+
+PASS_MARKS = 40  # VTU passing threshold
+
+
+def _slotted(cls):
+    """Rebuild a dataclass with __slots__ for its fields (dataclass(slots=True) needs Python 3.10)"""
+    names = tuple(field.name for field in fields(cls))
+    namespace = {key: value for key, value in cls.__dict__.items()
+                 if key not in names and key not in ("__dict__", "__weakref__")}
+    namespace["__slots__"] = names  # defaults already live in the generated __init__
+    return type(cls)(cls.__name__, cls.__bases__, namespace)
+
+
+@_slotted
+@dataclass
+class SubjectRecord:
+    """One parsed course (serializes exactly like the dict it replaces)"""
+
+    # Alphabetical, so fast encoders that keep field order match Flask's sorted keys
+    code: str
+    credit_points: float = 0
+    credits: float = 0
+    external: int = 0
+    grade: str = "F"
+    grade_point: float = 0
+    internal: int = 0
+    name: str = ""
+    result: str = "P"
+    total: int = 0
+
+    # Read-only mapping access, so code written against the old dicts keeps working
+    def __getitem__(self, key):
+        if key not in _FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in _FIELDS else default
+
+    def __contains__(self, key):
+        return key in _FIELDS
+
+    def keys(self):
+        return SubjectRecord.__slots__
+
+    def to_dict(self):
+        return asdict(self)
+
+
+_FIELDS = frozenset(SubjectRecord.__slots__)
+
+
+class ResultSummary:
+    """SGPA inputs and detailed breakdown of one result, from a single pass over its subjects"""
+
+    __slots__ = ("count", "total_credits", "total_weighted_points", "failed_subjects", "total_internal",
+                 "total_external", "total_marks", "passed_count", "failed_count")
+
+    def __init__(self, subjects):
+        self.count = 0
+        self.total_credits = 0
+        self.total_weighted_points = 0
+        self.failed_subjects = []
+        self.total_internal = 0
+        self.total_external = 0
+        self.total_marks = 0
+        self.passed_count = 0
+        self.failed_count = 0
+
+        for subject in subjects:
+            # Include all subjects in total credits (even failed ones)
+            credits = float(subject["credits"])
+            self.total_credits += credits
+            self.total_weighted_points += credits * float(subject["grade_point"])
+
+            total = subject["total"]
+            result = subject["result"]
+            if result == "F" or total < PASS_MARKS:
+                self.failed_subjects.append(subject["code"])
+            if result == "P":
+                self.passed_count += 1
+            elif result == "F":
+                self.failed_count += 1
+
+            self.total_internal += subject.get("internal", 0)
+            self.total_external += subject.get("external", 0)
+            self.total_marks += total
+            self.count += 1
+
+    @property
+    def sgpa(self):
+        return round(self.total_weighted_points / self.total_credits, 2) if self.total_credits > 0 else 0.0
+
+    def detailed_breakdown(self):
+        return {
+            "total_internal": self.total_internal,
+            "total_external": self.total_external,
+            "total_marks": self.total_marks,
+            "passed_subjects": self.passed_count,
+            "failed_subjects_count": self.failed_count,
+            "average_internal": round(self.total_internal / self.count, 2),
+            "average_external": round(self.total_external / self.count, 2),
+            "average_total": round(self.total_marks / self.count, 2)
+        }
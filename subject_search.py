@@ -0,0 +1,182 @@
+"""
+Subject Search - In-memory inverted index for ranked subject search and autocomplete
+Course codes and names are indexed once by trigram (substring search) and by
+sorted keys (prefix autocomplete), so queries touch only matching postings
+instead of re-scanning and upper-casing the whole catalogue
+"""
+
+import re
+from array import array
+from bisect import bisect_left
+
+from subject_data import SnapshotCache
+
+_TOKEN_RE = re.compile(r'[A-Z0-9]+')
+_GRAM = 3
+
+
+def _grams(text):
+    return {text[i:i + _GRAM] for i in range(len(text) - _GRAM + 1)}
+
+
+def _tokens(text):
+    return _TOKEN_RE.findall(text.upper())
+
+
+class _PrefixKeys:
+    """Sorted (key, doc) pairs answering "keys starting with prefix" by binary search"""
+
+    def __init__(self, pairs):
+        pairs.sort()
+        self._pairs = pairs
+        self._keys = [key for key, _ in pairs]
+
+    def docs(self, prefix):
+        """Yield docs whose key starts with prefix, in key order"""
+        pairs = self._pairs
+        for index in range(bisect_left(self._keys, prefix), len(pairs)):
+            key, doc = pairs[index]
+            if not key.startswith(prefix):
+                break
+            yield doc
+
+    def count(self, prefix):
+        return bisect_left(self._keys, prefix + "\uffff") - bisect_left(self._keys, prefix)
+
+
+class SubjectSearchIndex:
+    """Trigram postings plus sorted prefix keys over (code, info) records
+
+    Results are ranked in tiers: exact code, code prefix, name prefix, prefix
+    of a later word of the name, then substring and all-tokens matches. The
+    prefix tiers are binary-search ranges read in key order, so a limited
+    query stops after `limit` hits; only queries those tiers cannot fill
+    fall back to the trigram postings.
+    """
+
+    def __init__(self, subjects):
+        self.codes = []
+        self.names = []
+        self.words = []
+        self.infos = []
+        postings = {}
+        code_keys = []
+        name_keys = []
+        word_keys = []
+
+        for doc, (code, info) in enumerate(subjects):
+            code = code.upper()
+            name = info["name"].upper()
+            self.codes.append(code)
+            self.names.append(name)
+            self.words.append(tuple(_tokens(name)))
+            self.infos.append(info)
+
+            for gram in _grams(code) | _grams(name):
+                postings.setdefault(gram, []).append(doc)
+            code_keys.append((code, doc))
+            name_keys.append((name, doc))
+            # Name suffixes starting at each later word ("OF ALGORITHMS", "ALGORITHMS")
+            for word in list(_TOKEN_RE.finditer(name))[1:]:
+                word_keys.append((name[word.start():], doc))
+
+        # Doc ids are appended in order, so every posting list is already sorted
+        self._postings = {gram: array('I', docs) for gram, docs in postings.items()}
+        self._code_keys = _PrefixKeys(code_keys)
+        self._name_keys = _PrefixKeys(name_keys)
+        self._word_keys = _PrefixKeys(word_keys)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def _candidate_cost(self, token):
+        """Upper bound on the docs that can contain token, from postings/key ranges alone"""
+        if len(token) < _GRAM:
+            return self._code_keys.count(token) + self._name_keys.count(token) + self._word_keys.count(token)
+        return min(len(self._postings.get(gram, ())) for gram in _grams(token))
+
+    def _candidates(self, token):
+        """Docs that may contain token: its rarest trigram's postings, or its prefix ranges"""
+        if len(token) < _GRAM:
+            return sorted(set(self._code_keys.docs(token)) | set(self._name_keys.docs(token)) |
+                          set(self._word_keys.docs(token)))
+        return min((self._postings.get(gram, ()) for gram in _grams(token)), key=len)
+
+    def _matches(self, doc, token):
+        """Token is a substring of the code or name (a code/word prefix if shorter than a trigram)"""
+        if len(token) < _GRAM:
+            return self.codes[doc].startswith(token) or any(word.startswith(token) for word in self.words[doc])
+        return token in self.codes[doc] or token in self.names[doc]
+
+    def _result(self, doc):
+        return {"code": self.codes[doc], **self.infos[doc]}
+
+    def _take_prefix_tiers(self, query, limit, seen, ordered):
+        """Append code, name and later-word prefix matches; True once limit is reached"""
+        for keys in (self._code_keys, self._name_keys, self._word_keys):
+            for doc in keys.docs(query):
+                if doc not in seen:
+                    seen.add(doc)
+                    ordered.append(doc)
+                    if limit and len(ordered) >= limit:
+                        return True
+        return False
+
+    def search(self, query, limit=None):
+        """Subjects matching every query token, best matches first"""
+        query = " ".join(query.upper().split())
+        tokens = _tokens(query)
+        if not tokens:
+            return []
+
+        seen = set()
+        ordered = []
+        if self._take_prefix_tiers(query, limit, seen, ordered):
+            return [self._result(doc) for doc in ordered]
+
+        # Walk only the rarest token's candidates (in doc order) and check every
+        # token on them; contiguous substring hits rank above scattered tokens
+        tokens = sorted(set(tokens), key=self._candidate_cost)
+        needed = limit - len(ordered) if limit else None
+        substring = []
+        scattered = []
+        for doc in self._candidates(tokens[0]):
+            if doc in seen or not all(self._matches(doc, token) for token in tokens):
+                continue
+            if query in self.codes[doc] or query in self.names[doc]:
+                substring.append(doc)
+                if needed and len(substring) >= needed:
+                    break
+            else:
+                scattered.append(doc)
+        ordered.extend(substring)
+        ordered.extend(scattered)
+        return [self._result(doc) for doc in ordered[:limit]]
+
+    def complete(self, prefix, limit=10):
+        """Autocomplete: codes starting with prefix, then names, then later name words"""
+        prefix = " ".join(prefix.upper().split())
+        if not prefix:
+            return []
+
+        ordered = []
+        self._take_prefix_tiers(prefix, limit, set(), ordered)
+        return [self._result(doc) for doc in ordered]
+
+
+_index = SnapshotCache(lambda snapshot: SubjectSearchIndex(snapshot.index.iter_subjects()))
+
+
+def get_search_index():
+    """Return the search index for the live subject data, rebuilt after a reload"""
+    return _index.get()
+
+
+def search_subjects_ranked(query, limit=None):
+    """Ranked search over subject codes and names"""
+    return get_search_index().search(query, limit)
+
+
+def autocomplete_subjects(prefix, limit=10):
+    """Prefix autocomplete over subject codes and names"""
+    return get_search_index().complete(prefix, limit)
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Test script for bulk transcript upload handling
+"""
+
+import io
+import zipfile
+
+import batch_parser
+from batch_parser import BatchError, collect_batch_items, iter_batch_results
+
+
+def _zip_bytes(files):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, data in files.items():
+            archive.writestr(name, data)
+    buffer.seek(0)
+    return buffer
+
+
+def _echo_worker(filename, pdf_bytes, scheme):
+    if pdf_bytes == b"boom":
+        raise RuntimeError("worker crashed")
+    return {"success": True, "size": len(pdf_bytes), "scheme": scheme}
+
+
+def test_collect_expands_zip_and_flags_bad_files():
+    archive = _zip_bytes({"a.pdf": b"%PDF-a", "notes.txt": b"skip me", "dir/b.PDF": b"%PDF-b"})
+    items = list(collect_batch_items([
+        ("one.pdf", io.BytesIO(b"%PDF-1")),
+        ("photo.png", io.BytesIO(b"png")),
+        ("batch.zip", archive),
+    ]))
+    assert [(name, error is None) for name, _, error in items] == [
+        ("one.pdf", True),
+        ("photo.png", False),
+        ("batch.zip/a.pdf", True),
+        ("batch.zip/dir/b.PDF", True),
+    ]
+
+
+def test_collect_rejects_empty_batch():
+    try:
+        collect_batch_items([("empty.zip", _zip_bytes({}))])
+    except BatchError:
+        pass
+    else:
+        raise AssertionError("expected BatchError")
+
+
+def test_collect_limits_archive_and_entry_sizes(monkeypatch):
+    monkeypatch.setattr(batch_parser, "BATCH_MAX_FILE_BYTES", 8)
+    items = list(collect_batch_items([("batch.zip", _zip_bytes({"small.pdf": b"%PDF-1", "big.pdf": b"%PDF-" + b"x" * 50}))]))
+    assert [(name, error) for name, _, error in items] == [
+        ("batch.zip/small.pdf", None),
+        ("batch.zip/big.pdf", "File exceeds the maximum PDF size"),
+    ]
+
+    monkeypatch.setattr(batch_parser, "BATCH_MAX_ARCHIVE_BYTES", 64)
+    items = list(collect_batch_items([("batch.zip", _zip_bytes({f"{n}.pdf": b"%PDF-1" for n in range(5)}))]))
+    assert items == [("batch.zip", None, "Archive exceeds the maximum zip size")]
+
+
+def test_collect_stops_reading_at_the_file_limit(monkeypatch):
+    monkeypatch.setattr(batch_parser, "BATCH_MAX_FILES", 3)
+    read = []
+    real_read_pdf = batch_parser._read_pdf
+    monkeypatch.setattr(batch_parser, "_read_pdf", lambda name, stream: read.append(name) or real_read_pdf(name, stream))
+    try:
+        list(collect_batch_items([("batch.zip", _zip_bytes({f"{n}.pdf": b"%PDF-1" for n in range(10)}))]))
+    except BatchError:
+        pass
+    else:
+        raise AssertionError("expected BatchError")
+    assert len(read) == 4
+
+
+def test_collect_reads_lazily_up_to_the_total_size(monkeypatch):
+    monkeypatch.setattr(batch_parser, "BATCH_MAX_TOTAL_BYTES", 20)
+    read = []
+    real_read_pdf = batch_parser._read_pdf
+    monkeypatch.setattr(batch_parser, "_read_pdf", lambda name, stream: read.append(name) or real_read_pdf(name, stream))
+    items = collect_batch_items([(f"{n}.pdf", io.BytesIO(b"%PDF-1234")) for n in range(5)])
+    assert read == ["0.pdf"]  # only the first file, to reject an empty batch
+    assert next(items)[0] == "0.pdf" and next(items)[0] == "1.pdf"
+    try:
+        next(items)
+    except BatchError as e:
+        assert "maximum total size" in str(e)
+    else:
+        raise AssertionError("expected BatchError")
+    assert len(read) == 3
+
+
+def test_results_only_read_items_as_slots_free_up():
+    read = []
+
+    def items():
+        for n in range(6):
+            read.append(n)
+            yield f"{n}.pdf", b"%PDF-" + bytes([n]), None
+
+    results = iter_batch_results(items(), _echo_worker, max_in_flight=2)
+    first = next(results)
+    assert first["success"] and len(read) <= 3
+    assert sorted(record["index"] for record in [first, *results]) == list(range(6))
+
+
+def test_results_of_files_read_before_a_batch_limit_are_kept(monkeypatch):
+    monkeypatch.setattr(batch_parser, "BATCH_MAX_FILES", 2)
+    items = collect_batch_items([(f"{n}.pdf", io.BytesIO(b"%PDF-1")) for n in range(4)])
+    records = []
+    try:
+        for record in iter_batch_results(items, _echo_worker, max_in_flight=4):
+            records.append(record)
+    except BatchError:
+        pass
+    else:
+        raise AssertionError("expected BatchError")
+    assert sorted(record["file"] for record in records) == ["0.pdf", "1.pdf"]
+
+
+def test_worker_errors_are_isolated():
+    items = [("a.pdf", b"%PDF-a", None), ("b.pdf", b"boom", None), ("c.txt", None, "File must be a PDF")]
+    records = sorted(iter_batch_results(items, _echo_worker, "2022"), key=lambda r: r["index"])
+    assert [r["success"] for r in records] == [True, False, False]
+    assert records[0]["size"] == 6 and records[0]["scheme"] == "2022"
+    assert "worker crashed" in records[1]["error"]
+
+
+if __name__ == "__main__":
+    test_collect_expands_zip_and_flags_bad_files()
+    test_collect_rejects_empty_batch()
+    test_worker_errors_are_isolated()
+    print("✅ Batch parser tests passed")
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Test script for the parser benchmark harness and its baseline check
+"""
+
+import copy
+
+import benchmark
+from transcript_generator import generate_corpus
+
+
+def test_percentile():
+    assert benchmark.percentile([], 50) == 0.0
+    assert benchmark.percentile([5, 1, 3, 2, 4], 50) == 3
+    assert benchmark.percentile(list(range(1, 101)), 99) == 99
+
+
+def test_small_run_with_gemini_stub():
+    corpus = generate_corpus(4, seed=1)
+    restore = benchmark.install_gemini_stub(corpus, "stub", latency=0)
+    try:
+        report = benchmark.run_benchmark(corpus, repeat=1, warmup=0, measure_memory=False)
+    finally:
+        restore()
+    assert report["latency"]["count"] == 4
+    assert {"upload_read", "gemini", "sgpa"} <= set(report["stages"])
+    # The stub returns the true courses, so everything it answers is exact
+    assert report["accuracy"]["course_accuracy"] == 1.0
+    assert report["accuracy"]["exact_transcripts"] == 1.0
+
+
+def test_compare_to_baseline():
+    corpus = generate_corpus(2, seed=2)
+    restore = benchmark.install_gemini_stub(corpus, "off")
+    try:
+        baseline = benchmark.run_benchmark(corpus, repeat=1, warmup=0)
+    finally:
+        restore()
+    assert benchmark.compare_to_baseline(baseline, baseline) == []
+
+    slower = copy.deepcopy(baseline)
+    slower["config"]["repeat"] = 5  # not part of the corpus
+    slower["latency"]["p99_ms"] = baseline["latency"]["p99_ms"] * 2
+    slower["accuracy"]["code_recall"] = baseline["accuracy"]["code_recall"] - 0.1
+    regressions = benchmark.compare_to_baseline(slower, baseline)
+    assert any(item.startswith("latency p99_ms") for item in regressions)
+    assert any(item.startswith("accuracy overall code_recall") for item in regressions)
+    assert not any(item.startswith("latency") for item in
+                   benchmark.compare_to_baseline(slower, baseline, check_timing=False))
+
+    other_corpus = copy.deepcopy(baseline)
+    other_corpus["config"]["transcripts"] = 3
+    assert benchmark.compare_to_baseline(other_corpus, baseline)[0].startswith("corpus differs")
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Test script for incremental CGPA tracking
+"""
+
+import os
+import tempfile
+
+import cgpa_tracker
+import vtu_pdf_parser as parser
+from cgpa_tracker import CGPATracker, course_semester
+
+
+def subject(credits, grade_point, total=None):
+    return {"credits": credits, "grade_point": grade_point, "total": total, "result": "F" if grade_point == 0 else "P"}
+
+
+def test_semesters_accumulate_and_later_results_replace_earlier():
+    with tempfile.TemporaryDirectory() as directory:
+        now = [1.0]
+        tracker = CGPATracker(os.path.join(directory, "cgpa.sqlite3"), clock=lambda: now[0])
+        tracker.record("1AB22CS001", {"BCS301": subject(4, 8), "BCS302": subject(3, 0)})
+        now[0] = 2.0
+        summary = tracker.record("1AB22CS001", {"BCS401": subject(4, 10), "BCS402": subject(4, 6)})
+        assert summary["semesters"]["3"]["sgpa"] == round(32 / 7, 2)
+        assert summary["semesters"]["4"]["sgpa"] == 8.0
+        assert summary["cgpa"] == round((32 + 64) / 15, 2)
+
+        # Supplementary exam: BCS302 passed later, only its row and semester change
+        now[0] = 3.0
+        summary = tracker.record("1AB22CS001", {"BCS302": subject(3, 7)})
+        assert summary["updated_courses"] == ["BCS302"]
+        assert summary["semesters"]["3"] == {"sgpa": round(53 / 7, 2), "credits": 7, "credit_points": 53, "courses": 2}
+        assert summary["cgpa"] == round((53 + 64) / 15, 2)
+
+        assert tracker.summary("1AB22CS001", include_courses=True)["course_results"][1]["recorded_at"] == 3.0
+
+        assert tracker.summary("1AB22CS002")["semesters"] == {}
+        assert tracker.forget("1AB22CS001") == 4
+        assert tracker.summary("1AB22CS001")["cgpa"] == 0.0
+
+
+def test_course_semester():
+    assert course_semester("BCS401") == "4"
+    assert course_semester("21CS42") == "4"
+    assert course_semester("XYZ", default=6) == "6"
+
+
+def test_cgpa_endpoint(monkeypatch):
+    original = parser.cgpa_tracker
+    monkeypatch.setattr(cgpa_tracker, "CGPA_TOKEN", "secret")
+    auth = {"X-CGPA-Token": "secret"}
+    with tempfile.TemporaryDirectory() as directory:
+        parser.cgpa_tracker = CGPATracker(os.path.join(directory, "cgpa.sqlite3"))
+        try:
+            client = parser.app.test_client()
+            assert client.get("/cgpa/1AB22CS001", headers=auth).status_code == 404
+            response = client.post("/cgpa/1ab22cs001", json={"subjects": {"BCS401": subject(4, 9)}}, headers=auth)
+            assert response.status_code == 200 and response.get_json()["cgpa"] == 9.0
+            body = client.get("/cgpa/1AB22CS001?courses=1", headers=auth).get_json()
+            assert body["course_results"][0]["code"] == "BCS401"
+            assert client.post("/cgpa/1AB22CS001", json={"subjects": {"BCS401": {}}}, headers=auth).status_code == 400
+            assert client.get("/cgpa/not a usn", headers=auth).status_code == 400
+
+            # Grade history is never served or deleted without the token
+            assert client.get("/cgpa/1AB22CS001").status_code == 403
+            assert client.delete("/cgpa/1AB22CS001", headers={"X-CGPA-Token": "guess"}).status_code == 403
+            assert client.delete("/cgpa/1AB22CS001", headers=auth).get_json()["removed_courses"] == 1
+        finally:
+            parser.cgpa_tracker = original
+
+
+def test_cgpa_endpoint_is_disabled_without_a_token(monkeypatch):
+    monkeypatch.setattr(cgpa_tracker, "CGPA_TOKEN", "")
+    assert not cgpa_tracker.cgpa_access_allowed("")
+    assert parser.app.test_client().get("/cgpa/1AB22CS001", headers={"X-CGPA-Token": ""}).status_code == 403
+
+
+if __name__ == "__main__":
+    test_semesters_accumulate_and_later_results_replace_earlier()
+    test_course_semester()
+    print("✅ CGPA tracker tests passed")
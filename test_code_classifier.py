@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Test script for the prefix-trie scheme and branch classifier
+"""
+
+from code_classifier import CodeClassifier, literal_prefix
+from vtu_pdf_parser import VTU_SCHEMES, VTU_BRANCHES, detect_scheme_from_text, detect_branch_from_subjects
+
+classifier = CodeClassifier(VTU_SCHEMES, VTU_BRANCHES)
+
+
+def test_literal_prefix():
+    assert literal_prefix(r"21[A-Z]{2,4}\d{2,3}") == "21"
+    assert literal_prefix(r"B[A-Z]{2}\d{3}[A-Z]?") == "B"
+    assert literal_prefix(r"AB?C") == "A"
+
+
+def test_classify_code():
+    assert classifier.classify_code("bcs401")[:2] == ("2022", "CS")
+    assert classifier.classify_code("21EC41")[:2] == ("2021", "EC")
+    assert classifier.classify_code("BMATS101")[:2] == ("2024", None)
+    assert classifier.classify_code("XYZ123")[:2] == (None, None)
+
+
+def test_transcript_scores_and_confidence():
+    text = "BCS401 ANALYSIS 45 38 83 P BCS402 MICRO 40 30 70 P BEC403 ELECTRONICS 30 30 60 P"
+    result = classifier.classify_text(text)
+    assert result.scheme == "2022"
+    assert result.branch == "CS"
+    assert result.branch_confidence == round(2 / 3, 4)
+    assert 0 < result.scheme_confidence <= 1
+
+
+def test_parser_helpers_use_classifier():
+    assert detect_scheme_from_text("18CS51 MANAGEMENT 40 40 80 P 18CS52 NETWORKS 40 40 80 P") == "2018"
+    assert detect_scheme_from_text("no course codes here") == "2022"
+    assert detect_branch_from_subjects({"21ME31": {}, "21ME32": {}, "21MA301": {}}) == "ME"
+    assert detect_branch_from_subjects({}) == "Unknown"
+
+
+if __name__ == "__main__":
+    test_literal_prefix()
+    test_classify_code()
+    test_transcript_scores_and_confidence()
+    test_parser_helpers_use_classifier()
+    print("✅ Code classifier tests passed")
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Test script for the fuzzy course-code resolver
+"""
+
+from code_resolver import CodeResolver, is_safe_correction, levenshtein
+
+CODES = ["BCS401", "BCS402", "BCSL404", "BBOC407", "BCS515X", "21CS305"]
+
+
+def test_levenshtein():
+    assert levenshtein("BCS401", "BCS401") == 0
+    assert levenshtein("BCS401", "BCS4010") == 1
+    assert levenshtein("BCS515X", "BCS515") == 1
+    assert levenshtein("", "ABC") == 3 and levenshtein("ABC", "") == 3
+    assert levenshtein("KITTEN", "SITTING") == 3
+
+
+def test_resolves_lookalikes_and_dropped_suffixes():
+    resolver = CodeResolver(lambda: CODES)
+    match = resolver.resolve("bcs4o1")
+    assert match.code == "BCS401" and match.distance == 0.5 and match.confidence > 0.9
+    assert resolver.resolve("8BOC4O7").code == "BBOC407"
+    assert resolver.resolve("BCS515").code == "BCS515X"
+    assert resolver.resolve("21C5305").code == "21CS305"
+
+
+def test_ambiguous_and_unknown_codes_are_not_trusted():
+    resolver = CodeResolver(lambda: CODES)
+    match = resolver.resolve("BCS40")
+    assert match.candidates == ["BCS401", "BCS402"] and match.confidence < 0.5
+    assert resolver.resolve("XYZ999") is None
+
+
+def test_close_codes_of_other_courses_are_not_corrections():
+    resolver = CodeResolver(lambda: CODES + ["BEC101", "21CS303"])
+    assert resolver.correct("BCS4O1") == "BCS401"
+    assert resolver.correct("BCS515") == "BCS515X"
+    for code in ["BCS451", "BEC401", "BAD402", "21CS53", "BCS515Y"]:
+        assert resolver.correct(code) is None, code
+    assert not is_safe_correction("BCS451", "BCS401")
+    assert not is_safe_correction("BCS40", "BCS401")
+    assert is_safe_correction("8BOC4O7", "BBOC407")
+
+
+def test_parse_response_reports_corrected_codes():
+    import vtu_pdf_parser as parser
+    from subject_record import SubjectRecord
+
+    subjects = {code: SubjectRecord(code=code, internal=40, external=40, total=80, credits=4, grade_point=9)
+                for code in ["BCS4O1", "BCS402"]}
+    assert parser.build_result_payload(subjects, "2022")["code_corrections"] == {"BCS4O1": "BCS401"}
+    assert parser.get_subject_name("BCS451") == "BCS451"  # unknown stays unknown
+
+
+def test_each_code_is_resolved_once():
+    resolver = CodeResolver(lambda: CODES)
+    resolved = []
+    real_resolve = resolver.resolve
+    resolver.resolve = lambda code: resolved.append(code) or real_resolve(code)
+    for _ in range(3):
+        assert resolver.correct("bcs4o1") == "BCS401"
+        assert resolver.correct("XYZ999") is None
+    assert resolved == ["bcs4o1", "XYZ999"]
+
+
+if __name__ == "__main__":
+    test_levenshtein()
+    test_resolves_lookalikes_and_dropped_suffixes()
+    test_ambiguous_and_unknown_codes_are_not_trusted()
+    test_close_codes_of_other_courses_are_not_corrections()
+    test_parse_response_reports_corrected_codes()
+    test_each_code_is_resolved_once()
+    print("✅ Code resolver tests passed")
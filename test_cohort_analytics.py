@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Test script for cohort analytics
+"""
+
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+import vtu_pdf_parser as parser
+from cohort_analytics import analyze_cohort, read_results
+
+CREDITS = {"BCS401": 4, "BCS402": 4, "BCS403": 3, "BBOC407": 2}
+
+
+def make_result(student, marks):
+    subjects = {}
+    for code, total in marks.items():
+        grade, point = parser.grade_marks(total, "2022")
+        subjects[code] = {"code": code, "name": code, "internal": 0, "external": total, "total": total,
+                          "grade_point": point, "credits": CREDITS[code], "grade": grade,
+                          "result": "F" if total < 40 else "P", "credit_points": point * CREDITS[code]}
+    return {"file": student, **parser.build_result_payload(subjects, "2022")}
+
+
+def test_statistics_match_per_student_results():
+    rng = np.random.default_rng(3)
+    results = [make_result(f"student{i}.pdf", dict(zip(CREDITS, rng.integers(20, 101, len(CREDITS)).tolist())))
+               for i in range(300)]
+    results.append({"file": "broken.pdf", "index": 300, "success": False, "error": "No subjects found"})
+
+    stats = analyze_cohort(results, tail_percent=10, tail_limit=5)
+    sgpas = [result["sgpa"] for result in results[:-1]]
+    assert stats["students"] == 300 and stats["skipped"] == 1
+    assert stats["sgpa"]["max"] == max(sgpas) and stats["sgpa"]["min"] == min(sgpas)
+    assert sum(stats["sgpa"]["histogram"]["counts"]) == 300
+    assert stats["sgpa"]["top"][0]["sgpa"] == max(sgpas) and len(stats["sgpa"]["top"]) == 5
+    assert stats["sgpa"]["bottom"][0]["sgpa"] == min(sgpas)
+
+    passed = sum(1 for result in results[:-1] if result["subjects"]["BCS401"]["result"] == "P")
+    assert stats["subjects"]["BCS401"]["passed"] == passed
+    assert stats["subjects"]["BCS401"]["pass_rate"] == round(passed / 300, 4)
+    assert sum(stats["subjects"]["BCS401"]["grades"].values()) == 300
+    assert sum(stats["grades"].values()) == 300 * len(CREDITS)
+
+
+def test_ndjson_input_and_endpoint():
+    results = [make_result("a.pdf", {"BCS401": 95, "BCS402": 35}), make_result("b.pdf", {"BCS401": 61})]
+    ndjson = "".join(json.dumps(result) + "\n" for result in results)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "batch.ndjson")
+        with open(path, "w") as batch_file:
+            batch_file.write(ndjson)
+        assert read_results(path) == results
+
+    client = parser.app.test_client()
+    response = client.post("/analytics/cohort", data=ndjson, content_type="application/x-ndjson")
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["students"] == 2
+    assert body["subjects"]["BCS401"]["grades"] == {"O": 1, "B+": 1}
+    assert body["subjects"]["BCS402"]["pass_rate"] == 0.0
+    assert client.post("/analytics/cohort", json={"results": "nope"}).status_code == 400
+
+
+def test_ten_thousand_students_in_well_under_a_second():
+    template = make_result("x", {"BCS401": 80, "BCS402": 55, "BCS403": 42, "BBOC407": 91})
+    results = [{**template, "file": f"{i}.pdf"} for i in range(10000)]
+    started = time.perf_counter()
+    stats = analyze_cohort(results)
+    assert stats["students"] == 10000
+    assert time.perf_counter() - started < 1.0
+
+
+if __name__ == "__main__":
+    test_statistics_match_per_student_results()
+    test_ndjson_input_and_endpoint()
+    test_ten_thousand_students_in_well_under_a_second()
+    print("✅ Cohort analytics tests passed")
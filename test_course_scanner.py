@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Test script for the precompiled course-line scanner
+"""
+
+from course_scanner import normalize_text, scan_course_lines
+
+SAMPLE_PAGE = """
+Subject Code  Subject Name                       Internal  External  Total  Result
+BCS401        ANALYSIS & DESIGN OF ALGORITHMS    45        38        83     P
+BCS402        MICROCONTROLLERS                   40        30        70     P
+BBOC407       BIOLOGY FOR COMPUTER ENGINEERS     20        12        32     F
+"""
+
+
+def test_standard_table_uses_first_pattern():
+    matches, strategy = scan_course_lines(normalize_text(SAMPLE_PAGE))
+    assert strategy == "pattern_1"
+    assert [m[0] for m in matches] == ["BCS401", "BCS402", "BBOC407"]
+    assert matches[0][2:] == ("45", "38", "83", "P")
+
+
+def test_loose_text_falls_through_to_last_pattern():
+    text = normalize_text("BCS401: internal=45 / external=38 / total=83")
+    matches, strategy = scan_course_lines(text)
+    assert strategy == "pattern_9"
+    assert matches == [("BCS401", "45", "38", "83")]
+
+
+def test_no_course_codes():
+    assert scan_course_lines(normalize_text("No results published yet")) == ([], None)
+
+
+if __name__ == "__main__":
+    test_standard_table_uses_first_pattern()
+    test_loose_text_falls_through_to_last_pattern()
+    test_no_course_codes()
+    print("✅ Course scanner tests passed")
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Test script for the precomputed curriculum aggregates and /curriculum
+"""
+
+from curriculum import CurriculumCatalog
+
+ROWS = [
+    ("2022", "CS", "4", "BCS401", 3, "PCC"),
+    ("2022", "CS", "4", "BCS405A", 3, "ESC"),
+    ("2022", "CS", "4", "BCS405B", 3, "ESC"),
+    ("2022", "CS", "4", "BBOC407", 2, "AEC"),
+    ("2022", "CS", "3", "BCS301", 4, "PCC"),
+    ("2022", "CS", "PEC", "BCS613A", 3, "PEC"),
+]
+
+
+def test_semester_aggregates_and_elective_groups():
+    catalog = CurriculumCatalog(ROWS)
+    semester = catalog.select("2022", "CS", 4)
+    assert semester["total_credits"] == 11
+    assert semester["expected_credits"] == 8  # one of BCS405A/B
+    assert semester["counts_by_type"] == {"PCC": 1, "ESC": 2, "AEC": 1}
+    assert semester["elective_groups"] == [
+        {"group": "BCS405", "type": "ESC", "credits": 3, "options": ["BCS405A", "BCS405B"]}
+    ]
+
+    branch = catalog.select("2022", "CS")
+    assert list(branch["semesters"]) == ["3", "4", "PEC"]
+    assert branch["total_credits"] == 18 and branch["expected_credits"] == 12
+    assert catalog.select("2022", "EC") is None
+
+
+def test_responses_are_serialized_once_with_stable_etags():
+    catalog = CurriculumCatalog(ROWS)
+    body, etag = catalog.response("2022", "CS", "4")
+    assert catalog.response("2022", "CS", 4) == (body, etag)
+    assert catalog.response("2022", "CS")[1] != etag
+    assert catalog.response("2018") is None
+
+
+def test_curriculum_endpoint_honours_if_none_match():
+    import vtu_pdf_parser as parser
+    client = parser.app.test_client()
+    response = client.get("/curriculum?scheme=2022&branch=CS&semester=4")
+    assert response.status_code == 200
+    assert "max-age" in response.headers["Cache-Control"]
+    etag = response.headers["ETag"]
+    assert client.get("/curriculum?scheme=2022&branch=CS&semester=4", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/curriculum?scheme=1999").status_code == 404
+
+
+if __name__ == "__main__":
+    test_semester_aggregates_and_elective_groups()
+    test_responses_are_serialized_once_with_stable_etags()
+    test_curriculum_endpoint_honours_if_none_match()
+    print("✅ Curriculum tests passed")
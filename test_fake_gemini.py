@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test script for the fake Gemini endpoint and the load-test helpers
+"""
+
+import pytest
+
+import load_test
+import vtu_pdf_parser as parser
+from fake_gemini import FakeGeminiServer
+from gemini_client import CircuitBreaker, GeminiClient
+from gemini_store import GeminiResponseStore
+from transcript_generator import generate_transcript
+
+
+@pytest.fixture
+def point_parser_at(monkeypatch, tmp_path):
+    """Route parse_with_gemini_ai to a started fake with an empty response store"""
+    fakes = []
+
+    def point(fake):
+        fakes.append(fake.start())
+        monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+        monkeypatch.setattr(parser, "gemini_client",
+                            GeminiClient(base_url=fake.url, breaker=CircuitBreaker(failure_threshold=100)))
+        monkeypatch.setattr(parser, "gemini_store", GeminiResponseStore(str(tmp_path / "store.sqlite3")))
+        return fake
+
+    yield point
+    for fake in fakes:
+        fake.stop()
+
+
+def test_registered_transcript_is_answered(point_parser_at):
+    fake = point_parser_at(FakeGeminiServer(latency=0))
+    transcript = generate_transcript("2022", seed=3)
+    fake.register(transcript["pdf"], transcript["expected"])
+
+    subjects = parser.parse_with_gemini_ai(transcript["pdf"])
+    assert set(subjects) == set(transcript["expected"])
+    for code, course in transcript["expected"].items():
+        assert subjects[code].total == course["total"]
+        assert subjects[code].result == course["result"]
+    assert fake.stats()["answered"] == 1
+
+
+@pytest.mark.parametrize("options, counter", [({"error_rate": 1.0}, "errors"),
+                                              ({"malformed_rate": 1.0}, "malformed")])
+def test_injected_failures_make_the_parser_fall_back(point_parser_at, options, counter):
+    fake = point_parser_at(FakeGeminiServer(latency=0, **options))
+    for seed in range(4):
+        transcript = generate_transcript("2021", seed=seed)
+        fake.register(transcript["pdf"], transcript["expected"])
+        assert parser.parse_with_gemini_ai(transcript["pdf"]) is None
+    assert fake.stats()[counter] == 4
+    assert fake.stats()["answered"] == 0
+
+
+def test_latency_and_rates_are_reproducible():
+    first = FakeGeminiServer(latency=1.0, jitter=0.3, error_rate=0.2, malformed_rate=0.2, seed=7)
+    second = FakeGeminiServer(latency=1.0, jitter=0.3, error_rate=0.2, malformed_rate=0.2, seed=7)
+    try:
+        decisions = [first._decide() for _ in range(200)]
+        assert decisions == [second._decide() for _ in range(200)]
+        outcomes = [outcome for _, outcome, _ in decisions]
+        assert 20 < outcomes.count("error") < 60
+        assert 20 < outcomes.count("malformed") < 60
+        assert all(delay >= 0 for delay, _, _ in decisions)
+    finally:
+        first._server.server_close()
+        second._server.server_close()
+
+
+def test_parse_config():
+    assert load_test.parse_config("4x8") == {"workers": 4, "threads": 8, "policy": "gemini-first"}
+    assert load_test.parse_config("1x2:race")["policy"] == "race"
+    with pytest.raises(ValueError):
+        load_test.parse_config("four")
+
+
+def test_summary_counts_fallbacks_from_metrics():
+    scrape = """# TYPE vtu_parse_strategy_total counter
+vtu_parse_strategy_total{strategy="gemini"} %d
+vtu_parse_strategy_total{strategy="pattern_1"} %d
+vtu_parse_stage_seconds_sum{stage="gemini"} %s
+vtu_parse_stage_seconds_count{stage="gemini"} %d
+vtu_parse_stage_seconds_bucket{stage="gemini",le="0.5"} 1
+"""
+    before = load_test.parse_metrics_text(scrape % (2, 1, "1.0", 2))
+    after = load_test.parse_metrics_text(scrape % (8, 3, "4.0", 8))
+    assert ("vtu_parse_strategy_total", "gemini") in after
+    records = [{"status": 200, "latency_ms": float(ms)} for ms in range(10, 90, 10)]
+    records.append({"status": 503, "latency_ms": 5.0})
+    summary = load_test.summarize(records, 2.0, before, after, {"requests": 3}, {"requests": 9})
+
+    assert summary["strategies"] == {"gemini": 6, "pattern_1": 2}
+    assert summary["fallback_rate"] == 0.25
+    assert summary["errors"] == {"503": 1}
+    assert summary["throughput_per_second"] == 4.0
+    assert summary["stage_mean_ms"] == {"gemini": 500.0}
+    assert summary["gemini_calls"] == {"requests": 6}
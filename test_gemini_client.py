@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Test script for the pooled Gemini client against a local HTTP stand-in
+"""
+
+import base64
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from gemini_client import CircuitBreaker, GeminiClient, InlinePDFRequestBody
+
+SUBJECTS = [{"code": "BCS401", "name": "ANALYSIS & DESIGN OF ALGORITHMS",
+             "internal": 45, "external": 38, "total": 83, "result": "P"}]
+
+
+class FakeGemini(BaseHTTPRequestHandler):
+    status = 200
+    requests_seen = 0
+    last_body = None
+
+    def do_POST(self):
+        type(self).requests_seen += 1
+        type(self).last_body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = json.dumps({"candidates": [{"content": {"parts": [{"text": json.dumps(SUBJECTS)}]}}]}).encode()
+        self.send_response(self.status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _start_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeGemini)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def test_generate_content_round_trip():
+    server, base_url = _start_server()
+    try:
+        FakeGemini.status = 200
+        client = GeminiClient(base_url=base_url, max_concurrency=2)
+        body = client.generate_content("test-key", {"contents": []})
+        text = body["candidates"][0]["content"]["parts"][0]["text"]
+        assert json.loads(text) == SUBJECTS
+        stats = client.stats()
+        assert stats["successes"] == 1 and stats["failures"] == 0
+        assert stats["circuit_state"] == "closed"
+    finally:
+        server.shutdown()
+
+
+def test_streamed_pdf_body_round_trip():
+    server, base_url = _start_server()
+    try:
+        FakeGemini.status = 200
+        pdf = b"%PDF-1.4\n" + os.urandom(200 * 1024 + 1)  # several chunks plus padding
+        body = InlinePDFRequestBody("Extract \"subjects\"", memoryview(pdf))
+        client = GeminiClient(base_url=base_url, max_concurrency=1)
+        assert client.generate_content("test-key", body=body) is not None
+
+        sent = json.loads(FakeGemini.last_body)
+        assert len(FakeGemini.last_body) == len(body)
+        parts = sent["contents"][0]["parts"]
+        assert parts[0]["text"] == 'Extract "subjects"'
+        assert base64.b64decode(parts[1]["inline_data"]["data"]) == pdf
+    finally:
+        server.shutdown()
+
+
+def test_circuit_opens_after_failures_and_probes_later():
+    server, base_url = _start_server()
+    now = [0.0]
+    try:
+        FakeGemini.status = 503
+        FakeGemini.requests_seen = 0
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=lambda: now[0])
+        client = GeminiClient(base_url=base_url, breaker=breaker)
+
+        assert client.generate_content("k", {}) is None
+        assert client.generate_content("k", {}) is None
+        assert breaker.state == CircuitBreaker.OPEN
+
+        # Open circuit: skipped without touching the network
+        assert client.generate_content("k", {}) is None
+        assert FakeGemini.requests_seen == 2
+        assert client.stats()["skipped_circuit_open"] == 1
+
+        # After the cool-down one probe goes out and closes the circuit
+        now[0] = 10.0
+        FakeGemini.status = 200
+        assert client.generate_content("k", {}) is not None
+        assert breaker.state == CircuitBreaker.CLOSED
+    finally:
+        server.shutdown()
+
+
+def test_open_circuit_skips_without_waiting_for_a_slot():
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=lambda: now[0])
+    client = GeminiClient(base_url="http://127.0.0.1:9", max_concurrency=1, queue_timeout=0.5, breaker=breaker)
+    breaker.record_failure()
+    client.session  # builds this process's slots
+    client._slots.acquire()  # every slot busy
+    started = time.perf_counter()
+    assert client.generate_content("k", {}) is None
+    assert time.perf_counter() - started < 0.2
+    assert client.stats()["skipped_circuit_open"] == 1 and client.stats()["skipped_busy"] == 0
+
+    # A probe that finds no free slot is handed back for the next caller
+    now[0] = 10.0
+    assert client.generate_content("k", {}) is None
+    assert client.stats()["skipped_busy"] == 1
+    assert breaker.allow_request()
+
+
+def test_forked_process_gets_its_own_session(monkeypatch):
+    client = GeminiClient(base_url="http://127.0.0.1:9")
+    session = client.session
+    assert client.session is session
+    monkeypatch.setattr(os, "getpid", lambda: -1)  # as seen from a forked child
+    assert client.session is not session
+
+
+def test_connection_refused_counts_as_failure():
+    client = GeminiClient(base_url="http://127.0.0.1:9", connect_timeout=0.5)
+    assert client.generate_content("k", {}) is None
+    assert client.stats()["failures"] == 1
+
+
+if __name__ == "__main__":
+    test_generate_content_round_trip()
+    test_streamed_pdf_body_round_trip()
+    test_circuit_opens_after_failures_and_probes_later()
+    test_connection_refused_counts_as_failure()
+    print("✅ Gemini client tests passed")
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Test script for the persistent Gemini response store
+"""
+
+import os
+import tempfile
+
+from gemini_store import GeminiResponseStore
+
+SUBJECTS = [{"code": "BCS401", "internal": 45, "external": 38, "total": 83, "result": "P"}]
+
+
+def test_round_trip_survives_reopen():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "store.sqlite3")
+        store = GeminiResponseStore(path)
+        assert store.get("abc", "v1") is None
+        store.put("abc", "v1", SUBJECTS)
+        assert store.get("abc", "v1") == SUBJECTS
+        assert store.get("abc", "v2") is None  # other prompt version
+
+        reopened = GeminiResponseStore(path)
+        assert reopened.get("abc", "v1") == SUBJECTS
+        assert reopened.stats()["entries"] == 1
+
+
+def test_size_based_eviction_drops_least_recently_used():
+    with tempfile.TemporaryDirectory() as tmp:
+        entry_size = len('[{"code": "BCS401", "internal": 45, "external": 38, "total": 83, "result": "P"}]')
+        store = GeminiResponseStore(os.path.join(tmp, "store.sqlite3"), max_bytes=entry_size * 2)
+        store.put("a", "v1", SUBJECTS)
+        store.put("b", "v1", SUBJECTS)
+        store.get("a", "v1")  # "b" is now least recently used
+        store.put("c", "v1", SUBJECTS)
+
+        assert store.get("b", "v1") is None
+        assert store.get("a", "v1") == SUBJECTS
+        assert store.get("c", "v1") == SUBJECTS
+        assert store.stats()["size_bytes"] <= entry_size * 2
+
+
+if __name__ == "__main__":
+    test_round_trip_survives_reopen()
+    test_size_based_eviction_drops_least_recently_used()
+    print("✅ Gemini store tests passed")
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Test script for table-driven and bulk grading
+"""
+
+import numpy as np
+
+import vtu_pdf_parser as parser
+from grading import grade_cohort
+
+
+def reference_grade(marks, scheme):
+    """The original threshold scan"""
+    grade = "F"
+    for threshold, grade_letter in sorted(parser.VTU_SCHEMES[scheme]["marks_to_grade"].items(), reverse=True):
+        if marks >= threshold:
+            grade = grade_letter
+            break
+    return grade, parser.VTU_SCHEMES[scheme]["grading"].get(grade, 0)
+
+
+def test_tables_match_the_threshold_scan():
+    for scheme in parser.VTU_SCHEMES:
+        for marks in [m / 2 for m in range(-4, 215)] + [float("nan")]:
+            expected = reference_grade(marks, scheme)
+            assert parser.grade_marks(marks, scheme) == expected, (scheme, marks)
+            assert parser.get_grade_from_marks(marks, scheme) == expected[0]
+            assert parser.calculate_grade_point(marks, scheme) == expected[1]
+    assert parser.grade_marks(95, "1990") == ("F", 0)
+
+
+def test_cohort_sgpa_matches_calculate_sgpa():
+    rng = np.random.default_rng(7)
+    credits = [4, 4, 3, 3, 2, 1, 0]
+    marks = rng.integers(0, 101, size=(200, len(credits)))
+    result = grade_cohort(parser.grade_tables["2022"], marks, credits)
+
+    for student, row in enumerate(marks.tolist()):
+        subjects = {}
+        for position, (total, credit) in enumerate(zip(row, credits)):
+            letter, point = parser.grade_marks(total, "2022")
+            subjects[position] = {"code": str(position), "credits": credit, "grade_point": point,
+                                  "total": total, "result": "F" if total < 40 else "P"}
+        sgpa, total_credits, _, failed = parser.calculate_sgpa(subjects)
+        assert round(float(result["sgpa"][student]), 2) == sgpa
+        assert result["total_credits"][student] == total_credits
+        assert result["failed_count"][student] == len(failed)
+
+
+def test_bulk_grade_endpoint():
+    client = parser.app.test_client()
+    response = client.post("/grade/bulk", json={
+        "scheme": "2022",
+        "subjects": ["BCS401", "BBOC407"],
+        "marks": [[95, 39], [72, None]],
+        "students": ["1AB22CS001", "1AB22CS002"]
+    })
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["grades"] == [["O", "F"], ["A", None]]
+    assert body["grade_points"] == [[10, 0], [8, None]]
+    credits = parser.get_subject_credits("BCS401")
+    assert body["total_credits"] == [credits + 2, credits]
+    assert body["sgpa"][1] == 8.0
+    assert body["failed_count"] == [1, 0]
+
+    assert client.post("/grade/bulk", json={"scheme": "2022", "credits": [4], "marks": [[1, 2]]}).status_code == 400
+    assert client.post("/grade/bulk", json={"scheme": "1990", "credits": [4], "marks": [[1]]}).status_code == 400
+
+
+if __name__ == "__main__":
+    test_tables_match_the_threshold_scan()
+    test_cohort_sgpa_matches_calculate_sgpa()
+    test_bulk_grade_endpoint()
+    print("✅ Grading tests passed")
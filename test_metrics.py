@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Test script for the Prometheus metrics shared across worker processes
+"""
+
+import io
+import json
+import os
+
+import metrics
+import vtu_pdf_parser as parser
+
+VALID = {"BCS401": {"code": "BCS401", "internal": 45, "external": 38, "total": 83}}
+DEAD_PID = 2 ** 22 + 12345  # above any pid_max, so never a running process
+
+
+def _write_worker_file(directory, pid, values):
+    with open(os.path.join(directory, f"{pid}.json"), "w", encoding="utf-8") as metrics_file:
+        json.dump({"pid": pid, "values": values}, metrics_file)
+
+
+def test_registry_merges_processes(tmp_path):
+    registry = metrics.MetricsRegistry(str(tmp_path), flush_interval=60)
+    registry.inc("vtu_parse_strategy_total", "pattern_1")
+    registry.inc("vtu_requests_in_flight", "parse_pdf")
+    registry.observe("vtu_parse_stage_seconds", "matching", 0.003)
+    registry.observe("vtu_parse_stage_seconds", "matching", 0.2)
+
+    other = metrics.MetricsRegistry(str(tmp_path), flush_interval=60)
+    other.inc("vtu_parse_strategy_total", "pattern_1", 2)
+    other.observe("vtu_parse_stage_seconds", "matching", 0.04)
+    # A worker that has exited: its counts stay, its in-flight requests do not
+    other._values["vtu_requests_in_flight"]["parse_pdf"] = 5
+    _write_worker_file(str(tmp_path), DEAD_PID, other._copy_values())
+
+    merged = registry.collect()
+    assert merged["vtu_parse_strategy_total"] == {"pattern_1": 3}
+    assert merged["vtu_requests_in_flight"] == {"parse_pdf": 1}
+    histogram = merged["vtu_parse_stage_seconds"]["matching"]
+    assert sum(histogram[:-1]) == 3
+    assert abs(histogram[-1] - 0.243) < 1e-9
+
+    text = registry.render()
+    assert "# TYPE vtu_parse_stage_seconds histogram" in text
+    assert 'vtu_parse_stage_seconds_bucket{stage="matching",le="0.005"} 1' in text
+    assert 'vtu_parse_stage_seconds_bucket{stage="matching",le="0.05"} 2' in text
+    assert 'vtu_parse_stage_seconds_bucket{stage="matching",le="+Inf"} 3' in text
+    assert 'vtu_parse_stage_seconds_count{stage="matching"} 3' in text
+    assert 'vtu_parse_strategy_total{strategy="pattern_1"} 3' in text
+    assert "vtu_parse_jobs_in_flight" in text
+
+
+def test_flush_writes_this_process(tmp_path):
+    registry = metrics.MetricsRegistry(str(tmp_path), flush_interval=0)
+    registry.inc("vtu_parse_strategy_total", "gemini")
+    registry.flush()
+    with open(tmp_path / f"{os.getpid()}.json", encoding="utf-8") as metrics_file:
+        document = json.load(metrics_file)
+    assert document["values"]["vtu_parse_strategy_total"] == {"gemini": 1}
+    # Its own file is not counted twice
+    assert registry.collect()["vtu_parse_strategy_total"] == {"gemini": 1}
+
+
+def test_accepted_strategy_is_counted(monkeypatch, tmp_path):
+    registry = metrics.MetricsRegistry(str(tmp_path), flush_interval=60)
+    monkeypatch.setattr(metrics, "registry", registry)
+
+    def fake_gemini(upload, scheme=None):
+        return None
+
+    def fake_local(upload, scheme=None):
+        return parser._note_parse_outcome("local", (VALID, "2022"), "pattern_3")
+
+    monkeypatch.setattr(parser, "_parse_with_gemini_path", fake_gemini)
+    monkeypatch.setattr(parser, "_parse_with_local_path", fake_local)
+    assert parser.parse_vtu_pdf(io.BytesIO(b"%PDF"), policy="gemini-first")[0] == VALID
+    assert parser.parse_vtu_pdf(io.BytesIO(b"%PDF"), policy="race")[0] == VALID
+
+    monkeypatch.setattr(parser, "_parse_with_local_path", lambda upload, scheme=None: ({}, scheme))
+    parser.parse_vtu_pdf(io.BytesIO(b"%PDF"), policy="gemini-first")
+    assert registry.collect()["vtu_parse_strategy_total"] == {"pattern_3": 2, "none": 1}
+
+
+def test_metrics_endpoint(monkeypatch, tmp_path):
+    registry = metrics.MetricsRegistry(str(tmp_path), flush_interval=60)
+    monkeypatch.setattr(metrics, "registry", registry)
+    client = parser.app.test_client()
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["Content-Type"] == metrics.CONTENT_TYPE
+    # The scrape itself is in flight while it renders
+    assert 'vtu_requests_in_flight{endpoint="prometheus_metrics"} 1' in response.get_data(as_text=True)
+    assert registry.collect()["vtu_requests_in_flight"] == {"prometheus_metrics": 0}
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test script for early-terminating page extraction
+"""
+
+import os
+
+import page_extractor
+from page_extractor import extract_course_text, take_marks_table_pages
+from transcript_generator import build_pdf
+from upload_buffer import PDFUpload
+
+TABLE_PAGE = "BCS401 ANALYSIS & DESIGN OF ALGORITHMS 45 38 83 P"
+COVER_PAGE = "VISVESVARAYA TECHNOLOGICAL UNIVERSITY PROVISIONAL RESULTS"
+NOTES_PAGE = "NOTES Grades are provisional 2024"
+
+
+def _pages(texts, consumed):
+    for text in texts:
+        consumed.append(text)
+        yield text
+
+
+def test_stops_after_table_ends():
+    consumed = []
+    pages = take_marks_table_pages(_pages([COVER_PAGE, TABLE_PAGE, TABLE_PAGE, NOTES_PAGE, NOTES_PAGE, NOTES_PAGE], consumed), 1)
+    assert pages == [COVER_PAGE, TABLE_PAGE, TABLE_PAGE, NOTES_PAGE]
+    assert len(consumed) == 4  # later pages are never extracted
+
+
+def test_gap_setting_and_disable():
+    texts = [TABLE_PAGE, NOTES_PAGE, TABLE_PAGE, NOTES_PAGE, NOTES_PAGE]
+    assert len(take_marks_table_pages(iter(texts), 2)) == 5
+    assert len(take_marks_table_pages(iter(texts), 0)) == 5
+    assert len(take_marks_table_pages(iter(texts), 1)) == 2
+
+
+def test_blank_pages_between_semesters_do_not_end_the_table():
+    texts = [TABLE_PAGE, "", " ", TABLE_PAGE, NOTES_PAGE, NOTES_PAGE, TABLE_PAGE]
+    assert take_marks_table_pages(iter(texts), 1) == texts[:5]
+    assert take_marks_table_pages(iter(texts)) == texts[:6]  # the default waits for a run of two
+
+
+def test_reads_everything_when_no_table():
+    assert take_marks_table_pages(iter([COVER_PAGE, NOTES_PAGE]), 1) == [COVER_PAGE, NOTES_PAGE]
+
+
+def test_parallel_extraction_matches_serial(monkeypatch):
+    monkeypatch.setattr(page_extractor, "PDF_PARALLEL_MIN_PAGES", 2)
+    pdf_bytes = build_pdf([[(40, 700, f"BCS40{n} PAGE {n} 45 38 83 P", 9, False)] for n in range(6)])
+    with PDFUpload.from_bytes(pdf_bytes) as upload:
+        serial = extract_course_text(upload, max_workers=1)
+        assert extract_course_text(upload, max_workers=3).split() == serial.split()
+        assert "PAGE 5" in serial
+        with upload.open() as reader:
+            assert reader.read(4) == b"%PDF"  # the upload is still usable afterwards
+
+
+
+def test_forked_process_starts_its_own_pool(monkeypatch):
+    monkeypatch.setattr(page_extractor, "_pool", None)
+    pool = page_extractor._get_pool(2)
+    try:
+        assert page_extractor._get_pool(2) is pool
+        monkeypatch.setattr(os, "getpid", lambda: -1)  # as seen from a forked child
+        child_pool = page_extractor._get_pool(2)
+        assert child_pool is not pool
+        child_pool.shutdown()
+    finally:
+        pool.shutdown()
+
+
+if __name__ == "__main__":
+    test_stops_after_table_ends()
+    test_gap_setting_and_disable()
+    test_blank_pages_between_semesters_do_not_end_the_table()
+    test_reads_everything_when_no_table()
+    print("✅ Page extractor tests passed")
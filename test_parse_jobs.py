@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Test script for background parse jobs and their progress events
+"""
+
+import io
+import threading
+import time
+
+import vtu_pdf_parser as parser
+from parse_jobs import JobFailed, JobQueueFull, ParseJobManager, ParseJobStore, StoredJob, report_stage, sse_events
+from subject_record import SubjectRecord
+
+
+def wait_until_finished(job, timeout=5):
+    deadline = time.time() + timeout
+    while not job.finished and time.time() < deadline:
+        job.wait_for_events(len(job.events), 0.05)
+    assert job.finished
+
+
+def test_jobs_report_stages_and_results(tmp_path):
+    manager = ParseJobManager(max_workers=1, max_pending=2, store=ParseJobStore(str(tmp_path / "jobs.sqlite3")))
+    release = threading.Event()
+    finished = []
+
+    def work(value):
+        release.wait(5)
+        report_stage("matching", "Matching course lines")
+        if value == "bad":
+            raise JobFailed("No subjects found", detected_scheme="2022")
+        return {"value": value}
+
+    first = manager.submit(work, "ok", on_finish=lambda: finished.append("ok"))
+    second = manager.submit(work, "bad")
+    try:
+        manager.submit(work, "overflow")
+    except JobQueueFull:
+        pass
+    else:
+        assert False, "queue bound not enforced"
+
+    release.set()
+    wait_until_finished(first)
+    wait_until_finished(second)
+    assert first.status == "done" and first.result == {"value": "ok"} and finished == ["ok"]
+    assert [event["stage"] for event in first.events] == ["queued", "started", "matching", "done"]
+    assert second.status == "failed" and second.error == "No subjects found"
+    assert second.events[-1]["detected_scheme"] == "2022"
+    assert manager.get(first.id) is first and manager.get("nope") is None
+
+    stream = list(sse_events(first))
+    assert stream[0].startswith("id: 0\nevent: stage\n")
+    assert stream[-1].startswith("event: done\n") and '"value":"ok"' in stream[-1]
+    # A reconnecting client resumes after the last event it saw
+    assert list(sse_events(first, last_event_id="2")) == stream[-1:]
+
+
+def test_other_workers_read_jobs_from_the_store(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    accepting = ParseJobManager(max_workers=1, store=ParseJobStore(path))
+    other = ParseJobManager(max_workers=1, store=ParseJobStore(path))  # another gunicorn worker
+    release = threading.Event()
+
+    def work():
+        report_stage("matching", "Matching course lines")
+        release.wait(5)
+        return {"subjects": {"BCS401": {"grade": "A+"}}}
+
+    job = accepting.submit(work)
+    deadline = time.time() + 5
+    while len(job.events) < 3 and time.time() < deadline:
+        job.wait_for_events(len(job.events), 0.05)
+
+    seen = other.get(job.id)
+    assert isinstance(seen, StoredJob) and seen.status == "running" and not seen.finished
+    assert [event["stage"] for event in seen.to_dict()["events"]] == ["queued", "started", "matching"]
+    assert other.get("nope") is None
+
+    release.set()
+    stream = list(sse_events(seen, last_event_id="1"))
+    assert stream[0].startswith("id: 2\nevent: stage\n")
+    assert stream[-1].startswith("event: done\n") and '"grade":"A+"' in stream[-1]
+    assert other.get(job.id).to_dict()["result"] == {"subjects": {"BCS401": {"grade": "A+"}}}
+
+
+def test_finished_jobs_expire_from_the_store(tmp_path):
+    now = [1000.0]
+    path = str(tmp_path / "jobs.sqlite3")
+    manager = ParseJobManager(max_workers=1, ttl=60, clock=lambda: now[0], store=ParseJobStore(path))
+    job = manager.submit(lambda: {"value": 1})
+    wait_until_finished(job)
+    assert ParseJobStore(path).load(job.id)["status"] == "done"
+
+    now[0] += 120
+    manager.submit(lambda: None)  # expiry runs on submission
+    assert ParseJobStore(path).load(job.id) is None
+
+
+def test_parse_job_endpoints(monkeypatch, tmp_path):
+    monkeypatch.setattr(parser, "parse_jobs", ParseJobManager(store=ParseJobStore(str(tmp_path / "jobs.sqlite3"))))
+    record = SubjectRecord(code="BCS401", name="ANALYSIS & DESIGN OF ALGORITHMS", internal=45, external=38,
+                           total=83, grade_point=9, credits=4, grade="A+", credit_points=36)
+
+    def fake_parse(upload, scheme=None, policy=None):
+        report_stage("gemini", "Trying Gemini AI")
+        return {"BCS401": record}, "2022"
+
+    monkeypatch.setattr(parser, "parse_vtu_pdf", fake_parse)
+    client = parser.app.test_client()
+    response = client.post("/jobs/parse-pdf", data={"pdf_file": (io.BytesIO(b"%PDF-1.4 jobs test"), "a.pdf")},
+                           content_type="multipart/form-data")
+    assert response.status_code == 202
+    job = response.get_json()
+
+    stream = client.get(job["events_url"]).get_data(as_text=True)
+    assert "event: stage" in stream and '"stage": "gemini"' in stream and "event: done" in stream
+
+    state = client.get(job["status_url"]).get_json()
+    assert state["status"] == "done" and state["result"]["sgpa"] == 9.0
+    assert state["result"]["subjects"]["BCS401"]["grade"] == "A+"
+    assert client.get("/jobs/unknown").status_code == 404
+
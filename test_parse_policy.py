@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Test script for the Gemini/local parse execution policies
+"""
+
+import io
+import threading
+import time
+
+import vtu_pdf_parser as parser
+
+VALID = {"BCS401": {"code": "BCS401", "internal": 45, "external": 38, "total": 83}}
+BAD_TOTALS = {"BCS401": {"code": "BCS401", "internal": 45, "external": 38, "total": 12}}
+
+
+def _install_paths(monkeypatch, gemini_result, gemini_delay, local_result, calls, local_delay=0):
+    def fake_gemini(upload, scheme=None):
+        calls.append("gemini")
+        time.sleep(gemini_delay)
+        return (gemini_result, "2022") if gemini_result else None
+
+    def fake_local(upload, scheme=None):
+        calls.append("local")
+        time.sleep(local_delay)
+        return local_result, "2022"
+
+    monkeypatch.setattr(parser, "_parse_with_gemini_path", fake_gemini)
+    monkeypatch.setattr(parser, "_parse_with_local_path", fake_local)
+
+
+def test_parse_execution_policy():
+    assert parser.parse_execution_policy("race") == ("race", 0.0)
+    assert parser.parse_execution_policy("hedge-after-250-ms") == ("hedge", 0.25)
+    assert parser.parse_execution_policy("nonsense") == ("gemini-first", 0.0)
+
+
+def test_validate_subjects():
+    assert parser.validate_subjects(VALID)
+    assert not parser.validate_subjects(BAD_TOTALS)
+    assert not parser.validate_subjects({"XYZ999": {"internal": 1, "external": 1, "total": 2}})
+    assert not parser.validate_subjects({})
+
+
+def test_gemini_first_skips_local_when_gemini_succeeds(monkeypatch):
+    calls = []
+    _install_paths(monkeypatch, VALID, 0, VALID, calls)
+    assert parser.parse_vtu_pdf(io.BytesIO(b"%PDF"), policy="gemini-first")[0] == VALID
+    assert calls == ["gemini"]
+
+
+def test_local_first_falls_back_to_gemini_on_invalid_local(monkeypatch):
+    calls = []
+    _install_paths(monkeypatch, VALID, 0, BAD_TOTALS, calls)
+    assert parser.parse_vtu_pdf(io.BytesIO(b"%PDF"), policy="local-first")[0] == VALID
+    assert calls == ["local", "gemini"]
+
+
+def test_race_returns_fast_local_result_without_waiting_for_gemini(monkeypatch):
+    calls = []
+    _install_paths(monkeypatch, VALID, 1.0, VALID, calls)
+    started = time.perf_counter()
+    assert parser.parse_vtu_pdf(io.BytesIO(b"%PDF"), policy="race")[0] == VALID
+    assert time.perf_counter() - started < 0.5
+
+
+def test_race_returns_fast_gemini_result_without_waiting_for_local(monkeypatch):
+    calls = []
+    _install_paths(monkeypatch, VALID, 0.05, VALID, calls, local_delay=1.5)
+    started = time.perf_counter()
+    assert parser.parse_vtu_pdf(io.BytesIO(b"%PDF"), policy="race")[0] == VALID
+    assert time.perf_counter() - started < 0.5
+
+    started = time.perf_counter()
+    assert parser.parse_vtu_pdf(io.BytesIO(b"%PDF"), policy="hedge-after-10-ms")[0] == VALID
+    assert time.perf_counter() - started < 0.5
+    assert calls.count("local") == 2  # both started, neither awaited
+
+
+def test_race_waits_for_gemini_when_local_is_invalid(monkeypatch):
+    calls = []
+    _install_paths(monkeypatch, VALID, 0.2, BAD_TOTALS, calls)
+    assert parser.parse_vtu_pdf(io.BytesIO(b"%PDF"), policy="race")[0] == VALID
+
+
+def test_race_local_path_does_not_queue_behind_slow_gemini_calls(monkeypatch):
+    calls = []
+    _install_paths(monkeypatch, VALID, 1.0, VALID, calls)
+    monkeypatch.setattr(parser, "_path_executors", {})
+    monkeypatch.setattr(parser, "PARSE_HEDGE_THREADS", 2)
+    durations = []
+
+    def parse():
+        started = time.perf_counter()
+        assert parser.parse_vtu_pdf(io.BytesIO(b"%PDF"), policy="race")[0] == VALID
+        durations.append(time.perf_counter() - started)
+
+    threads = [threading.Thread(target=parse) for _ in range(12)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(durations) == 12 and max(durations) < 0.5
+    # Queued Gemini calls of parses that local parsing already answered are dropped
+    time.sleep(1.2)
+    assert calls.count("gemini") < 12
+
+
+def test_abandoned_path_skips_the_gemini_call(monkeypatch):
+    class CountingClient:
+        calls = 0
+
+        def generate_content(self, api_key, payload=None, body=None):
+            CountingClient.calls += 1
+
+    monkeypatch.setattr(parser, "gemini_client", CountingClient())
+    abandoned = threading.Event()
+    abandoned.set()
+    token = parser._path_abandoned.set(abandoned)
+    try:
+        assert parser._request_gemini_subjects("key", parser.PDFUpload.from_bytes(b"%PDF-1.4")) is None
+    finally:
+        parser._path_abandoned.reset(token)
+    assert CountingClient.calls == 0
+
+
+def test_hedge_only_starts_local_after_delay(monkeypatch):
+    calls = []
+    _install_paths(monkeypatch, VALID, 0.0, VALID, calls)
+    parser.parse_vtu_pdf(io.BytesIO(b"%PDF"), policy="hedge-after-200-ms")
+    assert calls == ["gemini"]
+
+    calls.clear()
+    _install_paths(monkeypatch, VALID, 1.0, VALID, calls)
+    started = time.perf_counter()
+    assert parser.parse_vtu_pdf(io.BytesIO(b"%PDF"), policy="hedge-after-100-ms")[0] == VALID
+    assert 0.1 <= time.perf_counter() - started < 0.5
+    assert calls == ["gemini", "local"]
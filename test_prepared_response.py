@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Test script for prepared (compressed, ETagged) catalogue responses
+"""
+
+import gzip
+import json
+
+import vtu_pdf_parser as parser
+from prepared_response import PreparedResponse, parse_accept_encoding
+from subject_catalogue import SubjectCatalogue
+
+client = parser.app.test_client()
+
+
+def test_schemes_are_served_compressed_and_conditionally():
+    plain = client.get("/schemes")
+    assert plain.status_code == 200 and "Content-Encoding" not in plain.headers
+    assert json.loads(plain.data) == json.loads(json.dumps(parser.VTU_SCHEMES))
+
+    zipped = client.get("/schemes", headers={"Accept-Encoding": "gzip"})
+    assert zipped.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(zipped.data) == plain.data
+    assert zipped.headers["Vary"] == "Accept-Encoding"
+
+    # Any variant's ETag proves the client's copy is current
+    cached = client.get("/schemes", headers={"If-None-Match": plain.headers["ETag"], "Accept-Encoding": "gzip"})
+    assert cached.status_code == 304 and cached.data == b""
+
+
+def test_catalogue_pages_and_filters():
+    catalogue = SubjectCatalogue([
+        ("BCS401", {"name": "ANALYSIS & DESIGN OF ALGORITHMS", "credits": 3, "scheme": "2022", "semester": "4"}),
+        ("BCS402", {"name": "MICROCONTROLLERS", "credits": 4, "scheme": "2022", "semester": "4"}),
+        ("21CS305", {"name": "DATA STRUCTURES LABORATORY", "credits": 2, "scheme": "2021", "semester": "3"}),
+    ])
+    body = json.loads(catalogue.page(page=2, per_page=1, scheme="2022").variants[None][0])
+    assert body["total"] == 2 and body["pages"] == 2
+    assert [subject["code"] for subject in body["subjects"]] == ["BCS402"]
+    assert catalogue.page(page=2, per_page=1, scheme="2022") is catalogue.page(page=2, per_page=1, scheme="2022")
+
+    response = client.get("/subjects/catalogue?scheme=2022&semester=4&per_page=5")
+    assert response.status_code == 200 and response.json["per_page"] == 5
+    assert all(subject["semester"] == "4" for subject in response.json["subjects"])
+
+
+def test_dynamic_pages_compress_on_first_request():
+    prepared = parser.get_subject_catalogue().page(per_page=499, query="b")
+    assert list(prepared.variants) == [None]  # nothing compressed on the request that built it
+
+    response = client.get("/subjects/catalogue?per_page=499&q=b",
+                          headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(response.data) == prepared.variants[None][0]
+    cached = client.get("/subjects/catalogue?per_page=499&q=b",
+                        headers={"If-None-Match": f'W/{response.headers["ETag"]}'})
+    assert cached.status_code == 304
+
+
+
+def test_encodings_with_q_zero_are_refused():
+    assert parse_accept_encoding("br;q=0, gzip ; q=0.5, *;q=0.000") == {"br": 0.0, "gzip": 0.5, "*": 0.0}
+    prepared = PreparedResponse({"value": "x" * 2048})
+    prepared.encodings = ("br", "gzip")  # as with brotli installed
+    assert prepared.choose_encoding("br;q=0, gzip") == "gzip"
+    assert prepared.choose_encoding("br;q=0.0, gzip;q=0") is None
+    assert prepared.choose_encoding("gzip;q=1, br;q=0.4") == "gzip"
+    assert prepared.choose_encoding("gzip, br") == "br"
+    assert prepared.choose_encoding("*") == "br"
+    assert prepared.choose_encoding("*, br;q=0") == "gzip"
+    assert prepared.choose_encoding("identity") is None
+
+    response = client.get("/schemes", headers={"Accept-Encoding": "gzip;q=0, br;q=0"})
+    assert "Content-Encoding" not in response.headers
+
+
+if __name__ == "__main__":
+    test_schemes_are_served_compressed_and_conditionally()
+    test_encodings_with_q_zero_are_refused()
+    test_catalogue_pages_and_filters()
+    test_dynamic_pages_compress_on_first_request()
+    print("✅ Prepared response tests passed")
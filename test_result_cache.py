@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Test script for the /parse-pdf result cache
+"""
+
+from result_cache import ParseResultCache, make_cache_key
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_cache_key_includes_scheme():
+    assert make_cache_key(b"%PDF-1.4", None) != make_cache_key(b"%PDF-1.4", "2022")
+    assert make_cache_key(b"%PDF-1.4", "2022") == make_cache_key(b"%PDF-1.4", "2022")
+    assert make_cache_key(b"%PDF-1.4", "2022", 1) != make_cache_key(b"%PDF-1.4", "2022", 2)
+
+
+def test_lru_eviction_and_counters():
+    cache = ParseResultCache(max_entries=2, ttl_seconds=60)
+    cache.put("a", {"sgpa": 8.1})
+    cache.put("b", {"sgpa": 7.2})
+    assert cache.get("a") == {"sgpa": 8.1}  # "a" is now most recently used
+    cache.put("c", {"sgpa": 9.0})
+
+    assert cache.get("b") is None
+    assert cache.get("c") == {"sgpa": 9.0}
+    stats = cache.stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 1
+    assert stats["evictions"] == 1
+    assert stats["size"] == 2
+
+
+def test_ttl_expiry():
+    clock = FakeClock()
+    cache = ParseResultCache(max_entries=4, ttl_seconds=10, clock=clock)
+    cache.put("a", {"sgpa": 8.1})
+    clock.now = 9.9
+    assert cache.get("a") is not None
+    clock.now = 10.0
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+
+
+if __name__ == "__main__":
+    test_cache_key_includes_scheme()
+    test_lru_eviction_and_counters()
+    test_ttl_expiry()
+    print("✅ Result cache tests passed")
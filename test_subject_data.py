@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Test script for the hot-reloadable subject data
+"""
+
+import json
+import os
+import tempfile
+
+from subject_data import SnapshotCache, SubjectDataError, SubjectDataStore, validate_catalogue
+
+
+def write_data(directory, credits):
+    catalogue = {"2022": {"CS": {"4": [
+        {"code": "BCS401", "name": "ANALYSIS & DESIGN OF ALGORITHMS", "credits": 4, "type": "PCC"},
+        {"code": "BBOC407", "name": "BIOLOGY FOR COMPUTER ENGINEERS", "credits": credits, "type": "AEC"}
+    ]}}}
+    for name, document in (("subjects.json", catalogue),
+                           ("fallback_credits.json", {"BYOK459": {"name": "YOGA", "credits": 0}})):
+        temp_path = os.path.join(directory, name + ".tmp")
+        with open(temp_path, "w") as data_file:
+            json.dump(document, data_file)
+        os.replace(temp_path, os.path.join(directory, name))
+
+
+def test_validation_reports_the_bad_entry():
+    catalogue = {"2022": {"CS": {"4": [{"code": "BCS401", "name": "ADA", "credits": "four", "type": "PCC"}]}}}
+    try:
+        validate_catalogue(catalogue)
+    except SubjectDataError as e:
+        assert "2022/CS/4[0]" in str(e) and "credits" in str(e)
+    else:
+        assert False, "invalid credits accepted"
+
+
+def test_changed_files_are_swapped_in_with_a_new_version():
+    with tempfile.TemporaryDirectory() as directory:
+        write_data(directory, 3)
+        store = SubjectDataStore(data_dir=directory, index_path=os.path.join(directory, "index.sqlite3"),
+                                 check_interval=0)
+        builds = []
+        derived = SnapshotCache(lambda snapshot: builds.append(snapshot.version) or snapshot.version, store)
+
+        old = store.current()
+        assert old.version == 1 and old.lookup("BBOC407")["credits"] == 3
+        assert old.lookup("BYOK459")["credits"] == 0
+        assert derived.get() == derived.get() == 1
+
+        write_data(directory, 2)
+        new = store.current()
+        assert new.version == 2 and new.lookup("BBOC407")["credits"] == 2
+        assert derived.get() == 2 and builds == [1, 2]
+        # Requests still holding the old snapshot keep reading its index
+        assert old.lookup("BBOC407")["credits"] == 3
+
+
+def test_invalid_edit_keeps_the_live_snapshot():
+    with tempfile.TemporaryDirectory() as directory:
+        write_data(directory, 2)
+        store = SubjectDataStore(data_dir=directory, index_path=os.path.join(directory, "index.sqlite3"),
+                                 check_interval=0)
+        assert store.current().version == 1
+
+        write_data(directory, -1)
+        snapshot = store.current()
+        assert snapshot.version == 1 and snapshot.lookup("BBOC407")["credits"] == 2
+        try:
+            store.reload()
+        except SubjectDataError:
+            pass
+        else:
+            assert False, "invalid data reloaded"
+
+
+if __name__ == "__main__":
+    test_validation_reports_the_bad_entry()
+    test_changed_files_are_swapped_in_with_a_new_version()
+    test_invalid_edit_keeps_the_live_snapshot()
+    print("✅ Subject data tests passed")
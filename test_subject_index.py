@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Test script for the compiled subject index
+"""
+
+import os
+import tempfile
+
+from subject_index import SubjectIndex, compile_subject_index, stored_fingerprint
+
+DATABASE = {
+    "2022": {
+        "CS": {
+            "1": [{"code": "BMATS101", "name": "MATHEMATICS-I FOR CSE STREAM", "credits": 4, "type": "ASC"}],
+            "4": [{"code": "BCS401", "name": "ANALYSIS & DESIGN OF ALGORITHMS", "credits": 4, "type": "PCC"},
+                  {"code": "BBOC407", "name": "BIOLOGY FOR COMPUTER ENGINEERS", "credits": 2, "type": "AEC"}]
+        },
+        "EC": {
+            "1": [{"code": "BMATS101", "name": "MATHEMATICS-I FOR EC STREAM", "credits": 4, "type": "ASC"}]
+        }
+    }
+}
+
+
+def test_compiled_lookups_match_the_catalogue():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "index.sqlite3")
+        assert compile_subject_index(DATABASE, path, fingerprint="test") == 3
+
+        index = SubjectIndex(path)
+        assert index.get("bcs401") == {"name": "ANALYSIS & DESIGN OF ALGORITHMS", "credits": 4, "type": "PCC",
+                                       "scheme": "2022", "branch": "CS", "semester": "4"}
+        assert index.get("XYZ999") is None
+        # Duplicate codes keep their first position but the last entry
+        assert index.get("BMATS101")["branch"] == "EC"
+        assert [code for code, _ in index.iter_subjects()] == ["BMATS101", "BCS401", "BBOC407"]
+        assert index.curriculum("2022", "CS", 4)["CS"]["4"][1]["code"] == "BBOC407"
+        assert index.curriculum("2022") == DATABASE["2022"]
+
+
+def test_stored_fingerprint():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "index.sqlite3")
+        assert stored_fingerprint(path) is None
+        compile_subject_index(DATABASE, path, fingerprint="v1")
+        assert stored_fingerprint(path) == "v1"
+        with open(path, "wb") as foreign:
+            foreign.write(b"not a database")
+        assert stored_fingerprint(path) is None
+
+
+if __name__ == "__main__":
+    test_compiled_lookups_match_the_catalogue()
+    test_stored_fingerprint()
+    print("✅ Subject index tests passed")
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Test script for slotted subject records, one-pass summaries and fast JSON
+"""
+
+import json
+import pickle
+
+import fast_json
+import vtu_pdf_parser as parser
+from subject_record import SubjectRecord
+
+SUBJECTS = {
+    "BCS401": SubjectRecord(code="BCS401", name="ANALYSIS & DESIGN OF ALGORITHMS", internal=45, external=38,
+                            total=83, grade_point=9, credits=4, result="P", grade="A+", credit_points=36),
+    "BCS402": SubjectRecord(code="BCS402", name="MICROCONTROLLERS", internal=20, external=15,
+                            total=35, grade_point=0, credits=4, result="F", grade="F", credit_points=0),
+    "BYOK459": SubjectRecord(code="BYOK459", name="YOGA", internal=50, external=40,
+                             total=90, grade_point=10, credits=0, result="P", grade="O", credit_points=0)
+}
+
+
+def test_records_serialize_like_the_old_dicts():
+    as_dicts = {code: record.to_dict() for code, record in SUBJECTS.items()}
+    assert SUBJECTS["BCS401"]["credits"] == 4 and SUBJECTS["BCS401"].get("missing", 1) == 1
+    assert fast_json.dumps(SUBJECTS) == json.dumps(as_dicts, sort_keys=True, separators=(",", ":"))
+    assert pickle.loads(pickle.dumps(SUBJECTS)) == SUBJECTS  # batch workers return records
+
+    with parser.app.app_context():
+        assert json.loads(parser.app.json.dumps(SUBJECTS)) == as_dicts
+
+
+def test_one_pass_breakdown_matches_the_per_field_sums():
+    subjects = SUBJECTS
+    payload = parser.build_result_payload(subjects, "2022")
+    values = list(subjects.values())
+    assert payload["detailed_breakdown"] == {
+        "total_internal": sum(s["internal"] for s in values),
+        "total_external": sum(s["external"] for s in values),
+        "total_marks": sum(s["total"] for s in values),
+        "passed_subjects": len([s for s in values if s["result"] == "P"]),
+        "failed_subjects_count": len([s for s in values if s["result"] == "F"]),
+        "average_internal": round(sum(s["internal"] for s in values) / len(values), 2),
+        "average_external": round(sum(s["external"] for s in values) / len(values), 2),
+        "average_total": round(sum(s["total"] for s in values) / len(values), 2)
+    }
+    assert payload["sgpa"] == 4.5 and payload["total_credits"] == 8.0
+    assert payload["failed_subjects"] == ["BCS402"]
+    assert parser.calculate_sgpa(subjects) == (4.5, 8.0, 36.0, ["BCS402"])
+
+
+if __name__ == "__main__":
+    test_records_serialize_like_the_old_dicts()
+    test_one_pass_breakdown_matches_the_per_field_sums()
+    print("✅ Subject record tests passed")
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Test script for ranked subject search and autocomplete
+"""
+
+from subject_search import SubjectSearchIndex
+
+SUBJECTS = [
+    ("BCS403", {"name": "DATABASE MANAGEMENT SYSTEMS", "credits": 4}),
+    ("BCS401", {"name": "ANALYSIS & DESIGN OF ALGORITHMS", "credits": 4}),
+    ("BCSL404", {"name": "ANALYSIS & DESIGN OF ALGORITHMS LAB", "credits": 1}),
+    ("BCS304", {"name": "DATA STRUCTURES AND APPLICATIONS", "credits": 3}),
+    ("BCSL305", {"name": "DATA STRUCTURES LAB", "credits": 1}),
+]
+
+
+def _codes(results):
+    return [subject["code"] for subject in results]
+
+
+def test_search_ranks_code_then_name_then_substring():
+    index = SubjectSearchIndex(SUBJECTS)
+    assert _codes(index.search("bcs401")) == ["BCS401"]
+    assert _codes(index.search("BCS40")) == ["BCS401", "BCS403"]
+    # Name prefixes come before later-word prefixes
+    assert _codes(index.search("data")) == ["BCS304", "BCSL305", "BCS403"]
+    assert _codes(index.search("lab")) == ["BCSL404", "BCSL305"]
+    # Mid-word substrings and scattered tokens still match
+    assert _codes(index.search("gorithm")) == ["BCS401", "BCSL404"]
+    assert _codes(index.search("design algorithms")) == ["BCS401", "BCSL404"]
+    assert index.search("data", limit=1) == [{"code": "BCS304", "name": "DATA STRUCTURES AND APPLICATIONS", "credits": 3}]
+    assert index.search("xyz") == [] and index.search("  ") == []
+
+
+def test_autocomplete_prefixes():
+    index = SubjectSearchIndex(SUBJECTS)
+    assert _codes(index.complete("bcsl")) == ["BCSL305", "BCSL404"]
+    assert _codes(index.complete("struct")) == ["BCS304", "BCSL305"]
+    assert len(index.complete("b", limit=2)) == 2
+
+
+if __name__ == "__main__":
+    test_search_ranks_code_then_name_then_substring()
+    test_autocomplete_prefixes()
+    print("✅ Subject search tests passed")
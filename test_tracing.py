@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Test script for parse pipeline spans, structured logs and request profiling
+"""
+
+import contextvars
+import io
+import json
+import logging
+import os
+import threading
+
+import metrics
+import tracing
+import vtu_pdf_parser as parser
+from subject_record import SubjectRecord
+
+
+def _gemini_path():
+    with tracing.span("gemini_path") as gemini_span:
+        gemini_span["subjects"] = 0
+
+
+def test_spans_nest_and_follow_copied_contexts():
+    with tracing.traced(path="/test") as trace:
+        with tracing.span("parse", policy="race") as parse_span:
+            with tracing.span("local_path"):
+                pass
+            worker = threading.Thread(target=contextvars.copy_context().run, args=(_gemini_path,))
+            worker.start()
+            worker.join()
+            parse_span["strategy"] = "pattern_1"
+        try:
+            with tracing.span("sgpa"):
+                raise ValueError("no credits")
+        except ValueError:
+            pass
+
+    spans = {span["name"]: span for span in trace.timeline()}
+    assert spans["parse"]["parent"] is None
+    assert spans["parse"]["strategy"] == "pattern_1"
+    assert spans["local_path"]["parent"] == "parse"
+    assert spans["gemini_path"]["parent"] == "parse"
+    assert spans["gemini_path"]["thread"] != spans["parse"]["thread"]
+    assert spans["sgpa"]["error"] == "no credits"
+    assert trace.duration is not None
+    assert tracing.current_trace() is None
+    assert "parse;dur=" in trace.server_timing()
+
+
+def test_stage_feeds_the_metrics_histogram(monkeypatch, tmp_path):
+    registry = metrics.MetricsRegistry(str(tmp_path), flush_interval=60)
+    monkeypatch.setattr(metrics, "registry", registry)
+    with tracing.traced() as trace:
+        with tracing.stage("matching") as matching:
+            matching["courses"] = 7
+    assert trace.spans[0]["courses"] == 7
+    assert sum(registry.collect()["vtu_parse_stage_seconds"]["matching"][:-1]) == 1
+
+
+def test_json_line_formatter():
+    record = logging.LogRecord("vtu_parser", logging.WARNING, __file__, 1, "Gemini API request failed", None, None)
+    record.fields = {"status": 503, "trace_id": "abc"}
+    entry = json.loads(tracing.JSONLineFormatter().format(record))
+    assert entry["level"] == "warning"
+    assert entry["msg"] == "Gemini API request failed"
+    assert entry["status"] == 503 and entry["trace_id"] == "abc"
+
+
+def test_profile_requires_the_operator_token(monkeypatch):
+    monkeypatch.setattr(tracing, "PROFILE_TOKEN", "")
+    assert not tracing.profile_requested("anything")
+    monkeypatch.setattr(tracing, "PROFILE_TOKEN", "s3cret")
+    assert not tracing.profile_requested(None)
+    assert not tracing.profile_requested("guess")
+    assert tracing.profile_requested("s3cret")
+
+
+def test_profiled_request_writes_a_report(monkeypatch, tmp_path):
+    monkeypatch.setattr(tracing, "PROFILE_TOKEN", "s3cret")
+    monkeypatch.setattr(tracing, "PROFILE_DIR", str(tmp_path))
+    subjects = {"BCS401": SubjectRecord(code="BCS401", name="ANALYSIS & DESIGN OF ALGORITHMS", internal=45,
+                                        external=38, total=83, grade_point=9, credits=4, grade="A+",
+                                        credit_points=36)}
+
+    def fake_parse(upload, scheme=None, policy=None):
+        with tracing.stage("matching"):
+            pass
+        return subjects, "2022"
+
+    monkeypatch.setattr(parser, "parse_vtu_pdf", fake_parse)
+    client = parser.app.test_client()
+
+    response = client.post("/parse-pdf", data={"pdf_file": (io.BytesIO(b"%PDF-1.4 tracing"), "t.pdf")},
+                           content_type="multipart/form-data", headers={"X-Request-ID": "req-42"})
+    assert response.status_code == 200
+    assert response.headers["X-Trace-Id"] == "req-42"
+    assert "Server-Timing" not in response.headers
+
+    response = client.post("/parse-pdf", data={"pdf_file": (io.BytesIO(b"%PDF-1.4 tracing 2"), "t.pdf")},
+                           content_type="multipart/form-data", headers={"X-Profile": "s3cret"})
+    assert response.status_code == 200
+    assert "matching;dur=" in response.headers["Server-Timing"]
+    assert "upload_read;dur=" in response.headers["Server-Timing"]
+    profile_id = response.headers["X-Profile-Id"]
+    with open(os.path.join(tmp_path, f"{profile_id}.json"), encoding="utf-8") as report_file:
+        report = json.load(report_file)
+    assert report["path"] == "/parse-pdf"
+    assert [span["name"] for span in report["spans"]][0] == "upload_read"
+    assert "cumulative" in report["profile"]
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Test script for the synthetic VTU transcript generator
+"""
+
+import io
+
+import pdfplumber
+
+import vtu_pdf_parser as parser
+from transcript_generator import LAYOUTS, SCHEME_PATTERNS, generate_corpus, generate_transcript, subject_pool
+
+
+def test_every_scheme_has_subjects():
+    assert set(SCHEME_PATTERNS) == set(parser.VTU_SCHEMES)
+    for scheme in SCHEME_PATTERNS:
+        assert len(subject_pool(scheme)) >= 6, scheme
+
+
+def test_transcripts_are_deterministic_readable_pdfs():
+    first = generate_transcript("2021", seed=5, layout="spread")
+    assert first["pdf"] == generate_transcript("2021", seed=5, layout="spread")["pdf"]
+    with pdfplumber.open(io.BytesIO(first["pdf"])) as pdf:
+        assert len(pdf.pages) == first["pages"] > 2
+        text = "\n".join(page.extract_text() or "" for page in pdf.pages)
+    for code, marks in first["expected"].items():
+        assert code in text
+        assert marks["total"] == marks["internal"] + marks["external"]
+        assert marks["result"] in ("P", "F")
+
+
+def test_corpus_cycles_schemes_and_layouts():
+    corpus = generate_corpus(len(SCHEME_PATTERNS) * len(LAYOUTS))
+    assert {(item["scheme"], item["layout"]) for item in corpus} == {
+        (scheme, layout) for scheme in SCHEME_PATTERNS for layout in LAYOUTS}
+
+
+def test_local_parser_reads_a_classic_2022_transcript(monkeypatch):
+    monkeypatch.setattr(parser, "parse_with_gemini_ai", lambda pdf_file: None)
+    transcript = generate_transcript("2022", seed=3, layout="classic")
+    subjects, scheme = parser.parse_vtu_pdf(io.BytesIO(transcript["pdf"]))
+    assert scheme == "2022"
+    assert set(subjects) == set(transcript["expected"])
+    for code, marks in transcript["expected"].items():
+        assert subjects[code]["total"] == marks["total"]
+        assert subjects[code]["result"] == marks["result"]
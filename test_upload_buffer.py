@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared, size-checked upload buffer
+"""
+
+import io
+
+import pytest
+
+import vtu_pdf_parser as parser
+from upload_buffer import UPLOAD_MAX_BYTES, PDFUpload, UploadError
+
+PDF = b"%PDF-1.4\n1 0 obj << /Type /Pages /Kids [2 0 R] >>\n2 0 obj << /Type /Page >>\n" + b"x" * 5000
+
+
+def test_rejects_non_pdf_and_oversized_uploads():
+    with pytest.raises(UploadError) as error:
+        PDFUpload.from_stream(io.BytesIO(b"hello world"))
+    assert error.value.status_code == 400
+
+    with pytest.raises(UploadError) as error:
+        PDFUpload.from_stream(io.BytesIO(PDF), max_bytes=1024)
+    assert error.value.status_code == 413
+
+    with pytest.raises(UploadError) as error:
+        PDFUpload.from_stream(io.BytesIO(PDF), max_pages=0)
+    assert error.value.status_code == 413
+
+
+class _CountingBody(io.RawIOBase):
+    """A request body that records how much of it was read"""
+
+    def __init__(self, size):
+        self.remaining = size
+        self.read_bytes = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        count = min(len(buffer), self.remaining, 65536)
+        buffer[:count] = b"x" * count
+        self.remaining -= count
+        self.read_bytes += count
+        return count
+
+
+@pytest.mark.parametrize("path, size", [("/parse-pdf", UPLOAD_MAX_BYTES + 1024 * 1024),
+                                        ("/parse-batch", parser.BATCH_MAX_TOTAL_BYTES + 1024 * 1024)])
+def test_oversized_request_is_refused_before_its_body_is_read(path, size):
+    body = _CountingBody(size)
+    response = parser.app.test_client().post(path, content_type="multipart/form-data; boundary=x", environ_overrides={
+        "wsgi.input": body, "CONTENT_LENGTH": str(size)})
+    assert response.status_code == 413
+    assert "maximum size" in response.get_json()["error"]
+    assert body.read_bytes == 0
+
+
+def test_large_upload_is_spooled_to_disk_and_mapped():
+    with PDFUpload.from_stream(io.BytesIO(PDF), spool_bytes=1024) as upload:
+        assert upload._mapping is not None
+        assert upload.size == len(PDF)
+        assert upload.page_count == 1
+        assert bytes(upload.view) == PDF
+
+
+def test_readers_share_the_buffer_independently():
+    upload = PDFUpload.wrap(PDF)
+    first, second = upload.open(), upload.open()
+    assert first.read(8) == PDF[:8]
+    assert second.read() == PDF
+    first.seek(-10, io.SEEK_END)
+    assert first.read() == PDF[-10:]
+    upload.close()
+
+
+@pytest.mark.parametrize("spool_bytes", [1024 * 1024, 1024])
+def test_readers_outlive_the_owner_closing_the_upload(spool_bytes):
+    upload = PDFUpload.from_stream(io.BytesIO(PDF), spool_bytes=spool_bytes)
+    reader = upload.open()
+    with upload.held():
+        upload.close()
+        assert bytes(upload.view[:4]) == b"%PDF"
+    assert reader.read(8) == PDF[:8]
+    reader.seek(-10, io.SEEK_END)  # past the reader's own buffer
+    assert reader.read() == PDF[-10:]
+    reader.close()
+    with pytest.raises(ValueError):
+        upload.open()  # every reference is gone and the buffer has been freed
+
+
+if __name__ == "__main__":
+    test_rejects_non_pdf_and_oversized_uploads()
+    test_large_upload_is_spooled_to_disk_and_mapped()
+    test_readers_share_the_buffer_independently()
+    print("✅ Upload buffer tests passed")
@@ -0,0 +1,265 @@
+"""
+Tracing - Spans, structured logs and opt-in profiling for the parse pipeline
+Each request or parse job carries a trace; spans time its stages (from any
+thread the context is copied to) and log lines are JSON records with the trace
+id, written by a background thread so handlers never block on stdout
+"""
+
+import atexit
+import cProfile
+import functools
+import hmac
+import io
+import json
+import logging
+import logging.handlers
+import os
+import pstats
+import queue
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+import metrics
+
+TRACE_LOG_LEVEL = os.getenv('TRACE_LOG_LEVEL', 'INFO').upper()
+# Operators send "X-Profile: <PROFILE_TOKEN>" to profile one request; unset disables profiling
+PROFILE_TOKEN = os.getenv('PROFILE_TOKEN', '')
+PROFILE_DIR = os.getenv('PROFILE_DIR', os.path.join(tempfile.gettempdir(), 'vtu-parser-profiles'))
+PROFILE_TOP_FUNCTIONS = int(os.getenv('PROFILE_TOP_FUNCTIONS', '40'))
+
+_current_trace = ContextVar("trace", default=None)
+_current_span = ContextVar("span", default=None)
+
+# cProfile can only profile one thing at a time (sys.monitoring on 3.12+)
+_profiler_lock = threading.Lock()
+
+
+class JSONLineFormatter(logging.Formatter):
+    """One JSON object per record: time, level, message, trace/span ids and any fields"""
+
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 6),
+            "level": record.levelname.lower(),
+            "msg": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", {}))
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+logger = logging.getLogger("vtu_parser")
+logger.setLevel(TRACE_LOG_LEVEL)
+logger.propagate = False
+_log_queue = queue.SimpleQueue()
+logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+_listener = None
+
+
+def _start_log_writer():
+    """(Re)start the thread that writes queued records to stderr"""
+    global _listener
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(JSONLineFormatter())
+    _listener = logging.handlers.QueueListener(_log_queue, handler)
+    _listener.start()
+
+
+def _stop_log_writer():
+    if _listener is not None:
+        _listener.stop()  # drains what is queued
+
+
+_start_log_writer()
+os.register_at_fork(after_in_child=_start_log_writer)  # threads do not survive a fork
+atexit.register(_stop_log_writer)
+
+
+def log(message, level="info", **fields):
+    """Queue a structured log record tagged with the current trace and span"""
+    numeric_level = logging.getLevelName(level.upper())
+    if not logger.isEnabledFor(numeric_level):
+        return
+    trace = _current_trace.get()
+    if trace is not None:
+        fields["trace_id"] = trace.id
+        span_name = _current_span.get()
+        if span_name:
+            fields["span"] = span_name
+    logger.log(numeric_level, message, extra={"fields": fields})
+
+
+class Trace:
+    """Spans recorded for one request or job, with an optional cProfile run"""
+
+    def __init__(self, trace_id=None, profile=False, **fields):
+        self.id = trace_id or uuid.uuid4().hex
+        self.fields = fields
+        self.profile = profile
+        self.spans = []
+        self.started = time.perf_counter()
+        self.duration = None
+        self._lock = threading.Lock()
+        self._profiler = None
+
+    def add_span(self, name, parent, started, duration, attrs):
+        with self._lock:
+            self.spans.append({
+                "name": name,
+                "parent": parent,
+                "thread": threading.current_thread().name,
+                "start_ms": round((started - self.started) * 1000, 3),
+                "duration_ms": round(duration * 1000, 3),
+                **attrs
+            })
+
+    def timeline(self):
+        """Spans in start order"""
+        with self._lock:
+            return sorted(self.spans, key=lambda span: span["start_ms"])
+
+    def server_timing(self):
+        """The spans as a Server-Timing header value (browser dev tools show it)"""
+        return ", ".join(f'{span["name"]};dur={span["duration_ms"]}' for span in self.timeline())
+
+    def _start_profiler(self):
+        if not self.profile or not _profiler_lock.acquire(blocking=False):
+            return  # another request is being profiled: the span timeline is still kept
+        self._profiler = cProfile.Profile()
+        try:
+            self._profiler.enable()
+        except ValueError:  # another profiling tool is active
+            self._profiler = None
+            _profiler_lock.release()
+
+    def _stop_profiler(self):
+        if self._profiler is not None:
+            self._profiler.disable()
+            _profiler_lock.release()
+
+    def write_profile(self, directory=None, top=PROFILE_TOP_FUNCTIONS):
+        """Save the timeline (and cProfile stats, if profiled) to <directory>/<trace id>.json; returns the path
+
+        The raw stats are also written to <trace id>.prof for snakeviz or
+        pstats. cProfile sees only the thread that handled the request; the
+        span timeline covers every thread.
+        """
+        directory = directory or PROFILE_DIR
+        os.makedirs(directory, exist_ok=True)
+        report = {"trace_id": self.id, **self.fields, "duration_ms": round((self.duration or 0) * 1000, 3),
+                  "spans": self.timeline()}
+        if self._profiler is not None:
+            summary = io.StringIO()
+            stats = pstats.Stats(self._profiler, stream=summary)
+            stats.sort_stats("cumulative").print_stats(top)
+            report["profile"] = summary.getvalue()
+            stats.dump_stats(os.path.join(directory, f"{self.id}.prof"))
+        else:
+            report["profile"] = None
+        path = os.path.join(directory, f"{self.id}.json")
+        with open(path, "w", encoding="utf-8") as report_file:
+            json.dump(report, report_file, indent=2)
+        return path
+
+
+def begin_trace(trace_id=None, profile=False, **fields):
+    """Make a new trace current (and start profiling it if asked); returns (trace, token)"""
+    trace = Trace(trace_id, profile, **fields)
+    token = _current_trace.set(trace)
+    trace._start_profiler()
+    return trace, token
+
+
+def end_trace(trace, token):
+    """Stop a trace begun with begin_trace and log its duration"""
+    trace._stop_profiler()
+    trace.duration = time.perf_counter() - trace.started
+    # Requests that ran no pipeline stage (static files, lookups) only show at debug level
+    log("trace finished", level="info" if trace.spans else "debug", duration_ms=round(trace.duration * 1000, 3),
+        spans=len(trace.spans), **trace.fields)
+    _current_trace.reset(token)
+
+
+@contextmanager
+def traced(trace_id=None, profile=False, **fields):
+    """Run a with-block under a new trace, e.g. a background job"""
+    trace, token = begin_trace(trace_id, profile, **fields)
+    try:
+        yield trace
+    finally:
+        end_trace(trace, token)
+
+
+def current_trace():
+    return _current_trace.get()
+
+
+@contextmanager
+def span(name, **attrs):
+    """Time a with-block as a span of the current trace and log it when it ends
+
+    The yielded dict can be given more attributes (counts, strategy, ...)
+    while the block runs; an exception is recorded on the span and re-raised.
+    """
+    yield from _timed(name, attrs, observe_stage=False)
+
+
+@contextmanager
+def stage(name, **attrs):
+    """A span that is also observed in the vtu_parse_stage_seconds histogram"""
+    yield from _timed(name, attrs, observe_stage=True)
+
+
+def spanned(name):
+    """Decorator running every call of a function as a span"""
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def _timed(name, attrs, observe_stage):
+    parent = _current_span.get()
+    token = _current_span.set(name)
+    started = time.perf_counter()
+    try:
+        yield attrs
+    except Exception as e:
+        attrs["error"] = str(e)
+        raise
+    finally:
+        duration = time.perf_counter() - started
+        _current_span.reset(token)
+        if observe_stage:
+            metrics.observe_stage(name, duration)
+        _finish_span(name, parent, started, duration, attrs)
+
+
+def record_stage(name, started, **attrs):
+    """Record a stage that began at perf_counter() value started and has just ended"""
+    duration = time.perf_counter() - started
+    metrics.observe_stage(name, duration)
+    _finish_span(name, _current_span.get(), started, duration, attrs)
+
+
+def _finish_span(name, parent, started, duration, attrs):
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add_span(name, parent, started, duration, attrs)
+    log("span", name=name, parent=parent, duration_ms=round(duration * 1000, 3), **attrs)
+
+
+def profile_requested(header_value):
+    """Whether a request's X-Profile header carries the operator token"""
+    if not PROFILE_TOKEN or not header_value:
+        return False
+    return hmac.compare_digest(header_value.encode("utf-8"), PROFILE_TOKEN.encode("utf-8"))
@@ -0,0 +1,253 @@
+"""
+Transcript Generator - Synthetic VTU result PDFs with known contents
+Builds text PDFs for every scheme in VTU_SCHEMES from the subject catalogue,
+varying layout, fonts, spacing, page count and surrounding noise, and records
+the courses each one contains so parsers can be scored against it
+"""
+
+import json
+import os
+import random
+import re
+import zlib
+
+from subject_data import subject_data
+
+# Importing the parser pulls in Flask; its scheme table is small enough to mirror here
+SCHEME_PATTERNS = {
+    "2024": r"B[A-Z]{4}\d{3}[A-Z]?",
+    "2022": r"B[A-Z]{2}\d{3}[A-Z]?",
+    "2021": r"21[A-Z]{2,4}\d{2,3}",
+    "2018": r"18[A-Z]{2,4}\d{2,3}",
+    "2017": r"17[A-Z]{2,4}\d{2,3}",
+    "2015": r"15[A-Z]{2,4}\d{2,3}",
+}
+LAYOUTS = ("classic", "dated", "compact", "wrapped", "spread")
+MIN_POOL_SUBJECTS = 6
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842  # A4 in points
+
+_FIRST_NAMES = ["AARAV", "ANANYA", "DIYA", "ISHAAN", "KAVYA", "NIKHIL", "PRIYA", "ROHAN", "SNEHA", "VIKRAM"]
+_LAST_NAMES = ["GOWDA", "HEGDE", "IYER", "KULKARNI", "NAIK", "RAO", "REDDY", "SHETTY", "SHARMA", "PATIL"]
+_COLLEGES = ["1RV", "1BM", "1MS", "4NM", "1DS", "2SD"]
+_NOTES = [
+    "This is a computer generated provisional result and does not require a signature.",
+    "Nomenclature / Abbreviations : P -> PASS, F -> FAIL, A -> ABSENT, W -> WITHHELD, X -> NOT ELIGIBLE",
+    "Candidates are advised to verify the marks with the original marks cards issued by the University.",
+    "Revaluation applications must be submitted within ten days of the announcement of results.",
+    "Visvesvaraya Technological University, Jnana Sangama, Belagavi - 590018, Karnataka.",
+]
+
+
+def subject_pool(scheme):
+    """Catalogue subjects whose codes belong to a scheme: [(code, name)]
+
+    Schemes the catalogue barely covers borrow the 2018 courses under their
+    own year prefix (18CS32 -> 17CS32).
+    """
+    pattern = re.compile(SCHEME_PATTERNS[scheme])
+    index = subject_data.current().index
+    pool = [(code, info["name"]) for code, info in index.iter_subjects() if pattern.fullmatch(code)]
+    if len(pool) < MIN_POOL_SUBJECTS and scheme not in ("2018", "2022", "2024"):
+        pool = [(scheme[2:] + code[2:], name) for code, name in subject_pool("2018")]
+    return pool
+
+
+def _pdf_string(text):
+    return "(" + text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") + ")"
+
+
+def build_pdf(pages, compress=True):
+    """Minimal PDF: pages of (x, y, text, font size, bold) items in the standard Helvetica fonts"""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in once the page objects are numbered
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>",
+    ]
+    page_ids = []
+    for items in pages:
+        content = "\n".join(
+            f"BT /{'F2' if bold else 'F1'} {size} Tf {x:.2f} {y:.2f} Td {_pdf_string(text)} Tj ET"
+            for x, y, text, size, bold in items
+        ).encode("latin-1")
+        if compress:
+            content = zlib.compress(content)
+            stream = b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(content)
+        else:
+            stream = b"<< /Length %d >>\nstream\n" % len(content)
+        objects.append(stream + content + b"\nendstream")
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] /Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> "
+            b"/Contents %d 0 R >>" % (PAGE_WIDTH, PAGE_HEIGHT, content_id)
+        )
+        page_ids.append(len(objects))
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+    objects[1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode("ascii")
+
+    output = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref_offset = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    output += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset)
+    return bytes(output)
+
+
+def _course_marks(rng):
+    """Internal, external, total and printed result for one course"""
+    roll = rng.random()
+    internal = rng.randint(20, 50)
+    if roll < 0.04:
+        return internal, 0, internal, "A"  # absent for the exam
+    external = rng.randint(8, 50) if roll < 0.2 else rng.randint(18, 50)
+    total = internal + external
+    return internal, external, total, "P" if total >= 40 and external >= 18 else "F"
+
+
+def _wrap(name, width):
+    words, lines, line = name.split(), [], ""
+    for word in words:
+        if line and len(line) + 1 + len(word) > width:
+            lines.append(line)
+            line = word
+        else:
+            line = f"{line} {word}".strip()
+    return lines + [line] if line else lines
+
+
+class TranscriptPage:
+    """Items on one page, laid out top to bottom"""
+
+    def __init__(self, rng, top=PAGE_HEIGHT - 50):
+        self.rng = rng
+        self.items = []
+        self.y = top
+
+    def line(self, x, text, size=9, bold=False, gap=None):
+        self.items.append((x + self.rng.uniform(-0.4, 0.4), self.y, text, size, bold))
+        self.y -= gap if gap is not None else size + 4
+
+    def row(self, cells, size=9, gap=None, bold=False):
+        for x, text in cells:
+            self.items.append((x + self.rng.uniform(-0.4, 0.4), self.y, text, size, bold))
+        self.y -= gap if gap is not None else size + 5
+
+
+def generate_transcript(scheme, seed=0, layout=None, courses=None):
+    """One synthetic transcript: {"scheme", "layout", "seed", "pages", "pdf", "expected"}
+
+    expected maps each course code to its internal, external and total marks
+    and its result normalised to P or F (absent counts as F).
+    """
+    rng = random.Random(f"{scheme}:{seed}")
+    layout = layout or rng.choice(LAYOUTS)
+    pool = subject_pool(scheme)
+    count = courses or rng.randint(6, min(10, len(pool)))
+    selected = rng.sample(pool, min(count, len(pool)))
+    size = rng.choice((8, 9, 9, 10))
+    semester = rng.randint(1, 8)
+    usn = f"{rng.choice(_COLLEGES)}{scheme[2:]}CS{rng.randint(1, 180):03d}"
+    student = f"{rng.choice(_FIRST_NAMES)} {rng.choice(_LAST_NAMES)}"
+
+    pages = []
+    if layout == "spread":
+        cover = TranscriptPage(rng)
+        cover.line(150, "VISVESVARAYA TECHNOLOGICAL UNIVERSITY", 14, True, 30)
+        cover.line(200, "Statement of Provisional Results", 11, False, 60)
+        for note in rng.sample(_NOTES, 3):
+            cover.line(40, note, 8)
+        pages.append(cover)
+
+    page = TranscriptPage(rng)
+    page.line(130, "VISVESVARAYA TECHNOLOGICAL UNIVERSITY, BELAGAVI", 12, True, 22)
+    page.line(40, f"University Seat Number : {usn}", size)
+    page.line(40, f"Student Name : {student}", size)
+    page.line(40, f"Semester : {semester}    Examination : {rng.choice(['JUNE/JULY', 'DEC/JAN'])} 20{scheme[2:]}",
+              size, gap=size + 12)
+    header = [(40, "Subject Code"), (110, "Subject Name"), (370, "Internal"), (420, "External"), (470, "Total")]
+    if layout != "compact":
+        header.append((510, "Result"))
+    if layout == "dated":
+        header.append((540, "Announced"))
+    page.row(header, size, bold=True, gap=size + 8)
+
+    rows_per_page = rng.randint(3, 5) if layout == "spread" else len(selected)
+    name_width = 34 if layout == "wrapped" else 60
+    expected = {}
+    for position, (code, name) in enumerate(selected):
+        if position and position % rows_per_page == 0:
+            page.line(270, f"Page {len(pages) + 1}", 8)
+            pages.append(page)
+            page = TranscriptPage(rng)
+            page.row(header, size, bold=True, gap=size + 8)
+        internal, external, total, result = _course_marks(rng)
+        name_lines = _wrap(name, name_width)
+        cells = [(40, code), (110, name_lines[0]), (375, str(internal)), (425, str(external)), (472, str(total))]
+        if layout != "compact":
+            cells.append((515, result))
+        if layout == "dated":
+            cells.append((535, f"20{scheme[2:]}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"))
+        page.row(cells, size, gap=size + rng.uniform(3, 7))
+        for extra_line in name_lines[1:]:
+            page.line(110, extra_line, size)
+        expected[code] = {"internal": internal, "external": external, "total": total,
+                          "result": "P" if result == "P" else "F"}
+
+    page.y -= 10
+    page.line(40, f"Total courses : {len(selected)}", size)
+    page.line(40, rng.choice(_NOTES), 7)
+    page.line(270, f"Page {len(pages) + 1}", 8)
+    pages.append(page)
+
+    if layout == "spread":
+        # Trailing instruction pages the extractor should be able to skip
+        for _ in range(rng.randint(1, 4)):
+            notes = TranscriptPage(rng)
+            for note in rng.sample(_NOTES, len(_NOTES)):
+                notes.line(40, note, 8, gap=16)
+            pages.append(notes)
+
+    return {
+        "scheme": scheme,
+        "layout": layout,
+        "seed": seed,
+        "pages": len(pages),
+        "pdf": build_pdf([page.items for page in pages]),
+        "expected": expected,
+    }
+
+
+def generate_corpus(count, seed=0, schemes=None):
+    """count transcripts cycling through every scheme and layout"""
+    schemes = list(schemes or SCHEME_PATTERNS)
+    return [
+        generate_transcript(schemes[index % len(schemes)], seed * 100003 + index,
+                            LAYOUTS[(index // len(schemes)) % len(LAYOUTS)])
+        for index in range(count)
+    ]
+
+
+# CLI: python transcript_generator.py out_dir [--count 30] [--seed 0]
+if __name__ == "__main__":
+    import argparse
+
+    arg_parser = argparse.ArgumentParser(description="Write synthetic VTU result PDFs and their expected courses")
+    arg_parser.add_argument("out_dir", help="directory for the PDFs and expected.json")
+    arg_parser.add_argument("--count", type=int, default=30, help="transcripts to generate")
+    arg_parser.add_argument("--seed", type=int, default=0, help="corpus seed")
+    args = arg_parser.parse_args()
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    manifest = {}
+    for number, transcript in enumerate(generate_corpus(args.count, args.seed)):
+        file_name = f"{number:04d}_{transcript['scheme']}_{transcript['layout']}.pdf"
+        with open(os.path.join(args.out_dir, file_name), "wb") as pdf_file:
+            pdf_file.write(transcript["pdf"])
+        manifest[file_name] = {key: value for key, value in transcript.items() if key != "pdf"}
+    with open(os.path.join(args.out_dir, "expected.json"), "w", encoding="utf-8") as manifest_file:
+        json.dump(manifest, manifest_file, indent=2)
+    print(f"Wrote {len(manifest)} transcripts to {args.out_dir}")
@@ -0,0 +1,221 @@
+"""
+Upload Buffer - One shared, size-checked buffer per uploaded PDF
+Uploads are copied once while enforcing the size limit, spooled to a temp file
+and memory-mapped when large, checked for the %PDF header and page count up
+front, then read by pdfplumber, the hasher and the Gemini encoder without copies
+"""
+
+import contextlib
+import io
+import mmap
+import os
+import re
+import tempfile
+import threading
+
+UPLOAD_MAX_BYTES = int(os.getenv('UPLOAD_MAX_BYTES', str(10 * 1024 * 1024)))  # 10MB
+UPLOAD_SPOOL_BYTES = int(os.getenv('UPLOAD_SPOOL_BYTES', str(1024 * 1024)))  # larger uploads go to disk
+UPLOAD_MAX_PAGES = int(os.getenv('UPLOAD_MAX_PAGES', '200'))
+
+_CHUNK_SIZE = 64 * 1024
+_HEADER_WINDOW = 1024  # the %PDF header may follow a little junk
+_PAGE_OBJECT_RE = re.compile(rb'/Type\s*/Page(?![a-zA-Z])')
+
+
+class UploadError(ValueError):
+    """Upload rejected before parsing; status_code is the HTTP status to answer with"""
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class _ViewReader(io.RawIOBase):
+    """Seekable read-only stream over its own view of a shared buffer (no copy of the data)"""
+
+    def __init__(self, view, on_close=None):
+        self._view = view[:]  # released on close without touching other readers' views
+        self._pos = 0
+        self._on_close = on_close
+
+    def close(self):
+        if not self.closed:
+            self._view.release()
+            if self._on_close is not None:
+                self._on_close()
+        super().close()
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, buffer):
+        chunk = self._view[self._pos:self._pos + len(buffer)]
+        size = len(chunk)
+        buffer[:size] = chunk
+        self._pos += size
+        return size
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._pos + offset
+        else:
+            position = len(self._view) + offset
+        self._pos = max(0, position)
+        return self._pos
+
+    def tell(self):
+        return self._pos
+
+
+class PDFUpload:
+    """A validated PDF held once in memory or in a memory-mapped temp file"""
+
+    def __init__(self, view, backing=None, mapping=None):
+        self.view = view
+        self._backing = backing  # BytesIO or temp file that owns the bytes
+        self._mapping = mapping
+        self.page_count = estimate_page_count(view)
+        self._refs = 1  # the owner's reference, dropped by close()
+        self._owner_closed = False
+        self._refs_lock = threading.Lock()
+
+    @classmethod
+    def from_stream(cls, stream, max_bytes=UPLOAD_MAX_BYTES, spool_bytes=UPLOAD_SPOOL_BYTES, max_pages=UPLOAD_MAX_PAGES):
+        """Copy an upload stream into a spool, rejecting it as early as possible"""
+        spool = io.BytesIO()
+        on_disk = False
+        size = 0
+        try:
+            while True:
+                chunk = stream.read(_CHUNK_SIZE)
+                if not chunk:
+                    break
+
+                if size == 0 and b'%PDF' not in chunk[:_HEADER_WINDOW]:
+                    raise UploadError("File is not a PDF")
+
+                size += len(chunk)
+                if max_bytes is not None and size > max_bytes:
+                    raise UploadError(f"File exceeds the maximum upload size of {max_bytes // (1024 * 1024)}MB", 413)
+
+                if not on_disk and size > spool_bytes:
+                    # Too large to keep in memory: move what we have to disk
+                    disk = tempfile.TemporaryFile(prefix="vtu-upload-")
+                    disk.write(spool.getbuffer())
+                    spool = disk
+                    on_disk = True
+                spool.write(chunk)
+
+            if size == 0:
+                raise UploadError("Uploaded file is empty")
+
+            if on_disk:
+                spool.flush()
+                mapping = mmap.mmap(spool.fileno(), 0, access=mmap.ACCESS_READ)
+                upload = cls(memoryview(mapping), spool, mapping)
+            else:
+                upload = cls(spool.getbuffer(), spool)
+        except Exception:
+            spool.close()
+            raise
+
+        if max_pages is not None and upload.page_count > max_pages:
+            upload.close()
+            raise UploadError(f"PDF has too many pages (max {max_pages})", 413)
+        return upload
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Wrap bytes already in memory (e.g. a batch item) without copying"""
+        if b'%PDF' not in bytes(data[:_HEADER_WINDOW]):
+            raise UploadError("File is not a PDF")
+        return cls(memoryview(data))
+
+    @classmethod
+    def wrap(cls, source):
+        """Return source as a PDFUpload (uploads, bytes and file objects accepted)"""
+        if isinstance(source, cls):
+            return source
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            return cls.from_bytes(source)
+        upload = cls.from_stream(source, max_bytes=None, max_pages=None)
+        if hasattr(source, "seek"):
+            source.seek(0)  # Reset file pointer for callers that reuse it
+        return upload
+
+    @property
+    def size(self):
+        return len(self.view)
+
+    def acquire(self):
+        """Take a reference that keeps the buffer alive until the matching release()"""
+        with self._refs_lock:
+            if self._refs == 0:
+                raise ValueError("PDF upload has already been released")
+            self._refs += 1
+        return self
+
+    def release(self):
+        """Drop a reference; the buffer is freed when the last one goes"""
+        with self._refs_lock:
+            self._refs -= 1
+            if self._refs > 0:
+                return
+        self._free()
+
+    @contextlib.contextmanager
+    def held(self):
+        """Keep the buffer alive for the duration of a with block (e.g. one parse path)"""
+        self.acquire()
+        try:
+            yield self
+        finally:
+            self.release()
+
+    def open(self):
+        """Return an independent seekable reader; the buffer stays alive until the reader is closed"""
+        self.acquire()
+        try:
+            return io.BufferedReader(_ViewReader(self.view, on_close=self.release), buffer_size=_CHUNK_SIZE)
+        except Exception:
+            self.release()
+            raise
+
+    def close(self):
+        """Drop the owner's reference; readers and parse paths still holding the upload keep it alive"""
+        with self._refs_lock:
+            if self._owner_closed:
+                return
+            self._owner_closed = True
+        self.release()
+
+    def _free(self):
+        try:
+            self.view.release()
+            if self._mapping is not None:
+                self._mapping.close()
+            if self._backing is not None:
+                self._backing.close()
+        except BufferError:
+            pass  # a view leaked outside the reference count; freed when it is collected
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def open_view(view):
+    """Seekable reader over any buffer (e.g. shared memory) without copying it"""
+    return io.BufferedReader(_ViewReader(memoryview(view)), buffer_size=_CHUNK_SIZE)
+
+
+def estimate_page_count(view):
+    """Count page objects without parsing the PDF (0 when they sit in compressed streams)"""
+    return sum(1 for _ in _PAGE_OBJECT_RE.finditer(view))
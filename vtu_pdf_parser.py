@@ -1,16 +1,103 @@
 import pdfplumber
 import re
 import json
-import base64
-import requests
-from flask import Flask, request, jsonify, render_template_string, send_from_directory
+import hashlib
+import io
+from flask import Flask, Response, g, request, jsonify, render_template_string, send_from_directory, stream_with_context
 from flask_cors import CORS
+from werkzeug.exceptions import HTTPException
 import os
-from subjects_database import get_subject_info, get_subjects_by_scheme, get_subjects_by_branch, search_subjects
+import threading
+import time
+import contextvars
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from subject_data import SnapshotCache, SubjectDataError, subject_data
+from subject_search import autocomplete_subjects, search_subjects_ranked
+from result_cache import ParseResultCache, make_cache_key
+from course_scanner import scan_course_lines
+from code_classifier import CodeClassifier
+from batch_parser import BATCH_MAX_ARCHIVE_BYTES, BATCH_MAX_TOTAL_BYTES, BatchError, collect_batch_items, iter_batch_results
+from page_extractor import extract_course_text
+from gemini_client import GeminiClient, InlinePDFRequestBody
+from gemini_store import GeminiResponseStore
+from upload_buffer import UPLOAD_MAX_BYTES, PDFUpload, UploadError
+from code_resolver import CodeResolver
+from curriculum import CURRICULUM_MAX_AGE, get_curriculum
+from prepared_response import PreparedResponse
+from grading import build_grade_tables, grade_cohort, np
+from cohort_analytics import COHORT_MAX_STUDENTS, analyze_cohort
+from cgpa_tracker import CGPATracker, cgpa_access_allowed, normalize_student
+from subject_record import ResultSummary, SubjectRecord
+import fast_json
+from parse_jobs import JobFailed, JobQueueFull, ParseJobManager, current_job_id, report_stage, sse_events
+from subject_catalogue import get_subject_catalogue
+import metrics
+import tracing
+
+# Room for the multipart boundaries and form fields around an upload
+REQUEST_FORM_OVERHEAD = 64 * 1024
+# JSON bodies of /grade/bulk and /analytics/cohort, which are larger than any single upload
+JSON_BODY_MAX_BYTES = int(os.getenv('JSON_BODY_MAX_BYTES', str(64 * 1024 * 1024)))  # 64MB
 
 app = Flask(__name__)
+app.json = fast_json.FastJSONProvider(app)  # orjson when installed, same JSON shape
+# Werkzeug answers oversized bodies with 413 from Content-Length, before reading them;
+# routes that accept more raise request.max_content_length for themselves
+app.config["MAX_CONTENT_LENGTH"] = UPLOAD_MAX_BYTES + REQUEST_FORM_OVERHEAD
 CORS(app)  # Enable CORS for cross-origin requests
 
+_REQUEST_ID_RE = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+
+@app.before_request
+def _begin_request_trace():
+    if request.endpoint:
+        g.metrics_endpoint = request.endpoint
+        metrics.registry.inc("vtu_requests_in_flight", request.endpoint)
+    
+    # Correlate with the caller's request id when it sends a sane one
+    request_id = request.headers.get("X-Request-ID", "")
+    g.trace, g.trace_token = tracing.begin_trace(
+        request_id if _REQUEST_ID_RE.match(request_id) else None,
+        profile=tracing.profile_requested(request.headers.get("X-Profile")),
+        method=request.method, path=request.path
+    )
+
+@app.after_request
+def _end_request_trace(response):
+    trace = g.pop("trace", None)
+    if trace is None:
+        return response
+    tracing.end_trace(trace, g.pop("trace_token"))
+    response.headers["X-Trace-Id"] = trace.id
+    if trace.profile:
+        # Operator-requested profile: span timeline in the response, full report on disk
+        response.headers["Server-Timing"] = trace.server_timing()
+        response.headers.setdefault("X-Profile-Id", trace.id)
+        try:
+            tracing.log("profile written", path=trace.write_profile())
+        except OSError as e:
+            tracing.log("could not write profile", level="warning", error=str(e))
+    return response
+
+@app.errorhandler(413)
+def _request_too_large(e):
+    """JSON instead of Werkzeug's HTML page when a body is over the route's size limit"""
+    limit = request.max_content_length
+    message = f"Request exceeds the maximum size of {limit // (1024 * 1024)}MB" if limit else "Request too large"
+    return jsonify({"error": message}), 413
+
+@app.teardown_request
+def _finish_request_metrics(exc=None):
+    endpoint = g.pop("metrics_endpoint", None)
+    if endpoint:
+        metrics.registry.inc("vtu_requests_in_flight", endpoint, -1)
+    trace = g.pop("trace", None)
+    if trace is not None:  # after_request did not run
+        tracing.end_trace(trace, g.pop("trace_token"))
+
+# Cache of parsed results keyed on uploaded PDF content + requested scheme
+parse_result_cache = ParseResultCache()
+
 # VTU Schemes and their grade mappings
 VTU_SCHEMES = {
     "2024": {
@@ -23,6 +110,8 @@ VTU_SCHEMES = {
     "2022": {
         "grading": {"O": 10, "A+": 9, "A": 8, "B+": 7, "B": 6, "C": 5, "P": 4, "F": 0},
         "pattern": r"B[A-Z]{2}\d{3}[A-Z]?",
+        "branch_prefix": "B",
+        "strong_prefixes": ["BCS"],
         "marks_to_grade": {
             90: "O", 80: "A+", 70: "A", 60: "B+", 55: "B", 50: "C", 40: "P"
         }
@@ -30,6 +119,7 @@ VTU_SCHEMES = {
     "2021": {
         "grading": {"O": 10, "A+": 9, "A": 8, "B+": 7, "B": 6, "C": 5, "P": 4, "F": 0},
         "pattern": r"21[A-Z]{2,4}\d{2,3}",
+        "branch_prefix": "21",
         "marks_to_grade": {
             90: "O", 80: "A+", 70: "A", 60: "B+", 55: "B", 50: "C", 40: "P"
         }
@@ -37,6 +127,7 @@ VTU_SCHEMES = {
     "2018": {
         "grading": {"S": 10, "A": 9, "B": 8, "C": 7, "D": 6, "E": 5, "F": 0},
         "pattern": r"18[A-Z]{2,4}\d{2,3}",
+        "branch_prefix": "18",
         "marks_to_grade": {
             90: "S", 80: "A", 70: "B", 60: "C", 50: "D", 40: "E"
         }
@@ -44,6 +135,7 @@ VTU_SCHEMES = {
     "2017": {
         "grading": {"S": 10, "A": 9, "B": 8, "C": 7, "D": 6, "E": 5, "F": 0},
         "pattern": r"17[A-Z]{2,4}\d{2,3}",
+        "branch_prefix": "17",
         "marks_to_grade": {
             90: "S", 80: "A", 70: "B", 60: "C", 50: "D", 40: "E"
         }
@@ -51,359 +143,460 @@ VTU_SCHEMES = {
     "2015": {
         "grading": {"S": 10, "A": 9, "B": 8, "C": 7, "D": 6, "E": 5, "F": 0},
         "pattern": r"15[A-Z]{2,4}\d{2,3}",
+        "branch_prefix": "15",
         "marks_to_grade": {
             90: "S", 80: "A", 70: "B", 60: "C", 50: "D", 40: "E"
         }
     }
 }
 
-# VTU Subject Credits Database - Now integrated with subjects_database.py
-# This provides a fallback for any subjects not in the main database
-SUBJECT_CREDITS = {
-    # Fallback credits for subjects not in the main database
-    "BCS401": {"name": "ANALYSIS & DESIGN OF ALGORITHMS", "credits": 4},
-    "BCS402": {"name": "MICROCONTROLLERS", "credits": 4},
-    "BCS403": {"name": "DATABASE MANAGEMENT SYSTEMS", "credits": 4},
-    "BCSL404": {"name": "ANALYSIS & DESIGN OF ALGORITHMS LAB", "credits": 1},
-    "BBOC407": {"name": "BIOLOGY FOR COMPUTER ENGINEERS", "credits": 2},  # Fixed: was 3, now 2
-    "BUHK408": {"name": "UNIVERSAL HUMAN VALUES COURSE", "credits": 1},
-    "BYOK459": {"name": "YOGA", "credits": 0},
-    "BCS405A": {"name": "DISCRETE MATHEMATICAL STRUCTURES", "credits": 4},
-    "BCS456B": {"name": "CAPACITY PLANNING FOR IT", "credits": 1}
+# VTU Branches recognised from course code prefixes
+VTU_BRANCHES = {
+    "CS": "Computer Science & Engineering",
+    "EC": "Electronics & Communication Engineering",
+    "ME": "Mechanical Engineering",
+    "CV": "Civil Engineering",
+    "EE": "Electrical & Electronics Engineering",
+    "IS": "Information Science & Engineering",
+    "AD": "Artificial Intelligence & Data Science",
+    "BT": "Biotechnology",
+    "CH": "Chemical Engineering"
 }
 
+# Prefix trie over scheme patterns and branch codes, built once at import
+code_classifier = CodeClassifier(VTU_SCHEMES, VTU_BRANCHES)
+
+# Background parse jobs with progress events (POST /jobs/parse-pdf)
+parse_jobs = ParseJobManager()
+
+# Per-student course results and running semester totals for CGPA
+cgpa_tracker = CGPATracker()
+
+# Grade letter/point for every mark 0-100 per scheme, built once at import
+grade_tables = build_grade_tables(VTU_SCHEMES)
+BULK_GRADE_MAX_STUDENTS = int(os.getenv('BULK_GRADE_MAX_STUDENTS', '10000'))
+
+# Shared Gemini client (keep-alive pool, concurrency cap, circuit breaker)
+gemini_client = GeminiClient()
+
+# Extraction prompt sent with every PDF
+GEMINI_PROMPT = """
+        You are an expert at reading VTU (Visvesvaraya Technological University) exam result PDFs. 
+        
+        Extract ONLY the following information from this VTU result PDF:
+        1. Subject Code (e.g., BCS401, 22CS101, etc.)
+        2. Subject Name
+        3. Internal Marks
+        4. External Marks  
+        5. Total Marks
+        6. Result (P/F/A/W/X/NE)
+        
+        Ignore all other information like student details, dates, headers, footers, etc.
+        
+        Return the data as a clean JSON array of objects with this exact format:
+        [
+            {
+                "code": "BCS401",
+                "name": "ANALYSIS & DESIGN OF ALGORITHMS",
+                "internal": 49,
+                "external": 36,
+                "total": 85,
+                "result": "P"
+            }
+        ]
+        
+        If you cannot find any subjects, return an empty array [].
+        Be very precise and accurate with the numbers and codes.
+        Only return the JSON array, no additional text or explanations.
+        """
+
+# Stored Gemini responses are only reused for the same model and prompt
+GEMINI_PROMPT_VERSION = hashlib.sha256(f"{gemini_client.model}\n{GEMINI_PROMPT}".encode('utf-8')).hexdigest()[:16]
+
+# Persistent Gemini responses shared by all workers on this host
+gemini_store = GeminiResponseStore()
+
+# Parse execution policy: gemini-first, local-first, race or hedge-after-<N>-ms
+PARSE_POLICY = os.getenv('PARSE_POLICY', 'gemini-first')
+PARSE_HEDGE_THREADS = int(os.getenv('PARSE_HEDGE_THREADS', '8'))  # Gemini calls of race/hedge parses
+PARSE_LOCAL_THREADS = int(os.getenv('PARSE_LOCAL_THREADS', '4'))  # local parses of race/hedge parses
+_HEDGE_POLICY_RE = re.compile(r'hedge-after-(\d+)-?ms')
+_path_executors = {}  # path -> (pid, executor), rebuilt in a forked worker
+_path_executors_lock = threading.Lock()
+# {path: (result, strategy)} for the parse in progress, for the strategy metric
+_parse_outcomes = contextvars.ContextVar("parse_outcomes", default=None)
+# Set once a raced parse path has lost, so it skips work it has not started yet
+_path_abandoned = contextvars.ContextVar("parse_path_abandoned", default=None)
+
+# Fallback credits for subjects not in the main database live in
+# data/fallback_credits.json and are reloaded with it (see subject_data.py)
+
+# Static catalogue responses, serialized and compressed once (per data version)
+schemes_response = PreparedResponse(VTU_SCHEMES)
+subjects_response = SnapshotCache(lambda snapshot: PreparedResponse(dict(snapshot.fallback_credits)))
+
+# Nearest known code for codes garbled by extraction (only used on lookup misses)
+code_resolver = SnapshotCache(lambda snapshot: CodeResolver(
+    lambda: [code for code, _ in snapshot.index.iter_subjects()] + list(snapshot.fallback_credits)
+))
+
+def lookup_subject(subject_code):
+    """Find a subject's name/credits, correcting garbled codes; returns None if unknown"""
+    # Main subjects database first, then the fallback credits
+    snapshot = subject_data.current()
+    subject_info = snapshot.lookup(subject_code)
+    if subject_info:
+        return subject_info
+    
+    # Misread code (O/0, I/1, dropped suffix): use the code it can only be a misreading of
+    # (reported once per result, in build_result_payload's code_corrections)
+    corrected = correct_subject_code(subject_code)
+    if corrected:
+        return snapshot.lookup(corrected)
+    
+    return None
+
+def correct_subject_code(subject_code):
+    """Known code an unknown code was misread from, or None (known codes are never corrected)"""
+    if subject_data.current().lookup(subject_code):
+        return None
+    return code_resolver.get().correct(subject_code)
+
+def get_subject_name_and_credits(subject_code):
+    """(name, credits) from one lookup: the database's, else the code itself and 3 credits"""
+    subject_info = lookup_subject(subject_code)
+    if subject_info:
+        return subject_info["name"], subject_info["credits"]
+    return subject_code, 3
+
 def get_subject_credits(subject_code):
     """Get subject credits from the integrated database"""
-    # First try the main subjects database
-    subject_info = get_subject_info(subject_code)
+    subject_info = lookup_subject(subject_code)
     if subject_info:
         return subject_info["credits"]
     
-    # Fallback to the old SUBJECT_CREDITS
-    if subject_code in SUBJECT_CREDITS:
-        return SUBJECT_CREDITS[subject_code]["credits"]
-    
     # Default credit for unknown subjects
     return 3
 
 def get_subject_name(subject_code):
     """Get subject name from the integrated database"""
-    # First try the main subjects database
-    subject_info = get_subject_info(subject_code)
+    subject_info = lookup_subject(subject_code)
     if subject_info:
         return subject_info["name"]
     
-    # Fallback to the old SUBJECT_CREDITS
-    if subject_code in SUBJECT_CREDITS:
-        return SUBJECT_CREDITS[subject_code]["name"]
-    
     # Return the code if no name found
     return subject_code
 
+def grade_marks(marks, scheme):
+    """Return (grade letter, grade point) for marks under a VTU scheme"""
+    table = grade_tables.get(scheme)
+    if table is None:
+        return "F", 0
+    return table.grade(marks)
+
 def calculate_grade_point(marks, scheme):
     """Calculate grade point based on marks and VTU scheme"""
-    if scheme not in VTU_SCHEMES:
-        return 0
-    
-    marks_to_grade = VTU_SCHEMES[scheme]["marks_to_grade"]
-    grading = VTU_SCHEMES[scheme]["grading"]
-    
-    # Find the appropriate grade
-    grade = "F"  # Default to F
-    for threshold, grade_letter in sorted(marks_to_grade.items(), reverse=True):
-        if marks >= threshold:
-            grade = grade_letter
-            break
-    
-    # Return grade point
-    return grading.get(grade, 0)
+    return grade_marks(marks, scheme)[1]
 
 def get_grade_from_marks(marks, scheme):
     """Get grade letter directly from marks"""
-    if scheme not in VTU_SCHEMES:
-        return "F"
-    
-    marks_to_grade = VTU_SCHEMES[scheme]["marks_to_grade"]
-    
-    # Find the appropriate grade
-    grade = "F"  # Default to F
-    for threshold, grade_letter in sorted(marks_to_grade.items(), reverse=True):
-        if marks >= threshold:
-            grade = grade_letter
-            break
-    
-    return grade
+    return grade_marks(marks, scheme)[0]
 
 def detect_scheme_from_text(text):
     """Auto-detect VTU scheme from PDF text with enhanced detection"""
-    # Enhanced scheme detection with multiple patterns and confidence scoring
-    scheme_scores = {}
-    
-    for scheme, data in VTU_SCHEMES.items():
-        score = 0
-        pattern = data["pattern"]
-        
-        # Count matches for this scheme
-        matches = re.findall(pattern, text, re.IGNORECASE)
-        score += len(matches) * 10  # Each match adds 10 points
-        
-        # Bonus for multiple matches (indicates this is likely the correct scheme)
-        if len(matches) > 1:
-            score += 20
-        
-        # Check for scheme-specific keywords
-        if scheme == "2022":
-            if re.search(r'BCS|BEC|BME|BCV|BEE|BIS|BAD|BBT|BCH', text, re.IGNORECASE):
-                score += 50
-            # Also check for BCS format (BCS401, BCS402, etc.)
-            if re.search(r'BCS\d{3}', text, re.IGNORECASE):
-                score += 100  # High confidence for BCS format
-        elif scheme == "2021":
-            if re.search(r'21CS|21EC|21ME|21CV|21EE|21IS|21AD|21BT|21CH', text, re.IGNORECASE):
-                score += 50
-        elif scheme == "2018":
-            if re.search(r'18CS|18EC|18ME|18CV|18EE|18IS|18AD|18BT|18CH', text, re.IGNORECASE):
-                score += 50
-        elif scheme == "2017":
-            if re.search(r'17CS|17EC|17ME|17CV|17EE|17IS|17AD|17BT|17CH', text, re.IGNORECASE):
-                score += 50
-        elif scheme == "2015":
-            if re.search(r'15CS|15EC|15ME|15CV|15EE|15IS|15AD|15BT|15CH', text, re.IGNORECASE):
-                score += 50
-        
-        scheme_scores[scheme] = score
-    
-    # Return the scheme with the highest score
-    if scheme_scores:
-        best_scheme = max(scheme_scores, key=scheme_scores.get)
-        if scheme_scores[best_scheme] > 0:
-            return best_scheme
+    # Single pass over the code tokens with confidence scoring
+    best_scheme = code_classifier.classify_text(text).scheme
+    if best_scheme:
+        return best_scheme
     
     return "2022"  # Default to 2022 scheme (most common)
 
-def parse_vtu_pdf(pdf_file, scheme=None):
-    """Parse VTU PDF and extract course information with exceptional robustness"""
-    subjects = {}
+def parse_execution_policy(policy):
+    """Split a policy name into (mode, hedge_delay_seconds)"""
+    policy = (policy or "gemini-first").strip().lower()
+    if policy in ("gemini-first", "local-first", "race"):
+        return policy, 0.0
+    hedge_match = _HEDGE_POLICY_RE.fullmatch(policy)
+    if hedge_match:
+        return "hedge", int(hedge_match.group(1)) / 1000.0
+    tracing.log("unknown PARSE_POLICY, using gemini-first", level="warning", policy=policy)
+    return "gemini-first", 0.0
+
+def validate_subjects(subjects, tolerance=5):
+    """Sanity-check a parse result: totals add up and at least one code is known"""
+    if not subjects:
+        return False
+    
+    snapshot = subject_data.current()
+    known_codes = 0
+    for code, subject in subjects.items():
+        # Validate: total should be sum of internal + external (approximately)
+        if abs(subject["total"] - (subject["internal"] + subject["external"])) > tolerance:
+            return False
+        if snapshot.lookup(code):
+            known_codes += 1
     
+    return known_codes > 0
+
+def parse_vtu_pdf(pdf_file, scheme=None, policy=None):
+    """Parse VTU PDF and extract course information with exceptional robustness"""
     try:
+        # One shared buffer for every reader (no per-path copies of the PDF)
+        upload = PDFUpload.wrap(pdf_file)
+        
+        mode, hedge_delay = parse_execution_policy(policy or PARSE_POLICY)
+        
+        # Each path notes the result it produced and the strategy behind it
+        produced = {}
+        token = _parse_outcomes.set(produced)
+        try:
+            with tracing.span("parse", policy=mode) as parse_span:
+                result = _run_parse_policy(upload, scheme, mode, hedge_delay)
+                strategy = next((strategy for path_result, strategy in produced.values() if path_result is result), None)
+                parse_span["strategy"] = strategy or "none"
+        finally:
+            _parse_outcomes.reset(token)
+        
+        metrics.count_strategy(strategy)
+        return result
+        
+    except Exception as e:
+        tracing.log("error parsing PDF", level="error", error=str(e))
+        return {}, scheme
+
+def _note_parse_outcome(path, result, strategy):
+    """Remember which strategy produced a path's result (parse_vtu_pdf counts the accepted one)"""
+    outcomes = _parse_outcomes.get()
+    if outcomes is not None and result:
+        outcomes[path] = (result, strategy)
+    return result
+
+def _run_parse_policy(upload, scheme, mode, hedge_delay):
+    """Run the parse paths in the order the execution policy asks for"""
+    if mode == "gemini-first":
         # First, try Gemini AI for intelligent parsing
-        print("Attempting to parse with Gemini AI...")
-        ai_subjects = parse_with_gemini_ai(pdf_file)
-        
-        if ai_subjects and len(ai_subjects) > 0:
-            print(f"Gemini AI successfully extracted {len(ai_subjects)} subjects")
-            # Process AI results
-            for code, subject_data in ai_subjects.items():
-                # Get credits from integrated database
-                credits = get_subject_credits(code)
-                subject_name = get_subject_name(code)
-                
-                # Calculate grade points and grades
-                grade_point = calculate_grade_point(subject_data["total"], scheme or "2022")
-                grade_letter = get_grade_from_marks(subject_data["total"], scheme or "2022")
-                
-                # Update subject data with correct credits and grades
-                ai_subjects[code].update({
-                    "grade_point": grade_point,
-                    "credits": credits,
-                    "grade": grade_letter,
-                    "credit_points": grade_point * credits
-                })
-            
-            return ai_subjects, scheme or "2022"
+        result = _parse_with_gemini_path(upload, scheme)
+        if result:
+            return result
         
         # Fallback to traditional parsing if AI fails
-        print("Gemini AI failed, using traditional parsing...")
-        
-        # Extract text from PDF with multiple strategies
-        text = ""
-        with pdfplumber.open(pdf_file) as pdf:
-            for page in pdf.pages:
-                # Try multiple text extraction methods
-                page_text = page.extract_text()
-                if not page_text or len(page_text.strip()) < 10:
-                    # Fallback: try to extract text from tables
-                    tables = page.extract_tables()
-                    for table in tables:
-                        for row in table:
-                            if row:
-                                page_text += " ".join([str(cell) for cell in row if cell]) + "\n"
-                
-                if page_text:
-                    text += page_text + "\n"
+        tracing.log("Gemini AI failed, using traditional parsing")
+        return _parse_with_local_path(upload, scheme)
+    
+    if mode == "local-first":
+        local_result = _parse_with_local_path(upload, scheme)
+        if validate_subjects(local_result[0]):
+            return local_result
         
-        # Clean and normalize text
-        text = re.sub(r'\s+', ' ', text)  # Normalize whitespace
-        text = re.sub(r'[^\w\s&()\-\.]', ' ', text)  # Remove special chars but keep important ones
-        
-        # Auto-detect scheme if not provided
-        if not scheme:
-            scheme = detect_scheme_from_text(text)
-        
-        # Ultra-flexible course extraction patterns
-        patterns = [
-            # Pattern 1: Standard VTU format with result (BCS401 format)
-            r"([A-Z]{3,4}\d{3}[A-Z]?)\s+([A-Z &]+(?: [A-Z]+)*)\s+(\d+)\s+(\d+)\s+(\d+)\s+([PFAXWNE])",
-            # Pattern 2: Alternative format with result
-            r"([A-Z]{3,4}\d{3}[A-Z]?)\s+([A-Z &]+(?: [A-Z]+)*)\s+(\d+)\s+(\d+)\s+(\d+)\s+([A-Z]+)",
-            # Pattern 3: Compact format without result
-            r"([A-Z]{3,4}\d{3}[A-Z]?)\s+([A-Z &]+)\s+(\d+)\s+(\d+)\s+(\d+)",
-            # Pattern 4: More flexible pattern
-            r"([A-Z]{3,4}\d{3}[A-Z]?)\s+([A-Z &]+(?: [A-Z]+)*)\s+(\d+)\s+(\d+)\s+(\d+)",
-            # Pattern 5: Very flexible pattern for any course code
-            r"([A-Z]{3,4}\d{3}[A-Z]?)\s+([A-Z &]+(?: [A-Z]+)*)\s+(\d+)\s+(\d+)\s+(\d+)",
-            # Pattern 6: Legacy VTU format (22CS101 format)
-            r"([A-Z]{2}\d{2}[A-Z]{2,4}\d{3})\s+([A-Z &]+(?: [A-Z]+)*)\s+(\d+)\s+(\d+)\s+(\d+)\s+([PFAXWNE])",
-            r"([A-Z]{2}\d{2}[A-Z]{2,4}\d{3})\s+([A-Z &]+(?: [A-Z]+)*)\s+(\d+)\s+(\d+)\s+(\d+)",
-            # Pattern 7: Ultra-flexible - any course code followed by numbers
-            r"([A-Z]{2,5}\d{2,4}[A-Z]?)\s+([A-Z &]+(?: [A-Z]+)*)\s+(\d+)\s+(\d+)\s+(\d+)",
-            # Pattern 8: Even more flexible - course code anywhere in line with marks
-            r"([A-Z]{2,5}\d{2,4}[A-Z]?)[^0-9]*(\d+)[^0-9]*(\d+)[^0-9]*(\d+)",
-        ]
+        tracing.log("traditional parsing not trusted, trying Gemini AI")
+        return _parse_with_gemini_path(upload, scheme) or local_result
+    
+    return _race_parse_paths(upload, scheme, hedge_delay if mode == "hedge" else 0.0)
+
+def _get_path_executor(path):
+    """This process's pool for the "gemini" or "local" side of race/hedge parses
+
+    Each side has its own pool, so local parses never queue behind slow
+    Gemini calls and a burst of local parses cannot delay Gemini either.
+    """
+    with _path_executors_lock:
+        pid, executor = _path_executors.get(path, (None, None))
+        if executor is None or pid != os.getpid():
+            threads = PARSE_HEDGE_THREADS if path == "gemini" else PARSE_LOCAL_THREADS
+            executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix=f"parse-{path}")
+            _path_executors[path] = (os.getpid(), executor)
+        return executor
+
+def _submit_parse_path(executor, parse_path, upload, scheme):
+    """Run a parse path on the executor, holding the upload until the path returns
+
+    The caller may close the upload as soon as it has a result, while the
+    losing path is still reading it. The path runs in a copy of this context,
+    so it reports progress to the caller's job; _abandon_parse_path() stops it
+    from starting work it has not begun.
+    """
+    context = contextvars.copy_context()
+    abandoned = threading.Event()
+    context.run(_path_abandoned.set, abandoned)
+    upload.acquire()
+    
+    def run():
+        try:
+            return parse_path(upload, scheme)
+        finally:
+            upload.release()
+    
+    try:
+        future = executor.submit(context.run, run)
+    except Exception:
+        upload.release()
+        raise
+    # A path cancelled while still queued never runs, so its reference is dropped here
+    future.add_done_callback(lambda done: upload.release() if done.cancelled() else None)
+    future.abandoned = abandoned
+    return future
+
+def _abandon_parse_path(future):
+    """Give up on a raced path: drop it from the queue, or let it skip the calls it has not made"""
+    future.abandoned.set()
+    future.cancel()
+
+def _path_is_abandoned():
+    abandoned = _path_abandoned.get()
+    return abandoned is not None and abandoned.is_set()
+
+def _race_result(future, path):
+    """A finished path's result, with path failures logged and treated as no result"""
+    try:
+        return future.result()
+    except Exception as e:
+        tracing.log("parse path failed", level="error", parse_path=path, error=str(e))
+        return None
+
+def _race_parse_paths(upload, scheme, hedge_delay):
+    """Run Gemini and local parsing side by side and return the first result that validates
+
+    Each path runs on its own pool. With hedge_delay > 0 the local parse only
+    starts if Gemini has not produced a valid result within that many seconds.
+    The losing path is dropped if it is still queued; a losing Gemini call
+    also skips its API call if it has not made it yet. If neither result
+    validates, any Gemini result is preferred over what local parsing found.
+    """
+    parse_paths = {"gemini": _parse_with_gemini_path, "local": _parse_with_local_path}
+    futures = {}
+    results = {}
+    
+    def start(path):
+        futures[_submit_parse_path(_get_path_executor(path), parse_paths[path], upload, scheme)] = path
+    
+    try:
+        start("gemini")
+        done = set()
+        if hedge_delay > 0:
+            done, pending = wait(futures, timeout=hedge_delay)
+            if pending:
+                tracing.log("Gemini AI slower than the hedge delay, starting traditional parsing",
+                            hedge_delay_ms=int(hedge_delay * 1000))
         
-        all_matches = []
-        for pattern in patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            if matches:
-                all_matches.extend(matches)
+        while True:
+            for future in done:
+                path = futures[future]
+                results[path] = _race_result(future, path)
+                if results[path] and validate_subjects(results[path][0]):
+                    tracing.log("accepted parse result", parse_path=path)
+                    return results[path]
+            if "local" not in futures.values():
+                start("local")
+            pending = [future for future, path in futures.items() if path not in results]
+            if not pending:
                 break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
         
-        # If no matches found, try ultra-aggressive parsing
-        if not all_matches:
-            all_matches = _ultra_aggressive_parsing(text)
-        
-        # If still no matches, try fallback parsing
-        if not all_matches:
-            all_matches = _fallback_parsing(text)
-        
-        # Process all matches
-        for match in all_matches:
-            if len(match) >= 5:
-                code = match[0].strip().upper()
-                name = match[1].strip().upper()
-                internal = int(match[2]) if str(match[2]).isdigit() else 0
-                external = int(match[3]) if str(match[3]).isdigit() else 0
-                total = int(match[4]) if str(match[4]).isdigit() else 0
-                result = match[5] if len(match) > 5 else "P"
-                
-                # Get credits from database - try multiple approaches
-                subject_info = None
-                
-                # Get credits from integrated database
-                credits = get_subject_credits(code)
-                subject_name = get_subject_name(code)
-                
-                grade_point = calculate_grade_point(total, scheme)
-                grade_letter = get_grade_from_marks(total, scheme)
-                
-                # Check if the subject is actually failed based on marks
-                if total < 40:  # VTU passing threshold
-                    result = "F"
-                elif result in ["F", "FAIL", "ABSENT", "A"]:
-                    result = "F"
-                else:
-                    result = "P"
-                
-                subjects[code] = {
-                    "code": code,
-                    "name": subject_name,
-                    "internal": internal,
-                    "external": external,
-                    "total": total,
-                    "grade_point": grade_point,
-                    "credits": credits,
-                    "result": result,
-                    "grade": grade_letter,
-                    "credit_points": grade_point * credits
-                }
-        
-        return subjects, scheme
+        # Nothing validated: prefer any Gemini result, then whatever local found
+        return results.get("gemini") or results.get("local") or ({}, scheme)
+    finally:
+        for future in futures:
+            if not future.done():
+                _abandon_parse_path(future)
+
+@tracing.spanned("gemini_path")
+def _parse_with_gemini_path(upload, scheme=None):
+    """Parse with Gemini AI; returns (subjects, scheme) or None if Gemini found nothing"""
+    report_stage("gemini", "Trying Gemini AI")
+    ai_subjects = parse_with_gemini_ai(upload)
+    
+    if not ai_subjects:
+        report_stage("gemini", "Gemini AI found no subjects")
+        return None
+    report_stage("gemini", f"Gemini AI extracted {len(ai_subjects)} subjects", subjects=len(ai_subjects))
+    
+    # Process AI results
+    for code, subject in ai_subjects.items():
+        # Get credits from integrated database
+        subject_name, credits = get_subject_name_and_credits(code)
         
-    except Exception as e:
-        print(f"Error parsing PDF: {str(e)}")
-        return {}, scheme
+        # Calculate grade points and grades
+        grade_letter, grade_point = grade_marks(subject.total, scheme or "2022")
+        
+        # Update subject record with correct credits and grades
+        subject.grade_point = grade_point
+        subject.credits = credits
+        subject.grade = grade_letter
+        subject.credit_points = grade_point * credits
+    
+    return _note_parse_outcome("gemini", (ai_subjects, scheme or "2022"), "gemini")
+
+@tracing.spanned("local_path")
+def _parse_with_local_path(upload, scheme=None):
+    """Parse with pdfplumber text extraction and the course-line scanner"""
+    subjects = {}
+    
+    # Extract and normalize text page by page, stopping once the marks table
+    # has ended (long documents go to parallel workers when configured)
+    report_stage("extracting", "Extracting text from PDF pages")
+    text = extract_course_text(upload)
+    
+    # Auto-detect scheme if not provided
+    if not scheme:
+        scheme = detect_scheme_from_text(text)
+    
+    # Precompiled pattern cascade with line/word fallbacks
+    report_stage("matching", "Matching course lines")
+    with tracing.stage("matching") as matching:
+        all_matches, strategy = scan_course_lines(text)
+        matching.update(strategy=strategy or "none", courses=len(all_matches))
+    report_stage("matching", f"Found {len(all_matches)} course lines ({strategy})", courses=len(all_matches))
+    
+    # Process all matches
+    for match in all_matches:
+        if len(match) >= 5:
+            code = match[0].strip().upper()
+            name = match[1].strip().upper()
+            internal = int(match[2]) if str(match[2]).isdigit() else 0
+            external = int(match[3]) if str(match[3]).isdigit() else 0
+            total = int(match[4]) if str(match[4]).isdigit() else 0
+            result = match[5] if len(match) > 5 else "P"
+            
+            # Get credits from database - try multiple approaches
+            subject_info = None
+            
+            # Get credits from integrated database
+            subject_name, credits = get_subject_name_and_credits(code)
+            
+            grade_letter, grade_point = grade_marks(total, scheme)
+            
+            # Check if the subject is actually failed based on marks
+            if total < 40:  # VTU passing threshold
+                result = "F"
+            elif result in ["F", "FAIL", "ABSENT", "A"]:
+                result = "F"
+            else:
+                result = "P"
+            
+            subjects[code] = SubjectRecord(
+                code=code,
+                name=subject_name,
+                internal=internal,
+                external=external,
+                total=total,
+                grade_point=grade_point,
+                credits=credits,
+                result=result,
+                grade=grade_letter,
+                credit_points=grade_point * credits
+            )
+    
+    return _note_parse_outcome("local", (subjects, scheme), strategy)
 
 def detect_branch_from_subjects(subjects):
     """Auto-detect branch from extracted subjects"""
     if not subjects:
         return "Unknown"
     
-    # Count branch-specific course codes
-    branch_counts = {
-        'CS': 0,  # Computer Science
-        'EC': 0,  # Electronics & Communication
-        'ME': 0,  # Mechanical Engineering
-        'CV': 0,  # Civil Engineering
-        'EE': 0,  # Electrical & Electronics
-        'IS': 0,  # Information Science
-        'AD': 0,  # AI & Data Science
-        'BT': 0,  # Biotechnology
-        'CH': 0   # Chemical Engineering
-    }
-    
-    for code in subjects.keys():
-        code_upper = code.upper()
-        
-        # 2022 scheme patterns
-        if code_upper.startswith('BCS'): branch_counts['CS'] += 1
-        elif code_upper.startswith('BEC'): branch_counts['EC'] += 1
-        elif code_upper.startswith('BME'): branch_counts['ME'] += 1
-        elif code_upper.startswith('BCV'): branch_counts['CV'] += 1
-        elif code_upper.startswith('BEE'): branch_counts['EE'] += 1
-        elif code_upper.startswith('BIS'): branch_counts['IS'] += 1
-        elif code_upper.startswith('BAD'): branch_counts['AD'] += 1
-        elif code_upper.startswith('BBT'): branch_counts['BT'] += 1
-        elif code_upper.startswith('BCH'): branch_counts['CH'] += 1
-        
-        # 2021 scheme patterns
-        elif code_upper.startswith('21CS'): branch_counts['CS'] += 1
-        elif code_upper.startswith('21EC'): branch_counts['EC'] += 1
-        elif code_upper.startswith('21ME'): branch_counts['ME'] += 1
-        elif code_upper.startswith('21CV'): branch_counts['CV'] += 1
-        elif code_upper.startswith('21EE'): branch_counts['EE'] += 1
-        elif code_upper.startswith('21IS'): branch_counts['IS'] += 1
-        elif code_upper.startswith('21AD'): branch_counts['AD'] += 1
-        elif code_upper.startswith('21BT'): branch_counts['BT'] += 1
-        elif code_upper.startswith('21CH'): branch_counts['CH'] += 1
-        
-        # 2018 scheme patterns
-        elif code_upper.startswith('18CS'): branch_counts['CS'] += 1
-        elif code_upper.startswith('18EC'): branch_counts['EC'] += 1
-        elif code_upper.startswith('18ME'): branch_counts['ME'] += 1
-        elif code_upper.startswith('18CV'): branch_counts['CV'] += 1
-        elif code_upper.startswith('18EE'): branch_counts['EE'] += 1
-        elif code_upper.startswith('18IS'): branch_counts['IS'] += 1
-        elif code_upper.startswith('18AD'): branch_counts['AD'] += 1
-        elif code_upper.startswith('18BT'): branch_counts['BT'] += 1
-        elif code_upper.startswith('18CH'): branch_counts['CH'] += 1
-        
-        # 2017 scheme patterns
-        elif code_upper.startswith('17CS'): branch_counts['CS'] += 1
-        elif code_upper.startswith('17EC'): branch_counts['EC'] += 1
-        elif code_upper.startswith('17ME'): branch_counts['ME'] += 1
-        elif code_upper.startswith('17CV'): branch_counts['CV'] += 1
-        elif code_upper.startswith('17EE'): branch_counts['EE'] += 1
-        elif code_upper.startswith('17IS'): branch_counts['IS'] += 1
-        elif code_upper.startswith('17AD'): branch_counts['AD'] += 1
-        elif code_upper.startswith('17BT'): branch_counts['BT'] += 1
-        elif code_upper.startswith('17CH'): branch_counts['CH'] += 1
-        
-        # 2015 scheme patterns
-        elif code_upper.startswith('15CS'): branch_counts['CS'] += 1
-        elif code_upper.startswith('15EC'): branch_counts['EC'] += 1
-        elif code_upper.startswith('15ME'): branch_counts['ME'] += 1
-        elif code_upper.startswith('15CV'): branch_counts['CV'] += 1
-        elif code_upper.startswith('15EE'): branch_counts['EE'] += 1
-        elif code_upper.startswith('15IS'): branch_counts['IS'] += 1
-        elif code_upper.startswith('15AD'): branch_counts['AD'] += 1
-        elif code_upper.startswith('15BT'): branch_counts['BT'] += 1
-        elif code_upper.startswith('15CH'): branch_counts['CH'] += 1
-    
-    # Return the branch with the highest count
-    if branch_counts:
-        best_branch = max(branch_counts, key=branch_counts.get)
-        if branch_counts[best_branch] > 0:
-            return best_branch
+    # Count branch-specific course code prefixes (BCS, 21CS, 18CS, ...)
+    best_branch = code_classifier.classify_codes(subjects.keys()).branch
+    if best_branch:
+        return best_branch
     
     return "Unknown"
 
@@ -420,29 +613,64 @@ def get_grade_from_points(points, scheme):
 
 def calculate_sgpa(subjects):
     """Calculate SGPA using VTU formula with exact precision"""
-    total_credits = 0
-    total_weighted_points = 0
-    failed_subjects = []
+    summary = ResultSummary(subjects.values())
+    return summary.sgpa, summary.total_credits, summary.total_weighted_points, summary.failed_subjects
+
+def build_result_payload(subjects, detected_scheme):
+    """Build the /parse-pdf response body from parsed subjects"""
+    # SGPA totals and the detailed breakdown in one pass over the subjects
+    summary = ResultSummary(subjects.values())
     
-    for subject in subjects.values():
-        # Include all subjects in total credits (even failed ones)
-        credits = float(subject["credits"])
-        grade_point = float(subject["grade_point"])
-        
-        total_credits += credits
-        total_weighted_points += credits * grade_point
-        
-        # Track failed subjects
-        if subject["result"] == "F" or subject["total"] < 40:
-            failed_subjects.append(subject["code"])
+    # Auto-detect branch (the same trie pass scores the reported scheme)
+    classification = code_classifier.classify_codes(subjects.keys())
+    detected_branch = classification.branch or "Unknown"
     
-    sgpa = 0.0
-    if total_credits > 0:
-        sgpa = round(total_weighted_points / total_credits, 2)
+    # Printed codes whose name and credits were taken from the known code they were misread from
+    code_corrections = {}
+    for code in subjects:
+        corrected = correct_subject_code(code)
+        if corrected:
+            code_corrections[code] = corrected
+            tracing.log("resolved course code", code=code, resolved=corrected)
     
-    return sgpa, total_credits, total_weighted_points, failed_subjects
+    return {
+        "success": True,
+        "scheme": detected_scheme,
+        "branch": detected_branch,
+        "scheme_confidence": classification.confidence_for_scheme(detected_scheme),
+        "branch_confidence": classification.branch_confidence,
+        "sgpa": round(summary.sgpa, 2),
+        "total_credits": summary.total_credits,
+        "total_weighted_points": summary.total_weighted_points,
+        "subjects": subjects,
+        "subjects_count": len(subjects),
+        "failed_subjects": summary.failed_subjects,
+        "failed_count": len(summary.failed_subjects),
+        "detailed_breakdown": summary.detailed_breakdown(),
+        "code_corrections": code_corrections
+    }
 
 
+def parse_transcript_bytes(filename, pdf_bytes, scheme=None):
+    """Parse one in-memory transcript for a batch worker; errors are returned, not raised"""
+    try:
+        upload = PDFUpload.from_bytes(pdf_bytes)
+    except UploadError as e:
+        return {"success": False, "error": str(e)}
+    
+    try:
+        subjects, detected_scheme = parse_vtu_pdf(upload, scheme)
+        if not subjects:
+            return {
+                "success": False,
+                "error": "No subjects found in PDF. Please ensure it's a valid VTU result PDF.",
+                "detected_scheme": detected_scheme
+            }
+        with tracing.stage("sgpa"):
+            return build_result_payload(subjects, detected_scheme)
+    except Exception as e:
+        return {"success": False, "error": f"Error processing PDF: {str(e)}"}
+
 
 @app.route("/", methods=["GET"])
 def home():
@@ -462,6 +690,7 @@ def app_js():
 @app.route("/parse-pdf", methods=["POST"])
 def parse_pdf():
     """Parse PDF and return JSON response"""
+    upload_started = time.perf_counter()
     try:
         if "pdf_file" not in request.files:
             return jsonify({"error": "No PDF file provided"}), 400
@@ -475,56 +704,400 @@ def parse_pdf():
         
         scheme = request.form.get("scheme", None)
         
-        # Parse the PDF
-        subjects, detected_scheme = parse_vtu_pdf(pdf_file, scheme)
+        # Copy the upload once, rejecting oversized or non-PDF files early
+        try:
+            upload = PDFUpload.from_stream(pdf_file.stream)
+        except UploadError as e:
+            return jsonify({"error": str(e)}), e.status_code
+        # Request body parsing plus the copy into the shared buffer
+        tracing.record_stage("upload_read", upload_started, bytes=upload.size)
         
-        if not subjects:
-            return jsonify({
-                "error": "No subjects found in PDF. Please ensure it's a valid VTU result PDF.",
-                "detected_scheme": detected_scheme
-            }), 400
+        with upload:
+            body, cache_status = parse_upload_cached(upload, scheme)
         
-        # Calculate SGPA
-        sgpa, total_credits, total_weighted_points, failed_subjects = calculate_sgpa(subjects)
+        if cache_status is None:
+            return jsonify(body), 400
         
-        # Auto-detect branch
-        detected_branch = detect_branch_from_subjects(subjects)
-        
-        return jsonify({
-            "success": True,
-            "scheme": detected_scheme,
-            "branch": detected_branch,
-            "sgpa": round(sgpa, 2),
-            "total_credits": total_credits,
-            "total_weighted_points": total_weighted_points,
-            "subjects": subjects,
-            "subjects_count": len(subjects),
-            "failed_subjects": failed_subjects,
-            "failed_count": len(failed_subjects),
-            "detailed_breakdown": {
-                "total_internal": sum(subject["internal"] for subject in subjects.values()),
-                "total_external": sum(subject["external"] for subject in subjects.values()),
-                "total_marks": sum(subject["total"] for subject in subjects.values()),
-                "passed_subjects": len([s for s in subjects.values() if s["result"] == "P"]),
-                "failed_subjects_count": len([s for s in subjects.values() if s["result"] == "F"]),
-                "average_internal": round(sum(subject["internal"] for subject in subjects.values()) / len(subjects), 2),
-                "average_external": round(sum(subject["external"] for subject in subjects.values()) / len(subjects), 2),
-                "average_total": round(sum(subject["total"] for subject in subjects.values()) / len(subjects), 2)
-            }
-        })
+        response = jsonify(body)
+        response.headers["X-Cache"] = cache_status
+        return response
         
+    except HTTPException:
+        raise  # e.g. 413 for a body over the size limit, answered by its error handler
     except Exception as e:
         return jsonify({"error": f"Error processing PDF: {str(e)}"}), 500
 
+def parse_upload_cached(upload, scheme=None):
+    """Parse an upload, serving repeat uploads of the same transcript from the cache
+
+    Returns (result, "HIT" or "MISS"), or (error body, None) when the PDF
+    has no recognisable subjects.
+    """
+    # Results depend on the subject data, so its version is part of the key
+    cache_key = make_cache_key(upload.view, scheme, subject_data.current().version)
+    cached = parse_result_cache.get(cache_key)
+    if cached is not None:
+        report_stage("cache", "Served from the result cache")
+        return cached, "HIT"
+    
+    subjects, detected_scheme = parse_vtu_pdf(upload, scheme)
+    if not subjects:
+        return {
+            "error": "No subjects found in PDF. Please ensure it's a valid VTU result PDF.",
+            "detected_scheme": detected_scheme
+        }, None
+    
+    report_stage("sgpa", f"Calculating SGPA over {len(subjects)} subjects")
+    with tracing.stage("sgpa"):
+        result = build_result_payload(subjects, detected_scheme)
+    parse_result_cache.put(cache_key, result)
+    return result, "MISS"
+
+def _run_parse_job(upload, scheme, profile=False):
+    """Job body for /jobs/parse-pdf: the /parse-pdf work, off the request thread"""
+    with metrics.in_flight("vtu_parse_jobs_in_flight"):
+        # The job id doubles as its trace (and profile) id
+        with tracing.traced(current_job_id(), profile, path="/jobs/parse-pdf") as trace:
+            body, cache_status = parse_upload_cached(upload, scheme)
+        if profile:
+            tracing.log("profile written", path=trace.write_profile())
+    if cache_status is None:
+        raise JobFailed(body["error"], detected_scheme=body["detected_scheme"])
+    return body
+
+@app.route("/jobs/parse-pdf", methods=["POST"])
+def submit_parse_job():
+    """Queue a PDF for parsing and return a job id at once (202); follow it via /jobs/<id>"""
+    upload_started = time.perf_counter()
+    pdf_file = request.files.get("pdf_file")
+    if pdf_file is None or pdf_file.filename == "":
+        return jsonify({"error": "No PDF file provided"}), 400
+    if not pdf_file.filename.lower().endswith('.pdf'):
+        return jsonify({"error": "File must be a PDF"}), 400
+    
+    try:
+        upload = PDFUpload.from_stream(pdf_file.stream)
+    except UploadError as e:
+        return jsonify({"error": str(e)}), e.status_code
+    tracing.record_stage("upload_read", upload_started, bytes=upload.size)
+    
+    try:
+        # A profiled submission profiles the job (written to PROFILE_DIR as <job id>.json)
+        profile = tracing.current_trace().profile
+        job = parse_jobs.submit(_run_parse_job, upload, request.form.get("scheme", None), profile,
+                                on_finish=upload.close)
+    except JobQueueFull:
+        upload.close()
+        response = jsonify({"error": "Too many parse jobs in progress, try again shortly"})
+        response.headers["Retry-After"] = "5"
+        return response, 503
+    
+    response = jsonify({
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": f"/jobs/{job.id}",
+        "events_url": f"/jobs/{job.id}/events"
+    })
+    response.headers["Location"] = f"/jobs/{job.id}"
+    if profile:
+        response.headers["X-Profile-Id"] = job.id
+    return response, 202
+
+@app.route("/jobs", methods=["GET"])
+def parse_job_stats():
+    """Parse job pool occupancy and job counts by status (this worker process)"""
+    return jsonify(parse_jobs.stats())
+
+@app.route("/jobs/<job_id>", methods=["GET"])
+def parse_job_status(job_id):
+    """Poll a parse job: status, progress events and (once done) the /parse-pdf result"""
+    job = parse_jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown or expired job"}), 404
+    return jsonify(job.to_dict())
+
+@app.route("/jobs/<job_id>/events", methods=["GET"])
+def parse_job_events(job_id):
+    """Stream a parse job's progress as Server-Sent Events"""
+    job = parse_jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown or expired job"}), 404
+    response = Response(stream_with_context(sse_events(job, request.headers.get("Last-Event-ID"))),
+                        mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"  # let proxies pass events through immediately
+    return response
+
+@app.route("/parse-batch", methods=["POST"])
+def parse_batch():
+    """Parse many PDFs (or one zip of PDFs) and stream one NDJSON record per transcript"""
+    request.max_content_length = max(BATCH_MAX_TOTAL_BYTES, BATCH_MAX_ARCHIVE_BYTES) + REQUEST_FORM_OVERHEAD
+    files = [f for f in request.files.getlist("pdf_files") if f.filename]
+    archive = request.files.get("archive")
+    if archive and archive.filename:
+        files.append(archive)
+    
+    if not files:
+        return jsonify({"error": "No PDF files provided"}), 400
+    
+    # Files are read while the response streams, after the request has closed its own
+    # uploads, so the spooled streams are handed over to the response and closed there
+    uploads = []
+    for f in files:
+        uploads.append((f.filename, f.stream))
+        f.stream = io.BytesIO()
+    
+    def close_uploads():
+        for _, stream in uploads:
+            stream.close()
+    
+    try:
+        items = collect_batch_items(uploads)
+    except BatchError as e:
+        close_uploads()
+        return jsonify({"error": str(e)}), 400
+    
+    scheme = request.form.get("scheme", None)
+    
+    def generate():
+        try:
+            for record in iter_batch_results(items, parse_transcript_bytes, scheme):
+                yield fast_json.dumps(record) + "\n"
+        except BatchError as e:
+            # A limit crossed partway through: the records so far stand, the rest is not read
+            yield fast_json.dumps({"success": False, "error": str(e)}) + "\n"
+        finally:
+            close_uploads()
+    
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
 @app.route("/schemes", methods=["GET"])
 def get_schemes():
     """Get supported VTU schemes"""
-    return jsonify(VTU_SCHEMES)
+    return schemes_response.serve(request)
 
 @app.route("/subjects", methods=["GET"])
 def get_subjects():
     """Get supported subjects"""
-    return jsonify(SUBJECT_CREDITS)
+    return subjects_response.get().serve(request)
+
+@app.route("/subjects/version", methods=["GET"])
+def subjects_version():
+    """Version and fingerprint of the live subject data"""
+    return jsonify(subject_data.current().info())
+
+@app.route("/subjects/reload", methods=["POST"])
+def subjects_reload():
+    """Re-read the subject data files now instead of at the next periodic check"""
+    try:
+        snapshot = subject_data.reload()
+    except SubjectDataError as e:
+        return jsonify({"error": str(e), "live": subject_data.current().info()}), 400
+    return jsonify(snapshot.info())
+
+@app.route("/subjects/catalogue", methods=["GET"])
+def subjects_catalogue():
+    """Full subject database, paginated (?page=&per_page=) and filterable (?scheme=&branch=&semester=&type=&q=)"""
+    args = request.args
+    prepared = get_subject_catalogue().page(
+        page=args.get("page", 1, type=int),
+        per_page=args.get("per_page", 100, type=int),
+        query=args.get("q"),
+        **{field: args.get(field) for field in ("scheme", "branch", "semester", "type")}
+    )
+    return prepared.serve(request)
+
+@app.route("/subjects/search", methods=["GET"])
+def subjects_search():
+    """Ranked subject search by code or name (?q=...&limit=...)"""
+    query = request.args.get("q", "")
+    limit = min(max(request.args.get("limit", 20, type=int), 1), 100)
+    return jsonify({"query": query, "results": search_subjects_ranked(query, limit)})
+
+@app.route("/subjects/autocomplete", methods=["GET"])
+def subjects_autocomplete():
+    """Subject code/name suggestions for a typed prefix (?q=...&limit=...)"""
+    query = request.args.get("q", "")
+    limit = min(max(request.args.get("limit", 10, type=int), 1), 50)
+    return jsonify({"query": query, "suggestions": autocomplete_subjects(query, limit)})
+
+@app.route("/curriculum", methods=["GET"])
+def curriculum_aggregates():
+    """Credit totals, course counts by type and elective groups (?scheme=&branch=&semester=)"""
+    scheme = request.args.get("scheme") or None
+    branch = request.args.get("branch") or None
+    semester = request.args.get("semester") or None
+    if (branch and not scheme) or (semester and not branch):
+        return jsonify({"error": "branch needs scheme, and semester needs branch"}), 400
+    
+    cached = get_curriculum().response(scheme, branch, semester)
+    if cached is None:
+        return jsonify({"error": "No curriculum for the requested scheme/branch/semester"}), 404
+    
+    body, etag = cached
+    response = Response(body, mimetype="application/json")
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = CURRICULUM_MAX_AGE
+    # Answers If-None-Match with 304 Not Modified
+    return response.make_conditional(request)
+
+@app.route("/grade/bulk", methods=["POST"])
+def grade_bulk():
+    """Grade marks already held by an institution: a students x subjects matrix in one call
+
+    JSON body: {"scheme": "2022", "marks": [[...], ...], "credits": [...] or
+    "subjects": ["BCS401", ...], "students": [...]}; null marks are subjects
+    a student did not take.
+    """
+    if np is None:
+        return jsonify({"error": "Bulk grading is unavailable: numpy is not installed"}), 501
+    
+    request.max_content_length = JSON_BODY_MAX_BYTES
+    body = request.get_json(silent=True) or {}
+    scheme = body.get("scheme", "2022")
+    table = grade_tables.get(scheme)
+    if table is None:
+        return jsonify({"error": f"Unknown scheme: {scheme}"}), 400
+    
+    marks = body.get("marks")
+    if not isinstance(marks, list) or not marks or not all(isinstance(row, list) for row in marks):
+        return jsonify({"error": "marks must be a non-empty list of per-student lists"}), 400
+    if len(marks) > BULK_GRADE_MAX_STUDENTS:
+        return jsonify({"error": f"At most {BULK_GRADE_MAX_STUDENTS} students per request"}), 413
+    
+    # Credits given directly, or looked up from the subject codes
+    credits = body.get("credits")
+    if credits is None and isinstance(body.get("subjects"), list):
+        credits = [get_subject_credits(str(code).strip().upper()) for code in body["subjects"]]
+    if not isinstance(credits, list):
+        return jsonify({"error": "credits (one per subject) or subjects (course codes) is required"}), 400
+    
+    try:
+        result = grade_cohort(table, np.array(marks, dtype=float), np.array(credits, dtype=float))
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": f"marks and credits must be numeric with one column per subject ({e})"}), 400
+    
+    letters = np.array(table.letter_names, dtype=object)[result["letters"]]
+    letters[result["missing"]] = None
+    grade_points = result["grade_points"].astype(int).astype(object)
+    grade_points[result["missing"]] = None
+    students = body.get("students")
+    return jsonify({
+        "scheme": scheme,
+        "count": len(marks),
+        "students": students if isinstance(students, list) and len(students) == len(marks) else None,
+        "grades": letters.tolist(),
+        "grade_points": grade_points.tolist(),
+        "sgpa": [round(sgpa, 2) for sgpa in result["sgpa"].tolist()],
+        "total_credits": result["total_credits"].tolist(),
+        "total_weighted_points": result["total_weighted_points"].tolist(),
+        "failed_count": result["failed_count"].tolist()
+    })
+
+@app.route("/analytics/cohort", methods=["POST"])
+def cohort_analytics():
+    """SGPA distribution, percentiles, pass rates and grade histograms for many parse results
+
+    Body: {"results": [...]} of /parse-pdf results, or the NDJSON stream from
+    /parse-batch as is; ?tail=10 picks the top/bottom percentile, ?limit=50
+    the students listed in each.
+    """
+    if np is None:
+        return jsonify({"error": "Cohort analytics is unavailable: numpy is not installed"}), 501
+    
+    request.max_content_length = JSON_BODY_MAX_BYTES
+    try:
+        if request.mimetype == "application/x-ndjson":
+            results = [json.loads(line) for line in request.get_data(as_text=True).splitlines() if line.strip()]
+        else:
+            results = (request.get_json(silent=True) or {}).get("results")
+    except ValueError as e:
+        return jsonify({"error": f"Invalid NDJSON: {str(e)}"}), 400
+    if not isinstance(results, list) or not all(isinstance(result, dict) for result in results):
+        return jsonify({"error": "results must be a list of parse results"}), 400
+    if len(results) > COHORT_MAX_STUDENTS:
+        return jsonify({"error": f"At most {COHORT_MAX_STUDENTS} results per request"}), 413
+    
+    tail = min(max(request.args.get("tail", 10, type=int), 1), 50)
+    limit = min(max(request.args.get("limit", 50, type=int), 0), 1000)
+    try:
+        return jsonify(analyze_cohort(results, tail, limit))
+    except (AttributeError, TypeError, ValueError) as e:
+        return jsonify({"error": f"Malformed parse result: {str(e)}"}), 400
+
+@app.route("/cgpa/<student>", methods=["GET", "POST", "DELETE"])
+def student_cgpa(student):
+    """Running CGPA for a student (USN): POST one semester's PDF or parsed subjects, GET the totals
+
+    POST takes a pdf_file upload (plus optional scheme/semester form fields)
+    or JSON {"subjects": {...}, "semester": "4"} as returned by /parse-pdf.
+    The most recently recorded result for a course replaces the earlier one.
+    Every method needs the X-CGPA-Token header, as USNs are easy to guess.
+    """
+    if not cgpa_access_allowed(request.headers.get("X-CGPA-Token")):
+        return jsonify({"error": "CGPA history needs a valid X-CGPA-Token header"}), 403
+    
+    student = normalize_student(student)
+    if student is None:
+        return jsonify({"error": "Student must be a USN or similar identifier (letters, digits, - and _)"}), 400
+    
+    if request.method == "GET":
+        summary = cgpa_tracker.summary(student, include_courses=request.args.get("courses") == "1")
+        if not summary["semesters"]:
+            return jsonify({"error": f"No results recorded for {student}"}), 404
+        return jsonify(summary)
+    
+    if request.method == "DELETE":
+        return jsonify({"student": student, "removed_courses": cgpa_tracker.forget(student)})
+    
+    pdf_file = request.files.get("pdf_file")
+    if pdf_file and pdf_file.filename:
+        semester = request.form.get("semester") or None
+        try:
+            upload = PDFUpload.from_stream(pdf_file.stream)
+        except UploadError as e:
+            return jsonify({"error": str(e)}), e.status_code
+        with upload:
+            subjects, _ = parse_vtu_pdf(upload, request.form.get("scheme") or None)
+        if not subjects:
+            return jsonify({"error": "No subjects found in PDF. Please ensure it's a valid VTU result PDF."}), 400
+    else:
+        body = request.get_json(silent=True) or {}
+        semester = body.get("semester") or None
+        subjects = body.get("subjects")
+        if isinstance(subjects, list):
+            subjects = {subject.get("code"): subject for subject in subjects if isinstance(subject, dict)}
+        if not isinstance(subjects, dict) or not subjects:
+            return jsonify({"error": "Upload pdf_file or send parsed subjects"}), 400
+        if not all(isinstance(subject, dict) and code and "credits" in subject and "grade_point" in subject
+                   for code, subject in subjects.items()):
+            return jsonify({"error": "Every subject needs a code, credits and grade_point"}), 400
+    
+    try:
+        return jsonify(cgpa_tracker.record(student, subjects, semester))
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid subject data: {str(e)}"}), 400
+
+@app.route("/metrics", methods=["GET"])
+def prometheus_metrics():
+    """Stage latency histograms, strategy counters and in-flight gauges of all workers (Prometheus text)"""
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+@app.route("/cache-stats", methods=["GET"])
+def cache_stats():
+    """Get parse result cache hit/miss counters"""
+    return jsonify(parse_result_cache.stats())
+
+@app.route("/gemini-stats", methods=["GET"])
+def gemini_stats():
+    """Get Gemini client latency/error counters and circuit breaker state"""
+    stats = gemini_client.stats()
+    try:
+        stats["store"] = gemini_store.stats()
+    except Exception as e:
+        stats["store"] = {"error": str(e)}
+    return jsonify(stats)
 
 @app.route("/debug-pdf", methods=["POST"])
 def debug_pdf():
@@ -537,8 +1110,13 @@ def debug_pdf():
         if pdf_file.filename == "":
             return jsonify({"error": "No file selected"}), 400
         
+        try:
+            upload = PDFUpload.from_stream(pdf_file.stream)
+        except UploadError as e:
+            return jsonify({"error": str(e)}), e.status_code
+        
         # Extract text from PDF
-        with pdfplumber.open(pdf_file) as pdf:
+        with upload, upload.open() as reader, pdfplumber.open(reader) as pdf:
             text = ""
             for page in pdf.pages:
                 page_text = page.extract_text()
@@ -566,207 +1144,108 @@ def debug_pdf():
             "text_length": len(text)
         })
         
+    except HTTPException:
+        raise
     except Exception as e:
         return jsonify({"error": f"Error processing PDF: {str(e)}"}), 500
 
-def _ultra_aggressive_parsing(text):
-    """Ultra-aggressive parsing that can handle any VTU format"""
-    matches = []
-    lines = text.split('\n')
-    
-    for line in lines:
-        line = line.strip()
-        if len(line) < 10:  # Skip very short lines
-            continue
-            
-        # Look for ANY course code pattern
-        code_patterns = [
-            r'([A-Z]{2,5}\d{2,4}[A-Z]?)',  # Standard VTU codes
-            r'([A-Z]{2}\d{2}[A-Z]{2,4}\d{3})',  # Legacy format
-            r'([A-Z]{3,4}\d{3}[A-Z]?)',  # BCS format
-        ]
-        
-        code = None
-        for pattern in code_patterns:
-            code_match = re.search(pattern, line, re.IGNORECASE)
-            if code_match:
-                code = code_match.group(1).upper()
-                break
-        
-        if code:
-            # Extract ALL numbers from the line
-            numbers = re.findall(r'\b(\d+)\b', line)
-            
-            # Try to identify which numbers are marks
-            if len(numbers) >= 3:
-                # Assume first 3 numbers are internal, external, total
-                internal = int(numbers[0])
-                external = int(numbers[1]) 
-                total = int(numbers[2])
-                
-                # Validate: total should be sum of internal + external (approximately)
-                if abs(total - (internal + external)) <= 5:  # Allow small difference
-                    # Extract subject name
-                    name_part = line[line.find(code) + len(code):].strip()
-                    # Remove numbers and special chars from name
-                    name = re.sub(r'\d+', '', name_part)
-                    name = re.sub(r'[^\w\s&]', ' ', name).strip()
-                    name = name[:50] if len(name) > 50 else name  # Limit length
-                    
-                    if name:
-                        matches.append((code, name, internal, external, total, "P"))
-    
-    return matches
-
-def _fallback_parsing(text):
-    """Last resort parsing - extract any course-like data"""
-    matches = []
-    
-    # Split into words and look for patterns
-    words = text.split()
-    
-    for i, word in enumerate(words):
-        # Look for course code patterns
-        if re.match(r'^[A-Z]{2,5}\d{2,4}[A-Z]?$', word, re.IGNORECASE):
-            code = word.upper()
-            
-            # Look for numbers after this code
-            numbers = []
-            for j in range(i+1, min(i+10, len(words))):
-                if words[j].isdigit() and len(words[j]) <= 3:  # Valid mark
-                    numbers.append(int(words[j]))
-                    if len(numbers) >= 3:
-                        break
-            
-            if len(numbers) >= 3:
-                internal, external, total = numbers[0], numbers[1], numbers[2]
-                
-                # Try to get subject name from surrounding words
-                name_words = []
-                for j in range(max(0, i-5), i):
-                    if words[j].isalpha() and len(words[j]) > 2:
-                        name_words.append(words[j])
-                
-                name = " ".join(name_words[-3:]) if name_words else "UNKNOWN SUBJECT"
-                
-                matches.append((code, name.upper(), internal, external, total, "P"))
-    
-    return matches
-
 def parse_with_gemini_ai(pdf_file):
     """Use Google Gemini AI to intelligently parse VTU PDF results"""
     try:
         # Get Gemini API key from environment
         api_key = os.getenv('GEMINI_API_KEY')
         if not api_key:
-            print("Warning: GEMINI_API_KEY not found. Using fallback parsing.")
+            tracing.log("GEMINI_API_KEY not set, using traditional parsing", level="warning")
             return None
         
-        # Convert PDF to base64
-        pdf_content = pdf_file.read()
-        pdf_file.seek(0)  # Reset file pointer
-        pdf_base64 = base64.b64encode(pdf_content).decode('utf-8')
-        
-        # Gemini API endpoint - using the newer gemini-2.0-flash model
-        url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent?key={api_key}"
-        
-        # Prepare the prompt for Gemini
-        prompt = """
-        You are an expert at reading VTU (Visvesvaraya Technological University) exam result PDFs. 
-        
-        Extract ONLY the following information from this VTU result PDF:
-        1. Subject Code (e.g., BCS401, 22CS101, etc.)
-        2. Subject Name
-        3. Internal Marks
-        4. External Marks  
-        5. Total Marks
-        6. Result (P/F/A/W/X/NE)
-        
-        Ignore all other information like student details, dates, headers, footers, etc.
-        
-        Return the data as a clean JSON array of objects with this exact format:
-        [
-            {
-                "code": "BCS401",
-                "name": "ANALYSIS & DESIGN OF ALGORITHMS",
-                "internal": 49,
-                "external": 36,
-                "total": 85,
-                "result": "P"
-            }
-        ]
+        upload = PDFUpload.wrap(pdf_file)
         
-        If you cannot find any subjects, return an empty array [].
-        Be very precise and accurate with the numbers and codes.
-        Only return the JSON array, no additional text or explanations.
-        """
+        # Identical transcripts are answered from the persistent store
+        content_hash = hashlib.sha256(upload.view).hexdigest()
+        subjects_data = _load_gemini_response(content_hash)
+        if subjects_data is None:
+            with tracing.stage("gemini"):
+                subjects_data = _request_gemini_subjects(api_key, upload)
+            if subjects_data is None:
+                return None
+            _save_gemini_response(content_hash, subjects_data)
+        else:
+            tracing.log("Gemini AI response loaded from persistent store")
         
-        # Prepare the request payload
-        payload = {
-            "contents": [{
-                "parts": [
-                    {"text": prompt},
-                    {
-                        "inline_data": {
-                            "mime_type": "application/pdf",
-                            "data": pdf_base64
-                        }
-                    }
-                ]
-            }]
-        }
+        # Convert to our internal format
+        subjects = {}
+        for subject in subjects_data:
+            code = subject.get('code', '').upper()
+            if code:
+                subjects[code] = SubjectRecord(
+                    code=code,
+                    name=subject.get('name', 'UNKNOWN SUBJECT'),
+                    internal=int(subject.get('internal', 0)),
+                    external=int(subject.get('external', 0)),
+                    total=int(subject.get('total', 0)),
+                    result=subject.get('result', 'P')
+                    # grade_point, credits, grade and credit_points are filled in later
+                )
         
-        # Make API request
-        response = requests.post(url, json=payload, timeout=30)
+        tracing.log("Gemini AI extracted subjects", subjects=len(subjects))
+        return subjects
         
-        if response.status_code == 200:
-            result = response.json()
-            
-            # Extract the response text
-            if 'candidates' in result and len(result['candidates']) > 0:
-                content = result['candidates'][0]['content']
-                if 'parts' in content and len(content['parts']) > 0:
-                    response_text = content['parts'][0]['text']
-                    
-                    # Try to extract JSON from the response
-                    try:
-                        # Look for JSON array in the response
-                        json_match = re.search(r'\[.*\]', response_text, re.DOTALL)
-                        if json_match:
-                            subjects_data = json.loads(json_match.group())
-                            
-                            # Convert to our internal format
-                            subjects = {}
-                            for subject in subjects_data:
-                                code = subject.get('code', '').upper()
-                                if code:
-                                    subjects[code] = {
-                                        "code": code,
-                                        "name": subject.get('name', 'UNKNOWN SUBJECT'),
-                                        "internal": int(subject.get('internal', 0)),
-                                        "external": int(subject.get('external', 0)),
-                                        "total": int(subject.get('total', 0)),
-                                        "grade_point": 0,  # Will be calculated later
-                                        "credits": 0,  # Will be assigned later
-                                        "result": subject.get('result', 'P'),
-                                        "grade": 'F',  # Will be calculated later
-                                        "credit_points": 0  # Will be calculated later
-                                    }
-                            
-                            print(f"Gemini AI successfully extracted {len(subjects)} subjects")
-                            return subjects
-                    
-                    except json.JSONDecodeError as e:
-                        print(f"Error parsing Gemini response as JSON: {e}")
-                        print(f"Response text: {response_text[:500]}...")
-        
-        print(f"Gemini API request failed: {response.status_code}")
+    except Exception as e:
+        tracing.log("error using Gemini AI", level="error", error=str(e))
         return None
-        
+
+def _request_gemini_subjects(api_key, upload):
+    """Send the PDF to Gemini and return the raw subject array it extracted"""
+    # Prompt + base64 PDF, encoded chunk by chunk while the request is sent
+    body = InlinePDFRequestBody(GEMINI_PROMPT, upload.view)
+    
+    # A raced call whose parse has already been answered is not worth making
+    if _path_is_abandoned():
+        tracing.log("skipping Gemini call for an abandoned parse path", level="debug")
+        return None
+    
+    # Pooled request; None when the call failed or the circuit is open
+    result = gemini_client.generate_content(api_key, body=body)
+    if result is None:
+        return None
+    
+    # Extract the response text
+    if 'candidates' in result and len(result['candidates']) > 0:
+        content = result['candidates'][0]['content']
+        if 'parts' in content and len(content['parts']) > 0:
+            response_text = content['parts'][0]['text']
+            
+            # Try to extract JSON from the response
+            try:
+                # Look for JSON array in the response
+                json_match = re.search(r'\[.*\]', response_text, re.DOTALL)
+                if json_match:
+                    subjects_data = json.loads(json_match.group())
+                    if isinstance(subjects_data, list):
+                        return subjects_data
+            
+            except json.JSONDecodeError as e:
+                tracing.log("could not parse Gemini response as JSON", level="warning", error=str(e),
+                            response_text=response_text[:500])
+    
+    tracing.log("Gemini API response contained no subjects", level="warning")
+    return None
+
+def _load_gemini_response(content_hash):
+    """Look up a stored Gemini subject array; store errors count as a miss"""
+    try:
+        return gemini_store.get(content_hash, GEMINI_PROMPT_VERSION)
     except Exception as e:
-        print(f"Error using Gemini AI: {str(e)}")
+        tracing.log("Gemini response store unavailable", level="warning", error=str(e))
         return None
 
+def _save_gemini_response(content_hash, subjects_data):
+    """Persist a Gemini subject array; store errors never fail the parse"""
+    try:
+        gemini_store.put(content_hash, GEMINI_PROMPT_VERSION, subjects_data)
+    except Exception as e:
+        tracing.log("could not save Gemini response", level="warning", error=str(e))
+
 if __name__ == "__main__":
     # Check for Gemini API key
     if not os.getenv('GEMINI_API_KEY'):